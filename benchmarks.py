@@ -0,0 +1,712 @@
+"""
+Nilvera Python Client - Performans Ölçümleri
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Client'ın kullandığı Nilvera ve TCMB endpoint'lerini taklit eden yerel bir
+HTTP sunucusu başlatır ve client üzerinden senaryolar koşturur.
+
+Her senaryo için throughput, p50/p99 gecikme ve tepe bellek kullanımı
+ölçülür; sonuçlar sürümler arasında karşılaştırılabilen bir JSON raporu
+olarak yazılır.
+
+Kullanım:
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --latency 0.02 --error-rate 0.01 --concurrency 16
+    python benchmarks.py --compare eski.json --output yeni.json
+    python benchmarks.py --import-time --import-budget-ms 50 --scenario local.validate_invoice_50_lines
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import nilvera_client
+from nilvera_client import NilveraClient, TCMBCurrencyService, InvoiceValidator, InvoiceBuilder
+
+
+# ==================== Sahte Sunucu ====================
+
+class StubConfig:
+    """Sahte sunucunun gecikme ve hata enjeksiyonu ayarları"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 document_size: int = 200 * 1024, page_total: int = 500,
+                 max_page_size: int = None, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.document_size = document_size
+        self.page_total = page_total
+        # Verilirse sunucu PageSize'ı bu değerle sınırlar
+        self.max_page_size = max_page_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Bir istek için uygulanacak gecikme (saniye)"""
+        if not self.latency and not self.jitter:
+            return 0.0
+        with self._lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + extra
+
+    def should_fail(self):
+        """Bu istek hata ile mi yanıtlanacak?"""
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+TCMB_XML_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<Tarih_Date Tarih="{tarih}" Date="{date}" Bulten_No="2026/1">
+    <Currency CrossOrder="0" Kod="USD" CurrencyCode="USD">
+        <Unit>1</Unit>
+        <ForexBuying>34.5678</ForexBuying>
+        <ForexSelling>34.6301</ForexSelling>
+        <BanknoteBuying>34.5436</BanknoteBuying>
+        <BanknoteSelling>34.6820</BanknoteSelling>
+    </Currency>
+    <Currency CrossOrder="9" Kod="EUR" CurrencyCode="EUR">
+        <Unit>1</Unit>
+        <ForexBuying>37.1234</ForexBuying>
+        <ForexSelling>37.1903</ForexSelling>
+        <BanknoteBuying>37.0974</BanknoteBuying>
+        <BanknoteSelling>37.2461</BanknoteSelling>
+    </Currency>
+    <Currency CrossOrder="10" Kod="GBP" CurrencyCode="GBP">
+        <Unit>1</Unit>
+        <ForexBuying>43.8765</ForexBuying>
+        <ForexSelling>44.1052</ForexSelling>
+        <BanknoteBuying>43.8458</BanknoteBuying>
+        <BanknoteSelling>44.1714</BanknoteSelling>
+    </Currency>
+</Tarih_Date>'''
+
+
+class StubNilveraHandler(BaseHTTPRequestHandler):
+    """Nilvera ve TCMB endpoint'lerini taklit eden istek işleyici"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    ROUTES = [
+        ('GET', r'^/general/company$', 'company'),
+        ('GET', r'^/(einvoice|earchive)/Series$', 'series'),
+        ('POST', r'^/(einvoice|earchive)/Draft/Create$', 'draft_create'),
+        ('POST', r'^/(einvoice|earchive)/Draft/ConfirmAndSend$', 'confirm'),
+        ('GET', r'^/einvoice/Sale/(?P<uuid>[^/]+)/Status$', 'status'),
+        ('GET', r'^/einvoice/Sale/(?P<uuid>[^/]+)/CheckFromGtb$', 'gtb'),
+        ('GET', r'^/einvoice/(Sale|Purchase)/(?P<uuid>[^/]+)/Details$', 'details'),
+        ('GET', r'^/einvoice/(Sale|Draft)/(?P<uuid>[^/]+)/(?P<fmt>pdf|xml|html)$', 'document'),
+        ('DELETE', r'^/einvoice/draft/(?P<uuid>[^/]+)$', 'cancel'),
+        ('GET', r'^/einvoice/Purchase$', 'purchase_list'),
+        ('GET', r'^/einvoice/Sale$', 'sale_list'),
+        ('GET', r'^/general/GlobalCompany/GetGlobalCustomerInfo/(?P<vkn>[^/]+)$', 'taxpayer'),
+        ('GET', r'^/kurlar/(?P<month>\d{6})/(?P<day>\d{8})\.xml$', 'tcmb'),
+    ]
+
+    COMPILED_ROUTES = [(m, re.compile(p), name) for m, p, name in ROUTES]
+
+    def log_message(self, format, *args):
+        # Ölçümleri bozmamak için erişim logu yazılmaz
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        config = self.server.config
+        path, _, query = self.path.partition('?')
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = self._read_chunked()
+
+        delay = config.delay()
+        if delay:
+            time.sleep(delay)
+
+        if config.should_fail():
+            self._send_json(config.error_status, {'Message': 'Enjekte edilmiş hata'})
+            return
+
+        for route_method, pattern, name in self.COMPILED_ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if match:
+                getattr(self, f'_handle_{name}')(match, body, query)
+                return
+
+        self._send_json(404, {'Message': f'Bulunamadı: {method} {path}'})
+
+    def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().strip() or b'0', 16)
+            if size == 0:
+                self.rfile.readline()
+                break
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+        return b''.join(chunks)
+
+    def _send(self, status, payload: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status, data):
+        self._send(status, json.dumps(data).encode('utf-8'), 'application/json; charset=utf-8')
+
+    # ---- Nilvera ----
+
+    def _handle_company(self, match, body, query):
+        self._send_json(200, {'Name': 'Benchmark A.Ş.', 'TaxNumber': '1234567890'})
+
+    def _handle_series(self, match, body, query):
+        year = datetime.now().year
+        self._send_json(200, [
+            {'ID': i, 'Name': f'S{i:02d}', 'IsDefault': i == 1, 'IsActive': True,
+             'Details': [{'Year': year, 'OrdinalNumber': i * 100}]}
+            for i in range(1, 21)
+        ])
+
+    def _handle_draft_create(self, match, body, query):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            self._send_json(400, {'Message': 'Geçersiz JSON'})
+            return
+        invoice = data.get('EInvoice') or data.get('ArchiveInvoice') or {}
+        invoice_uuid = invoice.get('InvoiceInfo', {}).get('UUID') or str(uuid.uuid4())
+        self._send_json(200, {'UUID': invoice_uuid})
+
+    def _handle_confirm(self, match, body, query):
+        items = json.loads(body or b'[]')
+        self._send_json(200, {'Count': len(items)})
+
+    def _handle_status(self, match, body, query):
+        self._send_json(200, {'UUID': match.group('uuid'), 'StatusCode': 'succeed',
+                              'StatusDetail': 'Başarıyla tamamlandı'})
+
+    def _handle_gtb(self, match, body, query):
+        self._send_json(200, {'UUID': match.group('uuid'), 'CustomsRegistrationNumber': '26340100EX000001'})
+
+    def _handle_details(self, match, body, query):
+        self._send_json(200, {'UUID': match.group('uuid'), 'InvoiceNumber': 'IHR2026000000001',
+                              'PayableAmount': 1050.0, 'CurrencyCode': 'USD'})
+
+    def _handle_document(self, match, body, query):
+        size = self.server.config.document_size
+        fmt = match.group('fmt')
+        if fmt == 'pdf':
+            payload = b'%PDF-1.4\n' + b'0' * max(size - 9, 0)
+            self._send(200, payload, 'application/pdf')
+        elif fmt == 'xml':
+            payload = b'<?xml version="1.0" encoding="UTF-8"?><Invoice>' + b' ' * size + b'</Invoice>'
+            self._send(200, payload, 'application/xml')
+        else:
+            payload = b'<html><body>' + b' ' * size + b'</body></html>'
+            self._send(200, payload, 'text/html; charset=utf-8')
+
+    def _handle_cancel(self, match, body, query):
+        self._send(204, b'', 'application/json')
+
+    def _handle_purchase_list(self, match, body, query):
+        params = dict(p.split('=', 1) for p in query.split('&') if '=' in p)
+        page = int(params.get('Page', 1))
+        page_size = int(params.get('PageSize', 30))
+        if self.server.config.max_page_size:
+            page_size = min(page_size, self.server.config.max_page_size)
+        total = self.server.config.page_total
+        start = (page - 1) * page_size
+        content = [
+            {'UUID': str(uuid.UUID(int=i)), 'InvoiceNumber': f'ABC2026{i:09d}',
+             'SenderTitle': f'Tedarikçi {i % 50}', 'PayableAmount': round(i * 1.5, 2),
+             'CurrencyCode': 'TRY'}
+            for i in range(start, min(start + page_size, total))
+        ]
+        self._send_json(200, {'Page': page, 'PageSize': page_size, 'TotalCount': total,
+                              'TotalPages': -(-total // page_size), 'Content': content})
+
+    def _handle_sale_list(self, match, body, query):
+        params = dict(p.split('=', 1) for p in query.split('&') if '=' in p)
+        page = int(params.get('Page', 1))
+        page_size = int(params.get('PageSize', 30))
+        if self.server.config.max_page_size:
+            page_size = min(page_size, self.server.config.max_page_size)
+        total = self.server.config.page_total
+        start = (page - 1) * page_size
+        content = [
+            {'UUID': str(uuid.UUID(int=i)), 'InvoiceNumber': f'EXP2026{i:09d}',
+             'ReceiverTitle': f'Müşteri {i % 50}', 'PayableAmount': round(i * 2.5, 2),
+             'CurrencyCode': 'USD'}
+            for i in range(start, min(start + page_size, total))
+        ]
+        self._send_json(200, {'Page': page, 'PageSize': page_size, 'TotalCount': total,
+                              'TotalPages': -(-total // page_size), 'Content': content})
+
+    def _handle_taxpayer(self, match, body, query):
+        vkn = match.group('vkn')
+        self._send_json(200, {'TaxNumber': vkn, 'isTaxpayer': int(vkn[-1:] or 0) % 2 == 0,
+                              'alias': f'urn:mail:defaultpk@{vkn}.com'})
+
+    # ---- TCMB ----
+
+    def _handle_tcmb(self, match, body, query):
+        date = datetime.strptime(match.group('day'), '%d%m%Y')
+        if date.weekday() >= 5:
+            self._send(404, b'Not Found', 'text/html')
+            return
+        payload = TCMB_XML_TEMPLATE.format(tarih=date.strftime('%d.%m.%Y'),
+                                           date=date.strftime('%m/%d/%Y')).encode('utf-8')
+        self._send(200, payload, 'application/xml')
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class StubServer:
+    """Arka planda çalışan sahte Nilvera/TCMB sunucusu"""
+
+    def __init__(self, config: StubConfig = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or StubConfig()
+        self.httpd = _StubHTTPServer((host, port), StubNilveraHandler)
+        self.httpd.config = self.config
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ==================== Senaryolar ====================
+
+def _sample_invoice(line_count: int = 1):
+    """Benchmark için örnek ihracat faturası"""
+    return {
+        'InvoiceInfo': {
+            'UUID': str(uuid.uuid4()),
+            'InvoiceType': 2,
+            'InvoiceProfile': 3,
+            'InvoiceSerieOrNumber': 'IHR',
+            'IssueDate': '2026-02-15T10:00:00.000Z',
+            'CurrencyCode': 'USD',
+            'ExchangeRate': 34.50,
+            'LineExtensionAmount': 10.5 * line_count,
+            'PayableAmount': 10.5 * line_count,
+            'KdvTotal': 0.0,
+        },
+        'CompanyInfo': {'TaxNumber': '1234567890', 'Name': 'Örnek Şirket A.Ş.'},
+        'ExportCustomerInfo': {'LegalRegistrationName': 'Example Inc.', 'Country': 'USA'},
+        'InvoiceLines': [
+            {'Index': str(i + 1), 'Name': f'Ürün {i + 1}', 'Quantity': 1.0, 'UnitType': 'C62',
+             'Price': 10.5, 'KDVPercent': 0, 'KDVTotal': 0.0,
+             'DeliveryInfo': {'GTIPNo': '84212100', 'DeliveryTermCode': 'EXW'}}
+            for i in range(line_count)
+        ],
+    }
+
+
+def _scenario_single(client):
+    return lambda i: client.get_invoice_status(str(uuid.UUID(int=i)))
+
+
+def _scenario_taxpayer(client):
+    return lambda i: client.check_taxpayer_status(f'{1000000000 + i}')
+
+
+def _scenario_series(client):
+    return lambda i: client.get_einvoice_series()
+
+
+def _scenario_create_draft(client):
+    return lambda i: client.create_draft_invoice(_sample_invoice(line_count=5))
+
+
+def _scenario_create_large_draft(client):
+    return lambda i: client.create_draft_invoice(_sample_invoice(line_count=2000))
+
+
+def _sample_builder(line_count: int = 1):
+    """_sample_invoice ile aynı faturayı InvoiceBuilder ile oluşturur"""
+    invoice = _sample_invoice(line_count=0)
+    info = {k: v for k, v in invoice['InvoiceInfo'].items()
+            if k not in ('LineExtensionAmount', 'PayableAmount', 'KdvTotal')}
+    builder = InvoiceBuilder(info, invoice['CompanyInfo'],
+                             ExportCustomerInfo=invoice['ExportCustomerInfo'])
+    builder.add_lines([f'Ürün {i + 1}' for i in range(line_count)], [1.0] * line_count,
+                      [10.5] * line_count, gtip='84212100', delivery_term='EXW')
+    return builder
+
+
+def _scenario_create_large_draft_builder(client):
+    return lambda i: client.create_draft_invoice(_sample_builder(line_count=2000))
+
+
+def _scenario_bulk_confirm(client):
+    uuids = [str(uuid.UUID(int=i)) for i in range(100)]
+    return lambda i: client.confirm_and_send_draft(uuids)
+
+
+def _scenario_incoming_page(client):
+    return lambda i: client.get_incoming_invoices(page=(i % 5) + 1, page_size=100)
+
+
+def _scenario_download_pdf(client):
+    return lambda i: client.get_invoice_pdf(str(uuid.UUID(int=i)))
+
+
+def _scenario_download_xml(client):
+    return lambda i: client.get_invoice_xml(str(uuid.UUID(int=i)))
+
+
+def _scenario_tcmb_rate(client):
+    base = datetime(2026, 2, 15)
+    return lambda i: TCMBCurrencyService.get_exchange_rate('USD', date=base - timedelta(days=i % 30))
+
+
+def _scenario_validate(client):
+    validator = InvoiceValidator()
+    invoice = _sample_invoice(line_count=50)
+    return lambda i: {'success': not validator.validate(invoice)}
+
+
+SCENARIOS = {
+    'single.get_invoice_status': _scenario_single,
+    'single.check_taxpayer_status': _scenario_taxpayer,
+    'single.get_einvoice_series': _scenario_series,
+    'single.create_draft_invoice': _scenario_create_draft,
+    'bulk.create_draft_invoice_2000_lines': _scenario_create_large_draft,
+    'bulk.create_draft_builder_2000_lines': _scenario_create_large_draft_builder,
+    'bulk.confirm_and_send_draft_100': _scenario_bulk_confirm,
+    'bulk.get_incoming_invoices_page100': _scenario_incoming_page,
+    'download.get_invoice_pdf': _scenario_download_pdf,
+    'download.get_invoice_xml': _scenario_download_xml,
+    'tcmb.get_exchange_rate': _scenario_tcmb_rate,
+    'local.validate_invoice_50_lines': _scenario_validate,
+}
+
+
+# ==================== Ölçüm ====================
+
+def percentile(samples, pct):
+    """Sıralı olmayan örneklerden yüzdelik değer (nearest-rank)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _is_success(result):
+    return isinstance(result, dict) and result.get('success', False)
+
+
+def run_scenario(name, client, iterations: int, concurrency: int, memory_iterations: int):
+    """
+    Tek bir senaryoyu koşturur
+
+    Returns:
+        dict: Senaryo metrikleri
+    """
+    operation = SCENARIOS[name](client)
+    latencies = [None] * iterations
+    errors = [0]
+    errors_lock = threading.Lock()
+
+    def attempt(i) -> bool:
+        # Hata enjeksiyonunda (--error-rate) exception ölçümü durdurmaz
+        try:
+            return _is_success(operation(i))
+        except Exception:
+            return False
+
+    def timed(i):
+        start = time.perf_counter()
+        ok = attempt(i)
+        latencies[i] = time.perf_counter() - start
+        if not ok:
+            with errors_lock:
+                errors[0] += 1
+
+    # Isınma (bağlantı havuzu, import vb.)
+    for i in range(min(3, iterations)):
+        attempt(i)
+
+    wall_start = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(iterations):
+            timed(i)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed, range(iterations)))
+    wall = time.perf_counter() - wall_start
+
+    # Bellek ölçümü ayrı bir geçişte yapılır; tracemalloc gecikmeyi bozar
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for i in range(memory_iterations):
+            attempt(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples = [s for s in latencies if s is not None]
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'errors': errors[0],
+        'wall_seconds': round(wall, 6),
+        'throughput_per_second': round(iterations / wall, 3) if wall else None,
+        'latency_ms': {
+            'p50': round(percentile(samples, 50) * 1000, 3),
+            'p99': round(percentile(samples, 99) * 1000, 3),
+            'mean': round(sum(samples) / len(samples) * 1000, 3),
+            'max': round(max(samples) * 1000, 3),
+        },
+        'peak_memory_bytes': peak,
+    }
+
+
+# `import nilvera_client` sırasında yüklenmemesi gereken ağır bağımlılıklar
+HEAVY_IMPORTS = ('requests', 'urllib3', 'httpx', 'sqlite3', 'asyncio', 'concurrent.futures')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _parse_importtime(stderr: str) -> dict:
+    """-X importtime çıktısını {modül: (self_us, cumulative_us)} olarak ayrıştırır"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def measure_import_time(statement: str = 'import nilvera_client', repeats: int = 5) -> dict:
+    """
+    Paket import süresini temiz bir yorumlayıcıda `-X importtime` ile ölçer
+
+    Her tekrar ayrı bir süreçte koşar; modül önbelleği paylaşılmaz. Ölçüm,
+    yorumlayıcı açılışından bağımsız olarak yalnızca nilvera_client
+    modüllerinin kümülatif süresini içerir.
+
+    Returns:
+        dict: Medyan kümülatif süre, yüklenen ağır bağımlılıklar ve en pahalı modüller
+    """
+    samples = []
+    modules = {}
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            capture_output=True, text=True, check=True,
+        )
+        modules = _parse_importtime(completed.stderr)
+        samples.append(modules.get('nilvera_client', (0, 0))[1])
+
+    heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {
+        'statement': statement,
+        'repeats': repeats,
+        'cumulative_ms': round(statistics.median(samples) / 1000, 3),
+        'heavy_modules_loaded': [name for name in HEAVY_IMPORTS if name in modules],
+        'top_self_ms': {name: round(self_us / 1000, 3) for name, (self_us, _) in heaviest},
+    }
+
+
+def run_benchmarks(config: StubConfig, iterations: int = 200, concurrency: int = 8,
+                   memory_iterations: int = 20, selected=None, transport: str = 'requests'):
+    """
+    Sahte sunucuyu başlatıp seçili senaryoları koşturur
+
+    Returns:
+        dict: Makine tarafından okunabilir rapor
+    """
+    names = selected or list(SCENARIOS)
+    report = {
+        'meta': {
+            'client_version': nilvera_client.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'transport': transport,
+            'stub': {
+                'latency': config.latency,
+                'jitter': config.jitter,
+                'error_rate': config.error_rate,
+                'document_size': config.document_size,
+            },
+        },
+        'scenarios': {},
+    }
+
+    original_tcmb_url = TCMBCurrencyService.BASE_URL
+    with StubServer(config) as server:
+        TCMBCurrencyService.BASE_URL = f'{server.url}/kurlar'
+        try:
+            client = NilveraClient(api_key='benchmark-key', environment='test', test_url=server.url,
+                                   transport=transport, pool_maxsize=max(concurrency, 10))
+            for name in names:
+                report['scenarios'][name] = run_scenario(
+                    name, client, iterations, concurrency, memory_iterations
+                )
+        finally:
+            TCMBCurrencyService.BASE_URL = original_tcmb_url
+    return report
+
+
+def compare_reports(baseline: dict, current: dict):
+    """
+    İki raporu karşılaştırır
+
+    Returns:
+        dict: Senaryo bazında oranlar (current / baseline)
+    """
+    comparison = {}
+    for name, metrics in current.get('scenarios', {}).items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+
+        def ratio(new, old):
+            return round(new / old, 3) if new is not None and old else None
+
+        comparison[name] = {
+            'throughput': ratio(metrics['throughput_per_second'], base['throughput_per_second']),
+            'p50': ratio(metrics['latency_ms']['p50'], base['latency_ms']['p50']),
+            'p99': ratio(metrics['latency_ms']['p99'], base['latency_ms']['p99']),
+            'peak_memory': ratio(metrics['peak_memory_bytes'], base['peak_memory_bytes']),
+        }
+
+    if 'import' in current and 'import' in baseline:
+        comparison['import'] = {
+            'cumulative': ratio(current['import']['cumulative_ms'], baseline['import']['cumulative_ms']),
+        }
+    return comparison
+
+
+def _print_report(report, comparison=None):
+    print(f"{'Senaryo':45} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'peak KB':>10} {'hata':>5}")
+    for name, m in report['scenarios'].items():
+        print(f"{name:45} {m['throughput_per_second']:>10.1f} {m['latency_ms']['p50']:>9.2f} "
+              f"{m['latency_ms']['p99']:>9.2f} {m['peak_memory_bytes'] / 1024:>10.1f} {m['errors']:>5}")
+    if 'import' in report:
+        imp = report['import']
+        heavy = ', '.join(imp['heavy_modules_loaded']) or '-'
+        print(f"\nImport süresi ({imp['statement']}): {imp['cumulative_ms']:.1f} ms, "
+              f"yüklenen ağır bağımlılıklar: {heavy}")
+    if comparison:
+        print("\nKarşılaştırma (yeni / eski):")
+        for name, c in comparison.items():
+            if name == 'import':
+                print(f"  {'import':43} süre x{c['cumulative']}")
+                continue
+            print(f"  {name:43} throughput x{c['throughput']}  p50 x{c['p50']}  "
+                  f"p99 x{c['p99']}  bellek x{c['peak_memory']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Nilvera client benchmark')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--memory-iterations', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='Sabit sunucu gecikmesi (sn)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Ek rastgele gecikme üst sınırı (sn)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Hata enjeksiyon oranı (0-1)')
+    parser.add_argument('--document-size', type=int, default=200 * 1024)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Sadece seçili senaryoları koştur (tekrarlanabilir)')
+    parser.add_argument('--transport', default='requests', choices=['requests', 'urllib3', 'http2'])
+    parser.add_argument('--output', help='JSON rapor dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak eski JSON rapor')
+    parser.add_argument('--import-time', action='store_true',
+                        help='Paket import süresini -X importtime ile ölç')
+    parser.add_argument('--import-budget-ms', type=float, default=None,
+                        help='Import süresi bu değeri aşarsa ya da ağır bağımlılık yüklenirse çıkış kodu 1')
+    args = parser.parse_args(argv)
+
+    # Enjekte edilen hataların logları ölçüm çıktısını kirletmesin
+    logging.getLogger('nilvera_client').addHandler(logging.NullHandler())
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        document_size=args.document_size, seed=args.seed)
+    report = run_benchmarks(config, iterations=args.iterations, concurrency=args.concurrency,
+                            memory_iterations=args.memory_iterations, selected=args.scenario,
+                            transport=args.transport)
+
+    exit_code = 0
+    if args.import_time or args.import_budget_ms is not None:
+        report['import'] = measure_import_time()
+        if args.import_budget_ms is not None and (
+                report['import']['cumulative_ms'] > args.import_budget_ms or
+                report['import']['heavy_modules_loaded']):
+            exit_code = 1
+
+    comparison = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            comparison = compare_reports(json.load(f), report)
+        report['comparison'] = {'baseline': args.compare, 'ratios': comparison}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    _print_report(report, comparison)
+    if exit_code:
+        print(f"\nImport bütçesi aşıldı ({args.import_budget_ms} ms)", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
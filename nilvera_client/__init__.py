@@ -19,20 +19,107 @@ __version__ = '1.1.0'
 __author__ = 'Abdullah'
 __license__ = 'MIT'
 
-from .client import NilveraClient
-from .currency import TCMBCurrencyService
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+
+# İstisnalar hafiftir ve except bloklarında sık kullanılır; doğrudan yüklenir.
 from .exceptions import (
     NilveraException,
     NilveraConnectionError,
     NilveraTimeoutError,
-    NilveraAPIError
+    NilveraAPIError,
+    NilveraQueueFullError,
+    NilveraValidationError
 )
 
+# Diğer sınıflar ilk erişimde ilgili modülden yüklenir (PEP 562).
+# `import nilvera_client` böylece requests / httpx / sqlite3 maliyetini ödemez.
+_LAZY_ATTRIBUTES = {
+    'NilveraClient': '.client',
+    'TCMBCurrencyService': '.currency',
+    'NilveraClientRegistry': '.tenancy',
+    'HedgingPolicy': '.hedging',
+    'PriorityScheduler': '.scheduling',
+    'priority': '.scheduling',
+    'InvoiceOutbox': '.outbox',
+    'DedupIndex': '.dedup',
+    'InvoiceValidator': '.validation',
+    'validate_invoice': '.validation',
+    'InvoiceBuilder': '.builder',
+    'CacheBackend': '.cache',
+    'MemoryCache': '.cache',
+    'SQLiteCache': '.cache',
+    'DocumentCache': '.document_cache',
+    'StatusTracker': '.webhooks',
+    'WebhookReceiver': '.webhooks',
+    'JSONArrayStream': '.jsonstream',
+    'Reconciler': '.reconcile',
+    'ReconciliationReport': '.reconcile',
+    'UBLExtractor': '.ubl',
+    'InvoiceRenderer': '.rendering',
+}
+
+if TYPE_CHECKING:
+    from .client import NilveraClient
+    from .currency import TCMBCurrencyService
+    from .tenancy import NilveraClientRegistry
+    from .hedging import HedgingPolicy
+    from .scheduling import PriorityScheduler, priority
+    from .outbox import InvoiceOutbox
+    from .dedup import DedupIndex
+    from .validation import InvoiceValidator, validate_invoice
+    from .builder import InvoiceBuilder
+    from .cache import CacheBackend, MemoryCache, SQLiteCache
+    from .document_cache import DocumentCache
+    from .webhooks import StatusTracker, WebhookReceiver
+    from .jsonstream import JSONArrayStream
+    from .reconcile import Reconciler, ReconciliationReport
+    from .ubl import UBLExtractor
+    from .rendering import InvoiceRenderer
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # Sonraki erişimler __getattr__'a uğramaz
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
 __all__ = [
     'NilveraClient',
     'TCMBCurrencyService',
+    'NilveraClientRegistry',
+    'HedgingPolicy',
+    'PriorityScheduler',
+    'priority',
+    'InvoiceOutbox',
+    'DedupIndex',
+    'InvoiceValidator',
+    'validate_invoice',
+    'InvoiceBuilder',
+    'CacheBackend',
+    'MemoryCache',
+    'SQLiteCache',
+    'DocumentCache',
+    'StatusTracker',
+    'WebhookReceiver',
+    'JSONArrayStream',
+    'Reconciler',
+    'ReconciliationReport',
+    'UBLExtractor',
+    'InvoiceRenderer',
     'NilveraException',
     'NilveraConnectionError',
     'NilveraTimeoutError',
     'NilveraAPIError',
+    'NilveraQueueFullError',
+    'NilveraValidationError',
 ]
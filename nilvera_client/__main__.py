@@ -0,0 +1,8 @@
+# nilvera_client/__main__.py
+# Komut Satırı Giriş Noktası - python -m nilvera_client
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
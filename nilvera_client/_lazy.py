@@ -0,0 +1,33 @@
+# nilvera_client/_lazy.py
+# Gecikmeli Import - Ağır bağımlılıklar ilk kullanımda yüklenir
+
+import importlib
+
+
+class LazyModule:
+    """
+    İlk öznitelik erişiminde gerçek modülü import eden vekil
+
+    Modül seviyesinde `requests = LazyModule('requests')` şeklinde kullanılır;
+    kod değişmeden `requests.get(...)` çağrılabilir. Testlerde
+    `patch('paket.modul.requests.get')` vekil üzerinde çalışır.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        # Yalnızca vekilde bulunmayan öznitelikler için çağrılır
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'yüklendi' if self._module is not None else 'yüklenmedi'
+        return f'<LazyModule {self._name} ({state})>'
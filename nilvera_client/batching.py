@@ -0,0 +1,121 @@
+# nilvera_client/batching.py
+# Mikro Toplama - Farklı thread'lerden gelen tekil çağrıları tek API isteğinde birleştirme
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Kısa bir zaman penceresi içinde gelen öğeleri toplayıp tek seferde işler
+
+    İlk öğe geldikten sonra en fazla `max_wait` saniye ya da `max_batch_size`
+    öğeye ulaşılana kadar beklenir, ardından handler tüm toplu listeyle bir
+    kez çağrılır. Handler her öğe için bir sonuç döndürür (aynı sırayla);
+    her çağırana kendi sonucu iletilir.
+
+    Args:
+        handler: Öğe listesi alıp aynı uzunlukta sonuç listesi döndüren fonksiyon
+        max_batch_size: Bir toplu çağrıdaki en fazla öğe sayısı
+        max_wait: İlk öğeden sonra en fazla bekleme süresi (sn)
+        name: Log ve thread adı
+
+    Kullanım:
+        >>> batcher = MicroBatcher(lambda items: [x * 2 for x in items])
+        >>> batcher.submit(21).result()
+        42
+    """
+
+    def __init__(self, handler, max_batch_size: int = 100, max_wait: float = 0.05, name: str = 'batcher'):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size en az 1 olmalı')
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item) -> Future:
+        """
+        Öğeyi bir sonraki toplu çağrıya ekler
+
+        Returns:
+            Future: Öğenin sonucu (asyncio'da asyncio.wrap_future ile beklenebilir)
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f'{self.name} kapatıldı')
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'nilvera-{self.name}', daemon=True)
+                self._thread.start()
+            self._queue.put((item, future))
+        return future
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            batch = [(item, future) for item, future in self._collect(entry)
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            self.batches += 1
+            self.items += len(items)
+            logger.debug(f"{self.name}: {len(items)} öğe tek çağrıda işleniyor")
+
+            try:
+                results = self.handler(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f'{self.name}: handler {len(items)} öğe için {len(results)} sonuç döndürdü')
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def close(self, wait: bool = True):
+        """Kuyruktaki öğeleri işleyip arka plan thread'ini durdurur"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        self._queue.put(_STOP)
+        if thread is not None and wait:
+            thread.join()
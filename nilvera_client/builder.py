@@ -0,0 +1,304 @@
+# nilvera_client/builder.py
+# Fatura Oluşturucu - Kalemleri sütun bazlı dizilerde tutar, JSON gövdesini parça parça üretir
+
+import json
+import math
+import re
+from array import array
+
+EINVOICE = 'einvoice'
+EARCHIVE = 'earchive'
+
+_ENVELOPES = {
+    EINVOICE: 'EInvoice',
+    EARCHIVE: 'ArchiveInvoice',
+}
+
+# İhracat istisnası için varsayılan vergi kodu (KDV)
+EXEMPTION_TAX_CODE = '0015'
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+_NEEDS_ESCAPE = re.compile(r'[\x00-\x1f"\\]')
+
+
+def _string(value: str) -> str:
+    """JSON string; kaçış gerektirmeyen değerlerde json.dumps çağrılmaz"""
+    if _NEEDS_ESCAPE.search(value):
+        return _dumps(value)
+    return f'"{value}"'
+
+
+class _Codes:
+    """
+    Tekrarlanan metin değerlerini (birim, GTİP, teslim şartı) tamsayı kodla saklar
+
+    Kod 0 'değer yok' anlamına gelir; JSON parçası her değer için bir kez üretilir.
+    """
+
+    def __init__(self):
+        self.index = {None: 0}
+        self.fragments = [None]
+        self.values = [None]
+
+    def code(self, value) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+            self.fragments.append(_dumps(value))
+        return code
+
+
+class InvoiceBuilder:
+    """
+    Çok kalemli faturalar için sütun bazlı oluşturucu
+
+    Kalem başına dict oluşturulmaz: sayısal alanlar array('d') dizilerinde,
+    birim / GTİP / teslim şartı gibi tekrarlanan değerler kod dizilerinde,
+    yalnızca ürün adı ve açıklaması Python string'i olarak tutulur. Toplamlar
+    (LineExtensionAmount, KdvTotal, PayableAmount) kalem eklenirken hesaplanır.
+
+    iter_json() Nilvera'nın beklediği gövdeyi ({"EInvoice": {...}, "CustomerAlias": ...}
+    veya {"ArchiveInvoice": {...}}) bellekte tamamını oluşturmadan parça
+    parça bytes olarak üretir; client bu parçaları doğrudan gönderir.
+
+    Args:
+        invoice_info: InvoiceInfo alanları (toplamlar verilmezse hesaplanır)
+        company_info: CompanyInfo alanları
+        kind: 'einvoice' veya 'earchive'
+        customer_alias: E-Fatura taslağında kullanılacak müşteri alias'ı
+        **sections: Diğer üst seviye alanlar (CustomerInfo, ExportCustomerInfo, Notes ...)
+
+    Kullanım:
+        >>> builder = InvoiceBuilder(invoice_info, company_info, ExportCustomerInfo=customer)
+        >>> for product in products:
+        ...     builder.add_line(product.name, product.qty, product.price, gtip=product.gtip,
+        ...                      delivery_term='EXW', exemption=('301', 'Mal ihracatı'))
+        >>> client.create_draft_invoice(builder)
+    """
+
+    def __init__(self, invoice_info: dict, company_info: dict, kind: str = EINVOICE,
+                 customer_alias: str = "", **sections):
+        if kind not in _ENVELOPES:
+            raise ValueError("kind 'einvoice' veya 'earchive' olmalı")
+        self.kind = kind
+        self.invoice_info = dict(invoice_info)
+        self.company_info = company_info
+        self.customer_alias = customer_alias
+        self.sections = sections
+
+        self._names = []
+        self._descriptions = []
+        self._quantity = array('d')
+        self._price = array('d')
+        self._kdv_percent = array('d')
+        self._unit = array('H')
+        self._gtip = array('I')
+        self._delivery_term = array('H')
+        self._transport_mode = array('H')
+        self._exemption = array('H')
+
+        self._units = _Codes()
+        self._gtips = _Codes()
+        self._delivery_terms = _Codes()
+        self._transport_modes = _Codes()
+        self._exemptions = _Codes()
+
+        self._line_total = 0.0
+        self._kdv_total = 0.0
+
+    def __len__(self):
+        return len(self._quantity)
+
+    @property
+    def uuid(self):
+        return self.invoice_info.get('UUID')
+
+    def add_line(self, name: str, quantity: float, price: float, unit_type: str = 'C62',
+                 kdv_percent: float = 0, description: str = None, gtip: str = None,
+                 delivery_term: str = None, transport_mode: str = None, exemption: tuple = None):
+        """
+        Fatura kalemi ekler
+
+        Args:
+            name: Ürün adı
+            quantity: Miktar
+            price: Birim fiyat
+            unit_type: Birim kodu (C62 = adet)
+            kdv_percent: KDV oranı
+            description: Açıklama (opsiyonel)
+            gtip: GTİP numarası (ihracat)
+            delivery_term: Teslim şartı kodu (EXW, FOB ...)
+            transport_mode: Taşıma şekli kodu
+            exemption: (ReasonCode, ReasonDesc) - KDV istisna nedeni
+        """
+        if not math.isfinite(quantity + price + kdv_percent):
+            raise ValueError(f'Miktar, fiyat ve KDV oranı sonlu sayı olmalı: {quantity}, {price}, {kdv_percent}')
+
+        self._names.append(str(name))
+        self._descriptions.append(description)
+        self._quantity.append(quantity)
+        self._price.append(price)
+        self._kdv_percent.append(kdv_percent)
+        self._unit.append(self._units.code(unit_type))
+        self._gtip.append(self._gtips.code(gtip))
+        self._delivery_term.append(self._delivery_terms.code(delivery_term))
+        self._transport_mode.append(self._transport_modes.code(transport_mode))
+        self._exemption.append(self._exemptions.code(tuple(exemption)) if exemption else 0)
+
+        amount = quantity * price
+        self._line_total += amount
+        self._kdv_total += round(amount * kdv_percent / 100, 2)
+
+    def add_lines(self, names, quantities, prices, unit_type='C62', kdv_percent=0,
+                  gtip=None, delivery_term=None, transport_mode=None, exemption=None):
+        """
+        Çok sayıda kalemi sütunlar halinde ekler
+
+        names, quantities ve prices aynı uzunlukta dizilerdir; diğer alanlar
+        tüm kalemler için ortak değerdir. Sayısal sütunlar doğrudan dizilere
+        aktarıldığından add_line döngüsünden belirgin şekilde hızlıdır.
+        """
+        names = [str(name) for name in names]
+        quantities = array('d', quantities)
+        prices = array('d', prices)
+        count = len(names)
+        if len(quantities) != count or len(prices) != count:
+            raise ValueError('names, quantities ve prices aynı uzunlukta olmalı')
+        if not math.isfinite(sum(quantities) + sum(prices) + kdv_percent):
+            raise ValueError('Miktar, fiyat ve KDV oranı sonlu sayı olmalı')
+
+        self._names.extend(names)
+        self._descriptions.extend([None] * count)
+        self._quantity.extend(quantities)
+        self._price.extend(prices)
+        self._kdv_percent.extend(array('d', [kdv_percent]) * count)
+        self._unit.extend(array('H', [self._units.code(unit_type)]) * count)
+        self._gtip.extend(array('I', [self._gtips.code(gtip)]) * count)
+        self._delivery_term.extend(array('H', [self._delivery_terms.code(delivery_term)]) * count)
+        self._transport_mode.extend(array('H', [self._transport_modes.code(transport_mode)]) * count)
+        self._exemption.extend(array('H', [self._exemptions.code(tuple(exemption)) if exemption else 0]) * count)
+
+        for quantity, price in zip(quantities, prices):
+            amount = quantity * price
+            self._line_total += amount
+            self._kdv_total += round(amount * kdv_percent / 100, 2)
+
+    def _header(self) -> dict:
+        info = dict(self.invoice_info)
+        line_total = round(self._line_total, 2)
+        kdv_total = round(self._kdv_total, 2)
+        info.setdefault('LineExtensionAmount', line_total)
+        info.setdefault('KdvTotal', kdv_total)
+        info.setdefault('PayableAmount', round(line_total + kdv_total, 2))
+        header = {'InvoiceInfo': info, 'CompanyInfo': self.company_info}
+        header.update(self.sections)
+        return header
+
+    def _delivery_fragment(self, gtip: int, term: int, mode: int, cache: dict) -> str:
+        key = (gtip, term, mode)
+        fragment = cache.get(key)
+        if fragment is None:
+            fields = [
+                f'"{name}":{codes.fragments[code]}'
+                for name, codes, code in (
+                    ('GTIPNo', self._gtips, gtip),
+                    ('DeliveryTermCode', self._delivery_terms, term),
+                    ('TransportModeCode', self._transport_modes, mode),
+                )
+                if code
+            ]
+            fragment = f',"DeliveryInfo":{{{",".join(fields)}}}' if fields else ''
+            cache[key] = fragment
+        return fragment
+
+    def _exemption_fragments(self) -> list:
+        """Her istisna kodu için Taxes parçasının Total öncesi ve sonrası"""
+        fragments = [None]
+        for reason in self._exemptions.values[1:]:
+            reason_code, reason_desc = reason
+            fragments.append((
+                f',"Taxes":[{{"TaxCode":"{EXEMPTION_TAX_CODE}","Total":',
+                f',"ReasonCode":{_dumps(reason_code)},"ReasonDesc":{_dumps(reason_desc)}}}]',
+            ))
+        return fragments
+
+    def _iter_lines(self, start: int, stop: int):
+        """[start, stop) aralığındaki kalemleri JSON string olarak üretir"""
+        units = self._units.fragments
+        exemptions = self._exemption_fragments()
+        delivery_cache = {}
+        columns = zip(
+            range(start + 1, stop + 1),
+            self._names[start:stop],
+            self._descriptions[start:stop],
+            self._quantity[start:stop],
+            self._price[start:stop],
+            self._kdv_percent[start:stop],
+            self._unit[start:stop],
+            self._exemption[start:stop],
+            self._gtip[start:stop],
+            self._delivery_term[start:stop],
+            self._transport_mode[start:stop],
+        )
+        for index, name, description, quantity, price, percent, unit, exemption, gtip, term, mode in columns:
+            kdv = round(quantity * price * percent / 100, 2)
+            name = _string(name)
+            description = '' if description is None else f',"Description":{_string(description)}'
+            if exemption:
+                before, after = exemptions[exemption]
+                taxes = f'{before}{kdv!r},"Percent":{percent!r}{after}'
+            else:
+                taxes = ''
+            yield (
+                f'{{"Index":"{index}","Name":{name}{description},"Quantity":{quantity!r},'
+                f'"UnitType":{units[unit]},"Price":{price!r},"KDVPercent":{percent!r},'
+                f'"KDVTotal":{kdv!r}{taxes}{self._delivery_fragment(gtip, term, mode, delivery_cache)}}}'
+            )
+
+    def iter_json(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        İstek gövdesini parça parça üretir
+
+        Yields:
+            bytes: En az chunk_size büyüklüğünde (sonuncusu daha küçük olabilir) UTF-8 parçalar
+        """
+        header = _dumps(self._header())
+        prefix = f'{{"{_ENVELOPES[self.kind]}":{header[:-1]},"InvoiceLines":['
+        buffer = [prefix]
+        size = len(prefix)
+
+        separator = ''
+        for line in self._iter_lines(0, len(self)):
+            buffer.append(separator)
+            buffer.append(line)
+            separator = ','
+            size += len(line) + 1
+            if size >= chunk_size:
+                yield ''.join(buffer).encode('utf-8')
+                buffer = []
+                size = 0
+
+        buffer.append(']}')
+        if self.kind == EINVOICE:
+            buffer.append(f',"CustomerAlias":{_dumps(self.customer_alias)}')
+        buffer.append('}')
+        yield ''.join(buffer).encode('utf-8')
+
+    def to_bytes(self) -> bytes:
+        """Tüm istek gövdesi"""
+        return b''.join(self.iter_json())
+
+    def to_dict(self) -> dict:
+        """
+        Faturayı create_draft_invoice / create_archive_invoice'ın kabul ettiği
+        dict formatında döndürür (kalemler dict olarak oluşturulur)
+        """
+        return json.loads(self.to_bytes())[_ENVELOPES[self.kind]]
@@ -0,0 +1,389 @@
+# nilvera_client/cache.py
+# Önbellek - Seri, mükellef ve kur verileri için process'ler arası paylaşılabilen önbellek
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid as uuid_lib
+from collections import OrderedDict
+
+from .singleflight import SingleFlight
+
+# get() için 'kayıt yok' işareti (None geçerli bir değer olabilir)
+MISS = object()
+
+# fork sonrası çocuk process'e geçen bağlantılar; kapatılmadan tutulur
+_inherited = []
+_open_lock = threading.Lock()
+
+
+def _always(value) -> bool:
+    return True
+
+
+class CacheBackend:
+    """
+    Önbellek arayüzü
+
+    Alt sınıflar get / set / delete / clear metotlarını uygular. get_or_set
+    varsayılan olarak kilitsizdir; paylaşılan backend'ler bunu atomik
+    doldurma (fill-on-miss) ile ezer, böylece bir anahtar aynı anda yalnızca
+    bir kez kaynaktan çekilir.
+    """
+
+    def get(self, key: str):
+        """Değer veya süresi dolmuşsa / yoksa MISS"""
+        raise NotImplementedError
+
+    def set(self, key: str, value, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_or_set(self, key: str, factory, ttl: float, cacheable=_always):
+        """
+        Önbellekte varsa değeri, yoksa factory() sonucunu döndürür
+
+        Args:
+            key: Anahtar
+            factory: Değeri üreten fonksiyon (ör. API çağrısı)
+            ttl: Geçerlilik süresi (sn)
+            cacheable: Sonucun saklanıp saklanmayacağına karar verir
+                (ör. yalnızca başarılı yanıtlar)
+        """
+        value = self.get(key)
+        if value is not MISS:
+            return value
+        value = factory()
+        if cacheable(value):
+            self.set(key, value, ttl)
+        return value
+
+    def close(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    Tek process içinde LRU önbellek
+
+    Aynı anahtar için eşzamanlı kaçırmalar SingleFlight ile tek çağrıda
+    birleştirilir.
+
+    Args:
+        max_entries: En fazla kayıt sayısı (aşılınca en az kullanılan silinir)
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flight = SingleFlight()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return MISS
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_set(self, key: str, factory, ttl: float, cacheable=_always):
+        value = self.get(key)
+        if value is not MISS:
+            return value
+
+        def fill():
+            value = self.get(key)
+            if value is MISS:
+                value = factory()
+                if cacheable(value):
+                    self.set(key, value, ttl)
+            return value
+
+        return self._flight.do(key, fill)[0]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Aynı makinedeki tüm process'lerin paylaştığı SQLite (WAL) önbelleği
+
+    gunicorn gibi çok process'li sunucularda her worker aynı dosyayı açar;
+    bir veri makine başına bir kez çekilir ve bir kez saklanır. Değerler
+    JSON olarak tutulur.
+
+    Doldurma atomiktir: bir anahtarı kaçıran ilk çağıran (process veya
+    thread) 'fills' tablosuna kısa süreli bir kira kaydı yazar ve kaynağı
+    çağırır; diğerleri yeni istek atmak yerine değerin yazılmasını bekler.
+    Kira sahibi hata alırsa ya da sonuç saklanmazsa kira silinir ve bekleyen
+    bir sonraki çağıran kaynağı kendisi dener. Ölen bir process'in kirası
+    lease_timeout sonunda geçersiz sayılır.
+
+    Boyut sınırı aşıldığında önce süresi dolmuş kayıtlar, ardından en eski
+    yazılan kayıtlar silinir (okumalar veritabanına yazmaz).
+
+    Args:
+        path: SQLite dosyası
+        max_bytes: Değerlerin toplam boyut sınırı
+        lease_timeout: Doldurma kirasının geçerlilik süresi (sn)
+        poll_interval: Bekleyenlerin değeri yoklama aralığı (sn)
+
+    Kullanım:
+        >>> cache = SQLiteCache('/var/cache/nilvera/cache.db')
+        >>> client = NilveraClient(api_key='...', cache=cache)
+        >>> TCMBCurrencyService.cache = cache
+    """
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024,
+                 lease_timeout: float = 30, poll_interval: float = 0.05):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._instance = uuid_lib.uuid4().hex
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Bu process'e ait bağlantı
+
+        Bağlantı ilk kullanımda açılır. fork sonrası çocuk process ebeveynin
+        bağlantısını kullanmaz (ve kapatmaz); kendi bağlantısını ve kilidini
+        oluşturur.
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            with _open_lock:
+                if self._pid != pid:
+                    if self._conn is not None:
+                        _inherited.append(self._conn)
+                    self._lock = threading.Lock()
+                    self._conn = self._open()
+                    self._pid = pid
+        return self._conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+            'stored_at REAL NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS fills ('
+            'key TEXT PRIMARY KEY, owner TEXT NOT NULL, started_at REAL NOT NULL) WITHOUT ROWID'
+        )
+        # Toplam boyut her yazmada SUM ile hesaplanmaz; tek satırda tutulur
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_size ('
+            'id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)'
+        )
+        conn.execute(
+            'INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM cache'
+        )
+        return conn
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def get(self, key: str):
+        conn = self._connection()
+        with self._lock:
+            row = conn.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        if row is None:
+            return MISS
+        return json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float):
+        raw = self._encode(value)
+        conn = self._connection()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._store(conn, key, raw, ttl)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, where: str, params=()) -> int:
+        """Açık bir yazma transaction'ı içinde kayıtları siler ve toplamı günceller"""
+        freed = conn.execute(f'SELECT COALESCE(SUM(size), 0) FROM cache WHERE {where}', params).fetchone()[0]
+        if freed:
+            conn.execute(f'DELETE FROM cache WHERE {where}', params)
+            conn.execute('UPDATE cache_size SET total = total - ? WHERE id = 0', (freed,))
+        return freed
+
+    def _store(self, conn: sqlite3.Connection, key: str, raw: bytes, ttl: float):
+        """Açık bir yazma transaction'ı içinde kaydı yazar ve boyut sınırını uygular"""
+        now = time.time()
+        old = conn.execute('SELECT size FROM cache WHERE key = ?', (key,)).fetchone()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, size, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+            (key, raw, len(raw), now, now + ttl)
+        )
+        conn.execute(
+            'UPDATE cache_size SET total = total + ? WHERE id = 0', (len(raw) - (old[0] if old else 0),)
+        )
+        total = conn.execute('SELECT total FROM cache_size WHERE id = 0').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        total -= self._delete(conn, 'expires_at <= ?', (now,))
+        for old_key, size in conn.execute(
+                'SELECT key, size FROM cache WHERE key != ? ORDER BY stored_at', (key,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            total -= self._delete(conn, 'key = ?', (old_key,))
+
+    def delete(self, key: str):
+        conn = self._connection()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._delete(conn, 'key = ?', (key,))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def clear(self):
+        conn = self._connection()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('DELETE FROM cache')
+                conn.execute('DELETE FROM fills')
+                conn.execute('UPDATE cache_size SET total = 0 WHERE id = 0')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _acquire(self, key: str, token: str):
+        """
+        Doldurma kirasını almayı dener
+
+        Returns:
+            tuple: (değer veya MISS, kira alındı mı)
+        """
+        now = time.time()
+        conn = self._connection()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute('COMMIT')
+                    return json.loads(row[0]), False
+                lease = conn.execute(
+                    'SELECT started_at FROM fills WHERE key = ?', (key,)
+                ).fetchone()
+                if lease is not None and now - lease[0] < self.lease_timeout:
+                    conn.execute('COMMIT')
+                    return MISS, False
+                conn.execute(
+                    'INSERT OR REPLACE INTO fills (key, owner, started_at) VALUES (?, ?, ?)',
+                    (key, token, now)
+                )
+                conn.execute('COMMIT')
+                return MISS, True
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _finish(self, key: str, token: str, raw: bytes = None, ttl: float = None):
+        """Kirayı bırakır; raw verilmişse değeri aynı transaction'da yazar"""
+        conn = self._connection()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if raw is not None:
+                    self._store(conn, key, raw, ttl)
+                conn.execute('DELETE FROM fills WHERE key = ? AND owner = ?', (key, token))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def get_or_set(self, key: str, factory, ttl: float, cacheable=_always):
+        value = self.get(key)
+        if value is not MISS:
+            return value
+
+        # Kira sahibi process, örnek ve thread ile tanımlanır (fork sonrası da ayrışır)
+        token = f'{os.getpid()}:{self._instance}:{threading.get_ident()}'
+        deadline = time.time() + self.lease_timeout
+        while True:
+            value, owner = self._acquire(key, token)
+            if value is not MISS:
+                return value
+            if owner:
+                break
+            if time.time() >= deadline:
+                # Kira sahibi yanıt vermiyor; beklemeden kaynağa gidilir
+                return factory()
+            time.sleep(self.poll_interval)
+
+        try:
+            value = factory()
+            raw = self._encode(value) if cacheable(value) else None
+        except BaseException:
+            self._finish(key, token)
+            raise
+        self._finish(key, token, raw, ttl)
+        return value
+
+    def __len__(self):
+        conn = self._connection()
+        with self._lock:
+            return conn.execute(
+                'SELECT COUNT(*) FROM cache WHERE expires_at > ?', (time.time(),)
+            ).fetchone()[0]
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+            self._pid = None
@@ -0,0 +1,270 @@
+# nilvera_client/cassette.py
+# Kayıt/Tekrar Oynatma Transport'ları - Ağ ve API anahtarı olmadan deterministik testler
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode
+
+from .exceptions import NilveraConnectionError, NilveraTimeoutError
+from .transport import BaseTransport, TransportResponse, TIMEOUT_MESSAGE, CONNECTION_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+SENSITIVE_HEADERS = frozenset([
+    'authorization',
+    'proxy-authorization',
+    'cookie',
+    'set-cookie',
+    'x-api-key',
+])
+
+REDACTED = '***'
+
+# Kaydedilmeyen, gürültü üreten header'lar
+_SKIPPED_RESPONSE_HEADERS = frozenset(['date', 'server', 'connection', 'keep-alive', 'transfer-encoding'])
+
+# Gövde çözülmüş haliyle saklandığından sıkıştırma ve uzunluk header'ları
+# kayıtla uyuşmaz; kaydedilmez, eski kasetlerde de oynatılmaz
+_BODY_HEADERS = frozenset(['content-encoding', 'content-length'])
+
+
+def redact_headers(headers) -> dict:
+    """Hassas header değerlerini maskeler"""
+    if not headers:
+        return {}
+    return {
+        key: (REDACTED if key.lower() in SENSITIVE_HEADERS else value)
+        for key, value in dict(headers).items()
+    }
+
+
+def canonical_params(params) -> str:
+    """Query parametrelerini sıralı ve karşılaştırılabilir hale getirir"""
+    if not params:
+        return ''
+    items = params.items() if isinstance(params, dict) else params
+    return urlencode(sorted((str(k), str(v)) for k, v in items if v is not None))
+
+
+def body_fingerprint(json_body=None, data=None):
+    """
+    İstek gövdesinin özetini üretir
+
+    JSON gövdeler anahtar sırasından bağımsız olarak kanonik hale getirilir,
+    böylece farklı client sürümlerinin ürettiği aynı içerik eşleşir.
+    """
+    if json_body is not None:
+        raw = json.dumps(json_body, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    elif data is None:
+        return None
+    else:
+        raw = data if isinstance(data, (bytes, bytearray)) else (
+            data.encode('utf-8') if isinstance(data, str) else b''.join(data)
+        )
+        try:
+            raw = json.dumps(json.loads(raw), sort_keys=True, separators=(',', ':'),
+                             ensure_ascii=False).encode('utf-8')
+        except ValueError:
+            pass
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'b64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if 'b64' in entry:
+        return base64.b64decode(entry['b64'])
+    return entry.get('text', '').encode('utf-8')
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def load_cassette(path: str) -> list:
+    """
+    Kaset dosyasını okur
+
+    Returns:
+        list: Kayıt sırasına göre istek/yanıt kayıtları
+    """
+    entries = []
+    with _open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    return entries
+
+
+class RecordingTransport(BaseTransport):
+    """
+    Başka bir transport'u saran ve tüm istek/yanıt çiftlerini kasete yazan transport
+
+    Kaset JSON Lines formatındadır (.gz uzantısı verilirse gzip ile sıkıştırılır).
+    Authorization gibi hassas header'lar maskelenir, istek gövdesinin yalnızca
+    özeti saklanır.
+
+    Kullanım:
+        >>> transport = RecordingTransport(RequestsTransport(), 'trafik.jsonl.gz')
+        >>> client = NilveraClient(api_key='...', transport=transport)
+    """
+
+    def __init__(self, inner: BaseTransport, path: str):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = _open(path, 'a')
+        self._started = time.monotonic()
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None):
+        if data is not None and not isinstance(data, (bytes, bytearray, str)):
+            # Akış gövdeleri bir kez tüketilebilir; özet için belleğe alınır
+            data = b''.join(data)
+
+        offset = time.monotonic() - self._started
+        start = time.perf_counter()
+        entry = {
+            't': round(offset, 6),
+            'method': method.upper(),
+            'url': url,
+            'params': canonical_params(params),
+            'body': body_fingerprint(json, data),
+        }
+
+        try:
+            response = self.inner.request(method, url, params=params, json=json, data=data,
+                                          headers=headers, timeout=timeout)
+        except NilveraTimeoutError:
+            entry.update(elapsed=round(time.perf_counter() - start, 6), error='timeout')
+            self._write(entry)
+            raise
+        except NilveraConnectionError:
+            entry.update(elapsed=round(time.perf_counter() - start, 6), error='connection')
+            self._write(entry)
+            raise
+
+        sent_headers = getattr(getattr(response, 'request', None), 'headers', None) or headers
+        entry.update(
+            elapsed=round(time.perf_counter() - start, 6),
+            request_headers=redact_headers(sent_headers),
+            status=response.status_code,
+            headers={
+                k: v for k, v in redact_headers(response.headers).items()
+                if k.lower() not in _SKIPPED_RESPONSE_HEADERS and k.lower() not in _BODY_HEADERS
+            },
+            **_encode_body(response.content)
+        )
+        self._write(entry)
+        return response
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.inner.close()
+
+
+class ReplayTransport(BaseTransport):
+    """
+    Kasetteki yanıtları ağa çıkmadan tekrar oynatan transport
+
+    Args:
+        path: Kaset dosyası
+        timing: 'fast' (beklemeden) veya 'original' (kayıttaki zamanlamayla)
+        speed: 'original' modunda hız çarpanı (2.0 = iki kat hızlı)
+        match_body: False ise istek gövdesi eşleşmede dikkate alınmaz
+        loop: True ise tükenen bir isteğin kayıtları baştan tekrar kullanılır
+
+    'original' modunda her yanıt, oynatmanın başladığı andan (ilk istek)
+    itibaren kaydın zaman damgası (t) ile yanıt süresinin toplamı kadar
+    sonra döner; yanıt en az kaydedilen yanıt süresi kadar bekletilir.
+
+    Aynı istek birden çok kez kaydedildiyse yanıtlar kayıt sırasıyla döner.
+    Eşleşen kayıt yoksa NilveraConnectionError fırlatılır.
+    """
+
+    def __init__(self, path: str, timing: str = 'fast', speed: float = 1.0,
+                 match_body: bool = True, loop: bool = False):
+        if timing not in ('fast', 'original'):
+            raise ValueError("timing 'fast' veya 'original' olmalı")
+        self.path = path
+        self.timing = timing
+        self.speed = speed
+        self.match_body = match_body
+        self.loop = loop
+        self.entries = load_cassette(path)
+        self._lock = threading.Lock()
+        self._started = None
+        self._origin = min((entry.get('t', 0) for entry in self.entries), default=0)
+        self._recorded = {}
+        for entry in self.entries:
+            key = self._key(entry['method'], entry['url'], entry.get('params', ''), entry.get('body'))
+            self._recorded.setdefault(key, []).append(entry)
+        self._queues = {key: deque(entries) for key, entries in self._recorded.items()}
+
+    def _key(self, method, url, params, body):
+        return (method.upper(), url, params, body if self.match_body else None)
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None):
+        if data is not None and not isinstance(data, (bytes, bytearray, str)):
+            data = b''.join(data)
+        key = self._key(method, url, canonical_params(params), body_fingerprint(json, data))
+
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+            queue = self._queues.get(key)
+            if not queue and self.loop and key in self._recorded:
+                # Yalnızca tükenen isteğin kayıtları başa sarılır
+                queue = self._queues[key] = deque(self._recorded[key])
+            entry = queue.popleft() if queue else None
+
+        if entry is None:
+            logger.debug(f"Kasette eşleşen kayıt yok: {method} {url}")
+            raise NilveraConnectionError(f'Kasette eşleşen kayıt yok: {method.upper()} {url}')
+
+        if self.timing == 'original':
+            elapsed = entry.get('elapsed') or 0
+            due = self._started + (entry.get('t', self._origin) - self._origin + elapsed) / self.speed
+            delay = max(elapsed / self.speed, due - time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+
+        error = entry.get('error')
+        if error == 'timeout':
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        if error == 'connection':
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+
+        headers = {
+            k: v for k, v in (entry.get('headers') or {}).items() if k.lower() not in _BODY_HEADERS
+        }
+        return TransportResponse(entry['status'], headers, _decode_body(entry), url=url)
+
+    @property
+    def remaining(self) -> int:
+        """Henüz oynatılmamış kayıt sayısı"""
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
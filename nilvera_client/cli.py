@@ -0,0 +1,579 @@
+# nilvera_client/cli.py
+# Komut Satırı - Toplu gönderim, doküman dışa aktarma, gelen fatura senkronizasyonu, mutabakat, UBL çıkarma ve kur doldurma
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid as uuid_lib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from .exceptions import NilveraException
+
+logger = logging.getLogger(__name__)
+
+# CSV'de sayıya çevrilecek alanlar; diğer sütunlar (vergi no, seri vb.) metin kalır
+_NUMERIC_FIELDS = {
+    'Quantity', 'Price', 'KDVPercent', 'KDVTotal',
+    'LineExtensionAmount', 'KdvTotal', 'PayableAmount', 'ExchangeRate',
+}
+
+
+# ==================== Girdi ====================
+
+def _open_input(path: str):
+    if path == '-':
+        return nullcontext(sys.stdin)
+    return open(path, 'r', encoding='utf-8-sig', newline='')
+
+
+def iter_jsonl(stream, skip_invalid: bool = False):
+    """
+    Boş olmayan her satırı JSON olarak üretir
+
+    Args:
+        stream: Metin akışı
+        skip_invalid: True ise JSON olmayan satırda durmak yerine o satır
+            için ValueError örneği üretilir
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            error = ValueError(f'{number}. satır JSON değil: {e}')
+            if not skip_invalid:
+                raise error from None
+            yield error
+
+
+def _csv_value(field: str, value: str):
+    if field in _NUMERIC_FIELDS and value != '':
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def iter_csv_invoices(stream):
+    """
+    Kalem başına bir satır içeren CSV'den fatura üretir
+
+    Sütunlar 'Bölüm.Alan' biçimindedir: InvoiceInfo.*, CompanyInfo.*,
+    CustomerInfo.*, ExportCustomerInfo.* ve kalem alanları için Line.*
+    (Line.DeliveryInfo.GTIPNo gibi iç içe alanlar da yazılabilir). Art arda
+    gelen ve aynı InvoiceInfo.UUID (yoksa InvoiceInfo.InvoiceSerieOrNumber)
+    değerini taşıyan satırlar tek faturanın kalemleridir; dosyanın tamamı
+    belleğe alınmaz. Boş hücreler atlanır.
+    """
+    reader = csv.DictReader(stream)
+    current_key = None
+    invoice = None
+    for row in reader:
+        key = row.get('InvoiceInfo.UUID') or row.get('InvoiceInfo.InvoiceSerieOrNumber') or None
+        if invoice is None or key is None or key != current_key:
+            if invoice is not None:
+                yield invoice
+            invoice = {'InvoiceLines': []}
+            current_key = key
+            header_row = True
+        else:
+            header_row = False
+
+        line = {}
+        for column, value in row.items():
+            if not column or value is None or value == '':
+                continue
+            section, _, path = column.partition('.')
+            if not path:
+                continue
+            if section == 'Line':
+                target = line
+            elif header_row:
+                target = invoice.setdefault(section, {})
+            else:
+                continue
+            *parents, field = path.split('.')
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[field] = _csv_value(field, value)
+        if line:
+            line.setdefault('Index', str(len(invoice['InvoiceLines']) + 1))
+            invoice['InvoiceLines'].append(line)
+
+    if invoice is not None:
+        yield invoice
+
+
+def _iter_uuids(stream):
+    """Satır başına bir UUID veya 'uuid' / 'UUID' alanlı JSON satırları"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            record = json.loads(line)
+            line = record.get('uuid') or record.get('UUID')
+            if not line:
+                continue
+        yield line
+
+
+# ==================== Çalıştırma ====================
+
+class Progress:
+    """stderr'e işlenen kayıt sayısı ve throughput yazar"""
+
+    def __init__(self, enabled: bool = True, interval: float = 0.5):
+        self.enabled = enabled
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, ok: bool):
+        self.done += 1
+        if not ok:
+            self.failed += 1
+        now = time.perf_counter()
+        if self.enabled and now - self._last >= self.interval:
+            self._last = now
+            self._print(end='')
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed else 0.0
+
+    def _print(self, end):
+        print(f'\r{self.done} kayıt, {self.failed} hata, {self.rate:.1f} kayıt/sn',
+              end=end, file=sys.stderr, flush=True)
+
+    def finish(self):
+        if self.enabled:
+            self._print(end='\n')
+        return {
+            'processed': self.done,
+            'failed': self.failed,
+            'seconds': round(time.perf_counter() - self.started, 3),
+            'per_second': round(self.rate, 3),
+        }
+
+
+def run_stream(items, operation, output, concurrency: int = 4, progress: Progress = None):
+    """
+    Girdiyi sınırlı sayıda eşzamanlı işle işler, sonuçları JSONL olarak yazar
+
+    En fazla 2 * concurrency kayıt aynı anda bellekte bulunur; sonuçlar
+    girdi sırasıyla yazılır.
+
+    Args:
+        items: Kayıt üreteci
+        operation: Kayıt -> sonuç dict
+        output: Yazılabilir metin akışı
+        concurrency: Eşzamanlı iş sayısı
+        progress: İlerleme göstergesi
+
+    Returns:
+        dict: Özet (işlenen, hatalı, süre, saniyedeki kayıt)
+    """
+    progress = progress or Progress(enabled=False)
+    lock = threading.Lock()
+
+    def write(result):
+        with lock:
+            output.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+            progress.update(bool(result.get('success')))
+
+    def safe(item):
+        try:
+            return operation(item)
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    if concurrency <= 1:
+        for item in items:
+            write(safe(item))
+    else:
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='nilvera-cli') as executor:
+            for item in items:
+                pending.append(executor.submit(safe, item))
+                if len(pending) >= concurrency * 2:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+
+    output.flush()
+    return progress.finish()
+
+
+# ==================== Komutlar ====================
+
+def _send(client, args):
+    kind = args.kind
+
+    def operation(invoice):
+        if isinstance(invoice, ValueError):
+            # Ayrıştırılamayan satır kaydedilir, gönderim sürer
+            return {'success': False, 'error': str(invoice)}
+        info = invoice.setdefault('InvoiceInfo', {})
+        info.setdefault('UUID', str(uuid_lib.uuid4()))
+        invoice_uuid = info['UUID']
+        if kind == 'earchive':
+            result = client.create_archive_invoice(invoice)
+        else:
+            result = client.create_draft_invoice(invoice, customer_alias=args.customer_alias)
+        record = {'uuid': invoice_uuid, 'success': bool(result.get('success'))}
+        if result.get('deduplicated'):
+            record['uuid'] = result['uuid']
+            record['deduplicated'] = True
+        elif result.get('in_progress'):
+            record['uuid'] = result['uuid']
+            record['in_progress'] = True
+        if not record['success']:
+            record['error'] = result.get('error')
+            if 'validation_errors' in result:
+                record['validation_errors'] = result['validation_errors']
+            return record
+
+        if args.confirm:
+            if kind == 'earchive':
+                confirmed = client.submit_confirm_and_send_archive_draft(record['uuid']).result()
+            else:
+                confirmed = client.submit_confirm_and_send_draft(record['uuid'], args.alias).result()
+            record['confirmed'] = bool(confirmed.get('success'))
+            if not record['confirmed']:
+                record['success'] = False
+                record['error'] = confirmed.get('error')
+        return record
+
+    with _open_input(args.input) as stream:
+        if args.format == 'csv' or (args.format is None and args.input.lower().endswith('.csv')):
+            invoices = iter_csv_invoices(stream)
+        else:
+            invoices = iter_jsonl(stream, skip_invalid=True)
+        return _run(args, invoices, operation)
+
+
+def _export(client, args):
+    os.makedirs(args.dir, exist_ok=True)
+    download = {
+        'pdf': client.get_invoice_pdf,
+        'html': client.get_invoice_html,
+        'xml': client.get_invoice_xml,
+    }[args.doc_format]
+
+    def operation(invoice_uuid):
+        path = os.path.join(args.dir, f'{invoice_uuid}.{args.doc_format}')
+        if args.skip_existing and os.path.exists(path):
+            return {'uuid': invoice_uuid, 'success': True, 'path': path, 'skipped': True}
+        try:
+            result = download(invoice_uuid)
+        except NilveraException as e:
+            return {'uuid': invoice_uuid, 'success': False, 'error': str(e)}
+        tmp_path = path + '.part'
+        with open(tmp_path, 'wb') as f:
+            f.write(result['data'])
+        os.replace(tmp_path, path)
+        return {'uuid': invoice_uuid, 'success': True, 'path': path, 'size': result['size']}
+
+    with _open_input(args.input) as stream:
+        return _run(args, _iter_uuids(stream), operation)
+
+
+def _sync_incoming(client, args):
+    def operation(invoice):
+        record = {'uuid': invoice.get('UUID'), 'success': True, 'invoice': invoice}
+        if args.details and record['uuid']:
+            details = client.get_incoming_invoice_details(record['uuid'])
+            record['success'] = bool(details.get('success'))
+            if record['success']:
+                record['details'] = details.get('data')
+            else:
+                record['error'] = details.get('error')
+        return record
+
+    invoices = client.iter_incoming_invoices(start_date=args.start, end_date=args.end,
+                                             page_size=args.page_size)
+    return _run(args, invoices, operation)
+
+
+def _poll(client, args):
+    def operation(invoice_uuid):
+        status = client.get_invoice_status(invoice_uuid)
+        record = {'uuid': invoice_uuid, 'success': bool(status.get('success')), 'status': status.get('data')}
+        if not record['success']:
+            record['error'] = status.get('error')
+        if args.gtb and record['success']:
+            gtb = client.check_from_gtb(invoice_uuid)
+            record['gtb'] = gtb.get('data') if gtb.get('success') else None
+        return record
+
+    with _open_input(args.input) as stream:
+        return _run(args, _iter_uuids(stream), operation)
+
+
+def _reconcile(client, args):
+    from .reconcile import Reconciler
+
+    field_map = dict(item.split('=', 1) for item in args.field_map or [])
+    options = {'tolerance': args.tolerance, 'field_map': field_map}
+    if args.amount_field:
+        options['amount_fields'] = args.amount_field
+
+    started = time.perf_counter()
+    with _open_input(args.ledger) as stream:
+        fmt = args.format or ('csv' if args.ledger.lower().endswith('.csv') else 'jsonl')
+        records = csv.DictReader(stream) if fmt == 'csv' else iter_jsonl(stream)
+        reconciler = Reconciler(records, **options)
+    reconciler.feed_all(client.iter_sale_invoices(start_date=args.start, end_date=args.end,
+                                                  page_size=args.page_size))
+    report = reconciler.report()
+
+    # Yalnızca farklar yazılır; özet stderr'e gider
+    output = _open_output(args.output)
+    try:
+        for record in report.missing:
+            output.write(json.dumps({'type': 'missing', 'ledger': record}, ensure_ascii=False, default=str) + '\n')
+        for remote in report.extra:
+            output.write(json.dumps({'type': 'extra', 'remote': remote}, ensure_ascii=False, default=str) + '\n')
+        for mismatch in report.mismatched:
+            record = dict(mismatch.to_dict(), type='mismatched')
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        for duplicate in report.duplicates:
+            output.write(json.dumps(dict(duplicate, type='duplicate'), ensure_ascii=False, default=str) + '\n')
+        output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    summary = report.summary()
+    summary['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return (0 if report.success else 1), summary
+
+
+def _backfill_rates(args):
+    from .rate_store import backfill
+
+    progress = Progress(enabled=not args.quiet)
+    last = [0]
+
+    def report(done, total):
+        for _ in range(done - last[0]):
+            progress.update(True)
+        last[0] = done
+
+    result = backfill(
+        args.path, args.start, args.end,
+        currencies=args.currencies.split(',') if args.currencies else None,
+        workers=args.concurrency,
+        progress=report
+    )
+    summary = progress.finish()
+    output = _open_output(args.output)
+    try:
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0 if result['success'] else 1, summary
+
+
+def _extract(args):
+    from .ubl import DEFAULT_FIELDS, UBLExtractor, iter_xml_files
+
+    fields = dict(DEFAULT_FIELDS)
+    if args.fields:
+        names = [name.strip() for name in args.fields.split(',') if name.strip()]
+        unknown = [name for name in names if name not in fields]
+        if unknown:
+            raise SystemExit(f"Bilinmeyen alan: {', '.join(unknown)} (özel alanlar için --field AD=YOL)")
+        fields = {name: fields[name] for name in names}
+    for item in args.field or []:
+        name, _, path = item.partition('=')
+        fields[name] = path
+
+    def sources():
+        for path in args.input:
+            if path == '-':
+                yield from (line.strip() for line in sys.stdin if line.strip())
+            elif os.path.isdir(path):
+                yield from iter_xml_files(path)
+            else:
+                yield path
+
+    extractor = UBLExtractor(fields=fields, line_fields=args.lines or None, workers=args.workers)
+    # CSV başlığı tekrar yazılmasın diye dosya her seferinde baştan yazılır
+    output = sys.stdout if not args.output or args.output == '-' else \
+        open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        summary = extractor.to_csv(sources(), output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return (0 if summary['success'] else 1), summary
+
+
+def _open_output(path):
+    if not path or path == '-':
+        return sys.stdout
+    return open(path, 'a', encoding='utf-8')
+
+
+def _run(args, items, operation):
+    output = _open_output(args.output)
+    try:
+        summary = run_stream(items, operation, output, concurrency=args.concurrency,
+                             progress=Progress(enabled=not args.quiet))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return (1 if summary['failed'] else 0), summary
+
+
+def _make_client(args):
+    from .client import NilveraClient
+
+    api_key = args.api_key or os.environ.get('NILVERA_API_KEY')
+    if not api_key:
+        raise SystemExit('API anahtarı gerekli: --api-key veya NILVERA_API_KEY')
+
+    options = {
+        'pool_maxsize': max(args.concurrency, 10),
+        'validate': getattr(args, 'validate', False),
+    }
+    if args.url:
+        options['test_url' if args.environment == 'test' else 'production_url'] = args.url
+    if getattr(args, 'confirm', False):
+        options['confirm_batch_size'] = min(args.concurrency, 50)
+    if getattr(args, 'dedup', None):
+        from .dedup import DedupIndex
+        options['dedup_index'] = DedupIndex(args.dedup)
+    if getattr(args, 'document_cache', None):
+        from .document_cache import DocumentCache
+        options['document_cache'] = DocumentCache(args.document_cache)
+    return NilveraClient(api_key=api_key, environment=args.environment, **options)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m nilvera_client',
+                                     description='Nilvera toplu işlemler')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--concurrency', type=int, default=4, help='Eşzamanlı istek sayısı')
+    common.add_argument('--output', '-o', help='Sonuç JSONL dosyası (varsayılan: stdout, dosyaya eklenir)')
+    common.add_argument('--quiet', '-q', action='store_true', help='İlerleme gösterme')
+
+    api = argparse.ArgumentParser(add_help=False, parents=[common])
+    api.add_argument('--api-key', help='API anahtarı (varsayılan: NILVERA_API_KEY)')
+    api.add_argument('--environment', default='test', choices=['test', 'production'])
+    api.add_argument('--url', help='Özel API adresi')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    send = commands.add_parser('send', parents=[api], help='JSONL / CSV dosyasındaki faturaları gönder')
+    send.add_argument('input', help="Girdi dosyası ('-' = stdin)")
+    send.add_argument('--format', choices=['jsonl', 'csv'], help='Girdi biçimi (varsayılan: uzantıdan)')
+    send.add_argument('--kind', default='einvoice', choices=['einvoice', 'earchive'])
+    send.add_argument('--customer-alias', default='', help='E-Fatura müşteri alias\'ı')
+    send.add_argument('--confirm', action='store_true', help='Taslakları onaylayıp gönder')
+    send.add_argument('--alias', default='urn:mail:ihracatpk@gtb.gov.tr', help='Onaylama alias\'ı')
+    send.add_argument('--validate', action='store_true', help='Göndermeden önce yerel doğrula')
+    send.add_argument('--dedup', help='Mükerrer gönderim indeksi (yeniden çalıştırmalar için)')
+
+    export = commands.add_parser('export', parents=[api], help='Fatura dokümanlarını indir')
+    export.add_argument('input', help="UUID listesi ('-' = stdin; satır başına UUID veya JSONL)")
+    export.add_argument('--dir', required=True, help='Hedef dizin')
+    export.add_argument('--doc-format', default='pdf', choices=['pdf', 'html', 'xml'])
+    export.add_argument('--skip-existing', action='store_true', help='Dizinde olan dosyaları atla')
+    export.add_argument('--document-cache', help='Doküman önbelleği dizini')
+
+    sync = commands.add_parser('sync-incoming', parents=[api], help='Gelen faturaları JSONL olarak aktar')
+    sync.add_argument('--start', help='Başlangıç tarihi (ISO)')
+    sync.add_argument('--end', help='Bitiş tarihi (ISO)')
+    sync.add_argument('--page-size', type=int, default=500)
+    sync.add_argument('--details', action='store_true', help='Her fatura için detay da çek')
+
+    poll = commands.add_parser('poll', parents=[api], help='Fatura durumlarını sorgula')
+    poll.add_argument('input', help="UUID listesi ('-' = stdin)")
+    poll.add_argument('--gtb', action='store_true', help='GTB tescil durumunu da sorgula')
+
+    rec = commands.add_parser('reconcile', parents=[api], help='Defteri giden faturalarla karşılaştır')
+    rec.add_argument('ledger', help="Defter dosyası (JSONL / CSV, '-' = stdin)")
+    rec.add_argument('--format', choices=['jsonl', 'csv'], help='Girdi biçimi (varsayılan: uzantıdan)')
+    rec.add_argument('--start', help='Başlangıç tarihi (ISO)')
+    rec.add_argument('--end', help='Bitiş tarihi (ISO)')
+    rec.add_argument('--page-size', type=int, default=500)
+    rec.add_argument('--tolerance', type=float, default=0.01, help='Tutar farkı toleransı')
+    rec.add_argument('--amount-field', action='append', help='Karşılaştırılacak tutar alanı (tekrarlanabilir)')
+    rec.add_argument('--field-map', action='append', metavar='NILVERA=DEFTER',
+                     help='Defterdeki farklı alan adı (ör. InvoiceNumber=fatura_no)')
+
+    extract = commands.add_parser('extract', parents=[common], help='UBL XML dosyalarından CSV üret')
+    extract.add_argument('input', nargs='+', help="XML dosyaları / dizinleri ('-' = stdin'den yol listesi)")
+    extract.add_argument('--fields', help='Virgülle ayrılmış başlık alanları (varsayılan: tümü)')
+    extract.add_argument('--field', action='append', metavar='AD=YOL',
+                         help='Ek alan (ör. Note=Note, OrderID=OrderReference/ID)')
+    extract.add_argument('--lines', action='store_true', help='Kalem başına bir satır yaz')
+    extract.add_argument('--workers', type=int, help='Process sayısı (varsayılan: CPU sayısı)')
+
+    rates = commands.add_parser('backfill-rates', parents=[common], help='TCMB kur deposunu doldur')
+    rates.add_argument('--path', required=True, help='Depo dosyası')
+    rates.add_argument('--start', required=True, help='İlk gün (YYYY-MM-DD)')
+    rates.add_argument('--end', help='Son gün (varsayılan: bugün)')
+    rates.add_argument('--currencies', help='Virgülle ayrılmış para birimleri (varsayılan: tümü)')
+
+    return parser
+
+
+_COMMANDS = {
+    'send': _send,
+    'export': _export,
+    'sync-incoming': _sync_incoming,
+    'poll': _poll,
+    'reconcile': _reconcile,
+}
+
+
+def main(argv=None) -> int:
+    """
+    Komut satırı:
+        python -m nilvera_client send faturalar.jsonl --concurrency 8 -o sonuc.jsonl
+        python -m nilvera_client send faturalar.csv --confirm --dedup dedup.db
+        python -m nilvera_client export uuids.txt --dir pdf/ --doc-format pdf
+        python -m nilvera_client sync-incoming --start 2026-01-01T00:00:00.000Z -o gelen.jsonl
+        python -m nilvera_client poll uuids.txt --gtb
+        python -m nilvera_client reconcile defter.csv --start 2026-01-01T00:00:00.000Z -o farklar.jsonl
+        python -m nilvera_client extract xml/ --lines -o muhasebe.csv
+        python -m nilvera_client backfill-rates --path kurlar.bin --start 2020-01-01
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == 'backfill-rates':
+            code, summary = _backfill_rates(args)
+        elif args.command == 'extract':
+            code, summary = _extract(args)
+        else:
+            client = _make_client(args)
+            try:
+                code, summary = _COMMANDS[args.command](client, args)
+            finally:
+                client.close()
+    except (NilveraException, ValueError, OSError, csv.Error) as e:
+        # Girdi akışı (ör. gelen fatura sayfaları) yarıda kesildi, dosya
+        # okunamadı / yazılamadı veya girdi çözülemedi
+        print(f'Hata: {e}', file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return code
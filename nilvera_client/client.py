@@ -2,17 +2,143 @@
 # Nilvera REST API Client - İhracat E-Fatura Entegrasyonu
 
 import requests
+import contextvars
 import json
-import uuid
+import functools
+import hashlib
 import logging
+import queue
+import threading
+import uuid as uuid_lib
 from datetime import datetime
-from .exceptions import NilveraConnectionError, NilveraTimeoutError, NilveraAPIError
+from typing import TYPE_CHECKING
+from .exceptions import (
+    NilveraException, NilveraConnectionError, NilveraTimeoutError, NilveraAPIError, NilveraQueueFullError,
+    NilveraValidationError
+)
+from .transport import BaseTransport, RequestsTransport, create_transport, keepalive_socket_options
+from .singleflight import SingleFlight
+from .hedging import HedgingPolicy, endpoint_key
+from .batching import MicroBatcher
+from .scheduling import PriorityScheduler, priority
+from .validation import InvoiceValidator
+from .builder import InvoiceBuilder
+from .jsonstream import JSONArrayStream
+
+# dedup / cache / document_cache sqlite3 ve mmap yükler; yalnızca kullanılırsa
+# (örnek verilirse) çağıran tarafından import edilir
+if TYPE_CHECKING:
+    from .dedup import DedupIndex
+    from .cache import CacheBackend
+    from .document_cache import DocumentCache
+
+# Önbelleğe alınan çağrıların varsayılan geçerlilik süreleri (sn)
+DEFAULT_CACHE_TTLS = {
+    'series': 3600,
+    'taxpayer': 6 * 3600,
+}
 
 logger = logging.getLogger(__name__)
 
 
+def _prefetched(items, max_items: int):
+    """
+    items'ı arka plan thread'inde okuyup en fazla max_items öğelik kuyruğa alır
+
+    Tüketici bir öğeyi işlerken sonraki öğeler (ve sayfa istekleri) ağdan
+    okunmaya devam eder. Tüketici erken durursa üretici de durur; üreticideki
+    hatalar tüketici tarafında yeniden fırlatılır.
+
+    Üretici çağıranın context'inin kopyasında çalışır; client.priority() ile
+    seçilen öncelik sınıfı sayfa isteklerine de uygulanır.
+    """
+    return _prefetch_iter(items, max_items, contextvars.copy_context())
+
+
+def _prefetch_iter(items, max_items: int, context):
+    buffer = queue.Queue(max_items)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((None, item)):
+                    return
+        except BaseException as e:
+            put((e, None))
+        else:
+            put((done, None))
+        finally:
+            if stop.is_set() and hasattr(items, 'close'):
+                items.close()
+
+    thread = threading.Thread(target=context.run, args=(produce,), name='nilvera-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            error, item = buffer.get()
+            if error is None:
+                yield item
+            elif error is done:
+                return
+            else:
+                raise error
+    finally:
+        stop.set()
+
+
+def _confirm_entry(data, uuid: str, position: int, count: int):
+    """Toplu onaylama yanıtında UUID'ye ait kaydı bulur (yoksa None)"""
+    if isinstance(data, dict):
+        for key in ('Content', 'Results', 'Items'):
+            if isinstance(data.get(key), list):
+                data = data[key]
+                break
+        else:
+            return data.get(uuid)
+    if not isinstance(data, list):
+        return None
+    for entry in data:
+        if isinstance(entry, dict) and str(entry.get('UUID', '')).lower() == uuid.lower():
+            return entry
+    if len(data) == count and not any(isinstance(entry, dict) and 'UUID' in entry for entry in data):
+        return data[position]
+    return None
+
+
+def _split_confirm_result(result: dict, uuid: str, position: int, count: int) -> dict:
+    """Toplu onaylama sonucundan tek UUID'lik sonuç sözlüğü üretir"""
+    data = result.get('data')
+    entry = _confirm_entry(data, uuid, position, count)
+    split = {'success': result.get('success', True), 'data': entry,
+             'uuid': uuid, 'batch_size': count, 'batch_data': data}
+    if isinstance(entry, dict):
+        failed = entry.get('IsSuccess', entry.get('Success', True)) is False
+        error = entry.get('ErrorMessage') or entry.get('Error')
+        if failed or error:
+            split['success'] = False
+            split['error'] = error or entry.get('Message') or 'Fatura onaylanamadı'
+    return split
+
+
 class NilveraClient:
-    """Nilvera REST API istemcisi - İhracat E-Fatura operasyonları"""
+    """
+    Nilvera REST API istemcisi - İhracat E-Fatura operasyonları
+    
+    Thread güvenliği: Client oluşturulduktan sonra değişen bir durum tutmaz.
+    Tek bir örnek bir process'in tüm thread'leri tarafından paylaşılabilir;
+    eşzamanlılık pool_maxsize ile sınırlıdır.
+    """
 
     BASE_URLS = {
         'test': 'https://apitest.nilvera.com',
@@ -20,7 +146,16 @@ class NilveraClient:
     }
 
     def __init__(self, api_key: str, environment: str = 'test', 
-                 test_url: str = None, production_url: str = None):
+                 test_url: str = None, production_url: str = None,
+                 transport=None,
+                 pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 connect_timeout: float = 10, read_timeout: float = 30,
+                 keep_alive: bool = True, tcp_keepalive_idle: int = None,
+                 coalesce_gets: bool = False, hedging=None,
+                 confirm_batch_size: int = None, confirm_batch_wait: float = 0.05,
+                 scheduler: PriorityScheduler = None, dedup_index: 'DedupIndex' = None,
+                 validate: bool = False, cache: 'CacheBackend' = None, cache_ttls: dict = None,
+                 document_cache: 'DocumentCache' = None, renderer=None):
         """
         Nilvera Client başlatır
         
@@ -29,6 +164,41 @@ class NilveraClient:
             environment: 'test' veya 'production'
             test_url: Özel test URL'i (opsiyonel)
             production_url: Özel production URL'i (opsiyonel)
+            transport: HTTP transport örneği veya adı: 'requests' (varsayılan),
+                'urllib3' (hafif) ya da 'http2' (httpx gerekir)
+            pool_connections: Bağlantı havuzunda tutulacak host sayısı
+            pool_maxsize: Host başına en fazla bağlantı (eşzamanlı thread sayısı kadar verin)
+            pool_block: True ise havuz doluyken yeni bağlantı açmak yerine beklenir
+            connect_timeout: Bağlantı kurma zaman aşımı (sn)
+            read_timeout: Yanıt okuma zaman aşımı (sn)
+            keep_alive: False ise her istekten sonra bağlantı kapatılır
+            tcp_keepalive_idle: Verilirse boşta bekleyen bağlantılara bu süre (sn)
+                sonra TCP keep-alive probu gönderilir
+            coalesce_gets: True ise aynı anda yapılan özdeş GET istekleri tek
+                HTTP çağrısında birleştirilir (single-flight)
+            hedging: Verilirse yavaş kalan GET isteklerine yedek istek gönderilir;
+                True verilirse varsayılan ayarlarla bir HedgingPolicy oluşturulur
+                ve close() ile kapatılır
+            confirm_batch_size: Verilirse tek UUID ile yapılan onaylama çağrıları
+                farklı thread'lerden toplanıp bu boyuta kadar tek istekte gönderilir
+            confirm_batch_wait: Toplama penceresi (sn)
+            scheduler: Verilirse istekler öncelik sınıfına göre (interactive,
+                normal, bulk) kotalı olarak zamanlanır
+            dedup_index: Verilirse içeriği daha önce gönderilmiş bir fatura
+                tekrar oluşturulmaz, mevcut UUID döndürülür
+            validate: True ise faturalar gönderilmeden önce yerel olarak
+                doğrulanır; geçersiz faturalar API'ye gitmez
+            cache: Verilirse seri listeleri ve mükellef sorguları bu önbellekten
+                okunur (ör. process'ler arası paylaşılan SQLiteCache)
+            cache_ttls: Çağrı grubu başına geçerlilik süreleri
+                ({'series': sn, 'taxpayer': sn}); verilmeyenler varsayılanı kullanır
+            document_cache: Verilirse kesilmiş faturaların PDF / HTML / XML
+                dokümanları diskte saklanır, tekrar indirilmez (taslaklar hariç)
+            renderer: render_invoice_html için InvoiceRenderer (verilmezse
+                ilk kullanımda oluşturulur)
+        
+        Havuz ve TCP keep-alive ayarları yalnızca transport adı verildiğinde
+        (veya hiç verilmediğinde) kullanılır.
         """
         self.api_key = api_key
         self.environment = environment
@@ -41,8 +211,82 @@ class NilveraClient:
         else:
             self.base_url = self.BASE_URLS.get(environment, self.BASE_URLS['test'])
         
-        self.session = requests.Session()
-        self._setup_session()
+        self.timeout = (connect_timeout, read_timeout)
+        self.keep_alive = keep_alive
+        
+        # Session yalnızca varsayılan requests transport'u için açılır; diğer
+        # transport'larda (ör. kiracılar arasında paylaşılan havuz) Authorization
+        # her isteğe ayrıca eklenir
+        self.session = None
+        
+        if transport is None or isinstance(transport, str):
+            socket_options = None
+            if tcp_keepalive_idle:
+                socket_options = keepalive_socket_options(
+                    idle=tcp_keepalive_idle, interval=max(tcp_keepalive_idle // 3, 1), count=3
+                )
+            pool_options = {
+                'pool_connections': pool_connections,
+                'pool_maxsize': pool_maxsize,
+                'pool_block': pool_block,
+                'socket_options': socket_options
+            }
+            if transport in (None, 'requests'):
+                self.session = requests.Session()
+                self._setup_session()
+                transport = RequestsTransport(self.session, **pool_options)
+            else:
+                transport = create_transport(transport, **pool_options)
+        self.transport = transport
+        self.single_flight = SingleFlight() if coalesce_gets else None
+        self._owns_hedging = hedging is True
+        self.hedging = HedgingPolicy() if hedging is True else hedging
+        self.confirm_batch_size = confirm_batch_size
+        self.confirm_batch_wait = confirm_batch_wait
+        self._batchers = {}
+        self._batchers_lock = threading.Lock()
+        self.scheduler = scheduler
+        self.dedup_index = dedup_index
+        self._validators = {
+            kind: InvoiceValidator(kind) for kind in ('einvoice', 'earchive')
+        } if validate else None
+        self.cache = cache
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS, **(cache_ttls or {}))
+        self.document_cache = document_cache
+        self.renderer = renderer
+        self._renderer_lock = threading.Lock()
+        self._renderer_error = None
+        # Önbellek anahtarı ortamı ve hesabı ayırır; API anahtarı dosyaya açık yazılmaz
+        self._cache_namespace = (
+            f"{self.base_url}|{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+        )
+
+    def close(self):
+        """Arka plan toplayıcılarını durdurur ve transport'u kapatır"""
+        with self._batchers_lock:
+            batchers = list(self._batchers.values())
+            self._batchers.clear()
+        for batcher in batchers:
+            batcher.close()
+        if self._owns_hedging:
+            self.hedging.close()
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def priority(self, level: str):
+        """
+        Blok içindeki çağrıların öncelik sınıfını belirler
+        
+        Kullanım:
+            >>> with client.priority('bulk'):
+            ...     client.get_invoice_xml(invoice_uuid)
+        """
+        return priority(level)
 
     def _setup_session(self):
         """HTTP session'ı yapılandır"""
@@ -52,27 +296,84 @@ class NilveraClient:
             'Accept': 'application/json'
         })
 
-    def _make_request(self, method: str, endpoint: str, data=None, params=None, timeout=30):
-        """Tüm HTTP isteklerini yöneten merkezi metod"""
+    def _request_headers(self):
+        """Her isteğe eklenen header'lar"""
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json-patch+json',
+            'Accept': 'application/json'
+        }
+        if not self.keep_alive:
+            headers['Connection'] = 'close'
+        return headers
+
+    def _send(self, method: str, url: str, params=None, json=None, data=None, timeout=None):
+        """
+        İsteği transport'a iletir
+        
+        Katmanlar (dıştan içe):
+            - coalesce_gets açıksa aynı URL ve parametrelerle eşzamanlı yapılan
+              GET istekleri tek çağrıda birleştirilir; bekleyenler aynı yanıtı paylaşır
+            - Zamanlayıcı verilmişse istek, geçerli öncelik sınıfında yer açılana
+              kadar bekler
+            - Hedging politikası verilmişse GET istekleri bu politikayla gönderilir
+        """
+        def transport_send():
+            return self.transport.request(
+                method,
+                url,
+                json=json,
+                data=data,
+                params=params,
+                headers=self._request_headers(),
+                timeout=timeout or self.timeout
+            )
+        
+        is_get = method.upper() == 'GET'
+        
+        send = transport_send
+        if is_get and self.hedging is not None:
+            send = functools.partial(self.hedging.execute, endpoint_key(url), send)
+        if self.scheduler is not None:
+            send = functools.partial(self._scheduled, send)
+        
+        if not is_get or self.single_flight is None:
+            return send()
+        
+        key = (url, tuple(sorted((params or {}).items())))
+        response, shared = self.single_flight.do(key, send)
+        if shared:
+            logger.debug(f"Nilvera API İstek birleştirildi: GET {url}")
+        return response
+
+    def _scheduled(self, send):
+        """İsteği zamanlayıcıdan yer alarak gönderir"""
+        with self.scheduler.slot():
+            return send()
+
+    def _make_request(self, method: str, endpoint: str, data=None, params=None, timeout=None, body=None):
+        """
+        Tüm HTTP isteklerini yöneten merkezi metod
+        
+        data JSON olarak kodlanır; body verilirse hazır JSON bytes'ı veya
+        bytes parçaları üreten bir iterable olarak olduğu gibi gönderilir.
+        """
         url = f"{self.base_url}{endpoint}"
         
-        # İstek logla (sadece DEBUG seviyesinde)
-        logger.debug(f"Nilvera API İstek: {method} {url}")
-        if data:
-            try:
-                request_json = json.dumps(data, indent=2, ensure_ascii=False)
-                logger.debug(f"Nilvera API İstek Body:\\n{request_json}")
-            except Exception:
-                logger.debug(f"Nilvera API İstek Body: {data}")
+        # İstek logla (sadece DEBUG seviyesinde; gövde yalnızca gerekirse kodlanır)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Nilvera API İstek: {method} {url}")
+            if data:
+                try:
+                    request_json = json.dumps(data, indent=2, ensure_ascii=False)
+                    logger.debug(f"Nilvera API İstek Body:\\n{request_json}")
+                except Exception:
+                    logger.debug(f"Nilvera API İstek Body: {data}")
+            elif body is not None:
+                logger.debug("Nilvera API İstek Body: <akış>")
         
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                timeout=timeout
-            )
+            response = self._send(method, url, params=params, json=data, data=body, timeout=timeout)
             
             # Yanıt logla (sadece DEBUG seviyesinde)
             logger.debug(f"Nilvera API Yanıt [{response.status_code}]: {endpoint}")
@@ -91,43 +392,15 @@ class NilveraClient:
                     'status_code': response.status_code
                 }
             
-            # Hatalı yanıt
-            error_detail = ""
-            raw_response = ""
-            try:
-                raw_response = response.text
-                error_data = response.json()
-                if isinstance(error_data, dict):
-                    error_parts = []
-                    for key in ['message', 'Message', 'title', 'Title', 'detail', 'Detail', 'errors', 'Errors']:
-                        val = error_data.get(key)
-                        if val:
-                            error_parts.append(f"{key}: {val}")
-                    error_detail = " | ".join(error_parts) if error_parts else str(error_data)
-                elif isinstance(error_data, list):
-                    error_detail = str(error_data)
-                else:
-                    error_detail = str(error_data)
-            except ValueError:
-                error_detail = response.text
-                raw_response = response.text
-
-            logger.error(f"Nilvera API Hata [{response.status_code}]: {endpoint}")
-            logger.error(f"Nilvera API Hata Detay: {error_detail}")
-            
-            raise NilveraAPIError(
-                error_detail,
-                status_code=response.status_code,
-                response=raw_response
-            )
+            self._raise_api_error(response, endpoint)
 
-        except requests.exceptions.Timeout:
+        except NilveraTimeoutError:
             logger.error(f"Nilvera API Timeout: {endpoint}")
-            raise NilveraTimeoutError('Bağlantı zaman aşımına uğradı')
+            raise
         
-        except requests.exceptions.ConnectionError:
+        except NilveraConnectionError:
             logger.error(f"Nilvera API Bağlantı Hatası: {endpoint}")
-            raise NilveraConnectionError('Sunucuya bağlanılamadı. İnternet bağlantınızı kontrol edin.')
+            raise
         
         except NilveraAPIError:
             # Zaten fırlattık, tekrar raise et
@@ -137,6 +410,111 @@ class NilveraClient:
             logger.error(f"Nilvera API Genel Hata: {endpoint} - {str(e)}")
             raise
 
+    def _raise_api_error(self, response, endpoint: str):
+        """Başarısız yanıttaki hata mesajını ayıklayıp NilveraAPIError fırlatır"""
+        error_detail = ""
+        raw_response = ""
+        try:
+            raw_response = response.text
+            error_data = response.json()
+            if isinstance(error_data, dict):
+                error_parts = []
+                for key in ['message', 'Message', 'title', 'Title', 'detail', 'Detail', 'errors', 'Errors']:
+                    val = error_data.get(key)
+                    if val:
+                        error_parts.append(f"{key}: {val}")
+                error_detail = " | ".join(error_parts) if error_parts else str(error_data)
+            elif isinstance(error_data, list):
+                error_detail = str(error_data)
+            else:
+                error_detail = str(error_data)
+        except ValueError:
+            error_detail = response.text
+            raw_response = response.text
+
+        logger.error(f"Nilvera API Hata [{response.status_code}]: {endpoint}")
+        logger.error(f"Nilvera API Hata Detay: {error_detail}")
+        
+        raise NilveraAPIError(
+            error_detail,
+            status_code=response.status_code,
+            response=raw_response
+        )
+
+    def iter_list(self, endpoint: str, params=None, item_path=(), chunk_size: int = 65536, meta: dict = None):
+        """
+        Liste döndüren bir GET endpoint'inin öğelerini gövde geldikçe üretir
+        
+        Yanıt tek seferde belleğe alınmaz; her öğe tamamlandığı anda çözülür.
+        Tepe bellek sayfa boyutundan değil tek öğenin boyutundan etkilenir.
+        
+        Args:
+            endpoint: API endpoint'i
+            params: Sorgu parametreleri
+            item_path: Dizinin gövdedeki anahtar yolu (ör. ('Content',))
+            chunk_size: Ağdan okuma parça boyutu
+            meta: Verilirse üst seviyedeki skaler alanlar (TotalPages vb.)
+                dizi tüketildikçe bu dict'e yazılır
+        
+        Yields:
+            dict: Listenin öğeleri
+        
+        Raises:
+            NilveraAPIError: HTTP hatası, gövde çözülemezse veya hedef dizi
+                gövdede yoksa
+            NilveraConnectionError / NilveraTimeoutError
+        """
+        url = f"{self.base_url}{endpoint}"
+        logger.debug(f"Nilvera API Akış İsteği: GET {url}")
+        
+        if self.scheduler is not None:
+            with self.scheduler.slot():
+                response = self._open_stream(url, params)
+        else:
+            response = self._open_stream(url, params)
+        
+        try:
+            if response.status_code != 200:
+                self._raise_api_error(response, endpoint)
+            
+            stream = JSONArrayStream(response.iter_content(chunk_size), item_path)
+            try:
+                yield from stream
+            except NilveraException:
+                raise
+            except ValueError as e:
+                # Bozuk veya yarıda kesilmiş gövde
+                raise NilveraAPIError(f"Yanıt gövdesi çözülemedi ({endpoint}): {e}",
+                                      response.status_code, response) from e
+            except Exception as e:
+                # Gövde okunurken bağlantı koptu
+                raise NilveraConnectionError(str(e))
+            finally:
+                if meta is not None:
+                    meta.update(stream.meta)
+            if not stream.found:
+                raise NilveraAPIError(
+                    f"Yanıtta beklenen dizi bulunamadı ({endpoint}): {'.'.join(map(str, item_path)) or '<gövde>'}",
+                    response.status_code, response
+                )
+        finally:
+            response.close()
+
+    def _open_stream(self, url: str, params):
+        return self.transport.stream('GET', url, params=params, headers=self._request_headers(),
+                                     timeout=self.timeout)
+
+    def _cached_get(self, group: str, endpoint: str):
+        """GET isteğini önbellek üzerinden yapar; yalnızca başarılı yanıtlar saklanır"""
+        if self.cache is None:
+            return self._make_request('GET', endpoint)
+        return self.cache.get_or_set(
+            f'{self._cache_namespace}|{endpoint}',
+            lambda: self._make_request('GET', endpoint),
+            self.cache_ttls[group],
+            cacheable=lambda result: isinstance(result, dict) and result.get('success', False),
+        )
+
     # ==================== Bağlantı Testi ====================
 
     def test_connection(self):
@@ -180,7 +558,7 @@ class NilveraClient:
             dict: {'success': bool, 'data': list}
         """
         try:
-            return self._make_request('GET', '/einvoice/Series')
+            return self._cached_get('series', '/einvoice/Series')
         except Exception as e:
             return {
                 'success': False,
@@ -249,12 +627,18 @@ class NilveraClient:
         E-Fatura taslağı oluşturur
         
         Args:
-            invoice_data: Fatura verisi (Nilvera formatında)
+            invoice_data: Fatura verisi (Nilvera formatında) veya InvoiceBuilder
             customer_alias: Müşteri alias (ihracat için boş)
         
         Returns:
-            dict: {'success': bool, 'data': dict}
+            dict: {'success': bool, 'data': dict} (mükerrer içerikte 'deduplicated': True,
+                aynı içerik gönderilirken 'in_progress': True)
         """
+        if isinstance(invoice_data, InvoiceBuilder):
+            if customer_alias:
+                invoice_data.customer_alias = customer_alias
+            return self._create_from_builder(invoice_data, '/einvoice/Draft/Create')
+        
         request_body = {
             "EInvoice": invoice_data,
             "CustomerAlias": customer_alias
@@ -262,18 +646,112 @@ class NilveraClient:
         
         logger.debug(f"Taslak fatura oluşturuluyor - UUID: {invoice_data.get('InvoiceInfo', {}).get('UUID', '?')}")
         
+        return self._create_once('einvoice', invoice_data, '/einvoice/Draft/Create', request_body)
+
+    def _create_from_builder(self, builder: InvoiceBuilder, endpoint: str):
+        """
+        InvoiceBuilder gövdesini kalem dict'leri oluşturmadan, parça parça gönderir
+        
+        Doğrulama ve dedup_index dict üzerinde çalıştığından bunlar açıksa
+        gövde bir kez dict'e çevrilir.
+        """
+        logger.debug(f"Fatura oluşturuluyor (builder, {len(builder)} kalem) - UUID: {builder.uuid or '?'}")
+        
+        if self._validators is not None or self.dedup_index is not None:
+            request_body = json.loads(builder.to_bytes())
+            invoice_data = request_body['EInvoice' if builder.kind == 'einvoice' else 'ArchiveInvoice']
+            return self._create_once(builder.kind, invoice_data, endpoint, request_body)
+        
         try:
-            return self._make_request('POST', '/einvoice/Draft/Create', data=request_body)
+            return self._make_request('POST', endpoint, body=builder.iter_json())
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
 
+    def _create_once(self, kind: str, invoice_data: dict, endpoint: str, request_body: dict):
+        """
+        Oluşturma isteğini gönderir; doğrulama ve dedup_index açıksa önce onları uygular
+
+        dedup_index açıkken UUID'si olmayan (veya boş olan) faturaya UUID
+        atanır. Çağıranın sözlüğü değiştirilmez; UUID gövdenin sığ kopyasına
+        yazılır ve sonuçta 'uuid' olarak döner.
+        """
+        if self._validators is not None:
+            try:
+                errors = self._validators[kind].validate(invoice_data)
+            except Exception as e:
+                # Beklenmeyen veri tipi doğrulayıcıyı bozsa da çağıran hata sözlüğü alır
+                logger.warning(f"Fatura doğrulanamadı: {e}")
+                errors = [f'Fatura doğrulanamadı: {e}']
+            if errors:
+                logger.warning(f"Fatura yerel doğrulamadan geçemedi: {'; '.join(errors)}")
+                return {
+                    'success': False,
+                    'error': '; '.join(errors),
+                    'validation_errors': errors
+                }
+
+        fingerprint = None
+        if self.dedup_index is not None:
+            info = invoice_data.get('InvoiceInfo') or {}
+            invoice_uuid = info.get('UUID')
+            if not invoice_uuid:
+                invoice_uuid = str(uuid_lib.uuid4())
+                invoice_data = dict(invoice_data, InvoiceInfo=dict(info, UUID=invoice_uuid))
+                body_key = 'EInvoice' if kind == 'einvoice' else 'ArchiveInvoice'
+                request_body = dict(request_body, **{body_key: invoice_data})
+            fingerprint = self.dedup_index.fingerprint(invoice_data, kind)
+            claimed = self.dedup_index.claim(fingerprint, invoice_uuid)
+            if claimed:
+                existing, state = claimed
+                if state != 'created':
+                    logger.info(f"Aynı içerikli fatura gönderiliyor: {invoice_uuid} -> {existing}")
+                    return {
+                        'success': False,
+                        'error': f'Aynı içerikli fatura gönderiliyor: {existing}',
+                        'uuid': existing,
+                        'in_progress': True
+                    }
+                logger.info(f"Mükerrer fatura gönderilmedi: {invoice_uuid} -> {existing}")
+                return {
+                    'success': True,
+                    'data': {'UUID': existing},
+                    'uuid': existing,
+                    'deduplicated': True
+                }
+
+        try:
+            result = self._make_request('POST', endpoint, data=request_body)
+        except NilveraAPIError as e:
+            # API reddetti; içerik yeniden gönderilebilir
+            if fingerprint is not None:
+                self.dedup_index.release(fingerprint, invoice_uuid)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        except Exception as e:
+            # Zaman aşımı / bağlantı hatası: fatura oluşmuş olabilir; ayırma
+            # lease süresi dolana kadar korunur
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+        if fingerprint is not None:
+            self.dedup_index.confirm(fingerprint, invoice_uuid)
+            result.setdefault('uuid', invoice_uuid)
+        return result
+
     def confirm_and_send_draft(self, invoice_uuids: list, alias: str = "urn:mail:ihracatpk@gtb.gov.tr"):
         """
         Taslak faturaları onaylayıp gönderir
         
+        confirm_batch_size ayarlıysa tek UUID'li çağrılar diğer thread'lerden
+        gelen çağrılarla birleştirilip toplu gönderilir.
+        
         Args:
             invoice_uuids: Fatura UUID listesi
             alias: Alıcı alias (ihracat için GTB email)
@@ -281,6 +759,9 @@ class NilveraClient:
         Returns:
             dict: {'success': bool, 'data': dict}
         """
+        if self.confirm_batch_size and len(invoice_uuids) == 1:
+            return self.submit_confirm_and_send_draft(invoice_uuids[0], alias).result()
+        
         send_data = [
             {"Alias": alias, "UUID": uid}
             for uid in invoice_uuids
@@ -294,6 +775,62 @@ class NilveraClient:
                 'error': str(e)
             }
 
+    def submit_confirm_and_send_draft(self, invoice_uuid: str, alias: str = "urn:mail:ihracatpk@gtb.gov.tr"):
+        """
+        Taslak faturayı bir sonraki toplu onaylama isteğine ekler
+        
+        Args:
+            invoice_uuid: Fatura UUID'si
+            alias: Alıcı alias (ihracat için GTB email)
+        
+        Returns:
+            Future: Bu UUID'ye ait sonuç sözlüğü
+                {'success': bool, 'data': dict, 'uuid': str, 'batch_size': int, 'batch_data': ...}
+        """
+        batcher = self._get_batcher('einvoice', '/einvoice/Draft/ConfirmAndSend')
+        return batcher.submit({"Alias": alias, "UUID": invoice_uuid})
+
+    def _get_batcher(self, name: str, endpoint: str):
+        """Endpoint için mikro toplayıcıyı döndürür (ilk kullanımda oluşturulur)"""
+        with self._batchers_lock:
+            batcher = self._batchers.get(name)
+            if batcher is None:
+                batcher = self._batchers[name] = MicroBatcher(
+                    functools.partial(self._confirm_batch, endpoint),
+                    max_batch_size=self.confirm_batch_size or 100,
+                    max_wait=self.confirm_batch_wait,
+                    name=f'{name}-confirm'
+                )
+            return batcher
+
+    def _confirm_batch(self, endpoint: str, items: list):
+        """
+        Toplanan onaylama isteklerini tek API çağrısıyla gönderir
+        
+        Toplu istek API tarafından reddedilirse hatalı UUID'nin diğerlerini
+        etkilememesi için öğeler tek tek yeniden gönderilir. Zaman aşımı /
+        bağlantı hatasında yeniden gönderim yapılmaz (istek işlenmiş olabilir).
+        Başarılı yanıt UUID bazında bölünür; her çağıran yalnızca kendi
+        UUID'sine ait sonucu alır, toplu yanıtın tamamı 'batch_data' altındadır.
+        
+        Returns:
+            list: Her öğe için sonuç sözlüğü (aynı sırayla)
+        """
+        uuids = [item['UUID'] if isinstance(item, dict) else item for item in items]
+        
+        try:
+            result = self._make_request('POST', endpoint, data=items)
+        except NilveraAPIError as e:
+            if len(items) == 1:
+                return [{'success': False, 'error': str(e), 'uuid': uuids[0], 'batch_size': 1}]
+            logger.warning(f"Toplu onaylama reddedildi ({len(items)} fatura), tek tek gönderiliyor: {e}")
+            return [self._confirm_batch(endpoint, [item])[0] for item in items]
+        except Exception as e:
+            return [{'success': False, 'error': str(e), 'uuid': uid, 'batch_size': len(items)} for uid in uuids]
+        
+        return [_split_confirm_result(result, uid, position, len(items))
+                for position, uid in enumerate(uuids)]
+
     def get_invoice_status(self, invoice_uuid: str):
         """
         Fatura durumunu sorgular
@@ -348,22 +885,124 @@ class NilveraClient:
                 'error': str(e)
             }
     
-    def get_invoice_pdf(self, invoice_uuid: str, is_draft: bool = False):
+    def get_sale_invoices(self, start_date: str = None, end_date: str = None,
+                          page: int = 1, page_size: int = 30, search: str = None):
         """
-        Fatura PDF'ini indirir
+        Giden (kesilmiş) E-Faturaları listeler
         
         Args:
-            invoice_uuid: Fatura UUID'si
-            is_draft: True ise taslak endpoint kullanılır
+            start_date: Başlangıç tarihi (ISO format)
+            end_date: Bitiş tarihi (ISO format)
+            page: Sayfa numarası
+            page_size: Sayfa başına kayıt sayısı
+            search: Arama kelimesi
         
         Returns:
-            dict: {'success': bool, 'data': bytes}
+            dict: Fatura listesi ('Content', 'TotalPages' ...)
+        """
+        params = {
+            'Page': page,
+            'PageSize': page_size
+        }
+        
+        if start_date:
+            params['StartDate'] = start_date
+        if end_date:
+            params['EndDate'] = end_date
+        if search:
+            params['Search'] = search
+        
+        try:
+            return self._make_request('GET', '/einvoice/Sale', params=params)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def iter_sale_invoices(self, start_date: str = None, end_date: str = None,
+                           page_size: int = 500, search: str = None, prefetch: int = 2):
         """
+        Giden E-Faturaları tüm sayfalar boyunca tek tek üretir
+        
+        Sayfalar arka plandaki bir thread'de akış olarak okunur; çağıran bir
+        sayfayı işlerken sonraki sayfa(lar) indirilir. Önden okunan öğe sayısı
+        page_size * prefetch ile sınırlıdır.
+        
+        Args:
+            start_date: Başlangıç tarihi (ISO format)
+            end_date: Bitiş tarihi (ISO format)
+            page_size: Sayfa başına kayıt sayısı
+            search: Arama kelimesi
+            prefetch: Önden okunacak sayfa sayısı (0 = önden okuma yok)
+        
+        Yields:
+            dict: Giden fatura özeti ('UUID', 'InvoiceNumber', 'PayableAmount' ...)
+        
+        Raises:
+            NilveraAPIError / NilveraConnectionError / NilveraTimeoutError
+        
+        Kullanım:
+            >>> for invoice in client.iter_sale_invoices('2026-01-01T00:00:00.000Z'):
+            ...     print(invoice['InvoiceNumber'])
+        """
+        return self._iter_pages('/einvoice/Sale', start_date, end_date, page_size, search, prefetch)
+    
+    def reconcile_sales(self, ledger, start_date: str = None, end_date: str = None,
+                        page_size: int = 500, **options):
+        """
+        Muhasebe kayıtlarını Nilvera'daki giden faturalarla karşılaştırır
+        
+        Fatura başına istek atılmaz; dönem yalnızca liste sayfalarıyla okunur.
+        
+        Args:
+            ledger: Defter kayıtları (dict iterable'ı; 'UUID', 'InvoiceNumber',
+                'PayableAmount' ...)
+            start_date: Başlangıç tarihi (ISO format)
+            end_date: Bitiş tarihi (ISO format)
+            page_size: Sayfa başına kayıt sayısı
+            **options: Reconciler seçenekleri (amount_fields, tolerance ...)
+        
+        Returns:
+            ReconciliationReport
+        """
+        from .reconcile import Reconciler
+        
+        reconciler = Reconciler(ledger, **options)
+        reconciler.feed_all(self.iter_sale_invoices(start_date, end_date, page_size=page_size))
+        return reconciler.report()
+    
+    def _download_document(self, invoice_uuid: str, doc_format: str, is_draft: bool = False):
+        """
+        Fatura dokümanını (pdf, html, xml) indirir
+        
+        JSON sarmalı yanıtlarda PDF base64 olarak, HTML/XML düz metin olarak gelir.
+        document_cache verilmişse kesilmiş faturaların dokümanları diskten
+        okunur; taslaklar değişebileceğinden her zaman indirilir.
+        
+        Returns:
+            dict: {'success': bool, 'data': bytes, 'content_type': str, 'size': int}
+                Önbellekten okunduysa ayrıca 'cached': True ve 'path': dosya yolu
+        """
+        document_cache = None if is_draft else self.document_cache
+        if document_cache is not None:
+            cached = document_cache.get(invoice_uuid, doc_format, self._cache_namespace)
+            if cached is not None:
+                logger.debug(f"Doküman önbellekten: {invoice_uuid}.{doc_format}")
+                return {
+                    'success': True,
+                    'data': cached.read(),
+                    'content_type': cached.content_type,
+                    'size': cached.size,
+                    'cached': True,
+                    'path': cached.path
+                }
+        
         endpoint_type = "Draft" if is_draft else "Sale"
-        url = f"{self.base_url}/einvoice/{endpoint_type}/{invoice_uuid}/pdf"
+        url = f"{self.base_url}/einvoice/{endpoint_type}/{invoice_uuid}/{doc_format}"
         
         try:
-            response = self.session.get(url, timeout=30)
+            response = self._send('GET', url)
             
             if response.status_code == 200:
                 content_type = response.headers.get('Content-Type', '')
@@ -371,40 +1010,74 @@ class NilveraClient:
                 # JSON wrapped response mu kontrol et
                 if 'application/json' in content_type:
                     try:
-                        import base64
                         json_data = response.json()
-                        if isinstance(json_data, str):
-                            pdf_content = base64.b64decode(json_data)
-                        elif isinstance(json_data, dict) and 'data' in json_data:
-                            pdf_content = base64.b64decode(json_data['data'])
+                        if isinstance(json_data, dict) and 'data' in json_data:
+                            json_data = json_data['data']
+                        if not isinstance(json_data, str):
+                            content = response.content
+                        elif doc_format == 'pdf':
+                            import base64
+                            content = base64.b64decode(json_data)
                         else:
-                            pdf_content = response.content
+                            content = json_data.encode('utf-8')
                     except:
-                        pdf_content = response.content
+                        content = response.content
                 else:
-                    pdf_content = response.content
+                    content = response.content
+                
+                if document_cache is not None:
+                    try:
+                        document_cache.put(invoice_uuid, doc_format, content, content_type,
+                                           self._cache_namespace)
+                    except OSError as e:
+                        # Disk hatası indirmeyi bozmaz
+                        logger.warning(f"Doküman önbelleğe yazılamadı: {invoice_uuid}.{doc_format} - {e}")
                 
                 return {
                     'success': True,
-                    'data': pdf_content,
+                    'data': content,
                     'content_type': content_type,
-                    'size': len(pdf_content)
+                    'size': len(content)
                 }
             
             raise NilveraAPIError(
-                f'PDF indirilemedi: HTTP {response.status_code}',
+                f'{doc_format.upper()} indirilemedi: HTTP {response.status_code}',
                 status_code=response.status_code,
                 response=response.text
             )
         
-        except NilveraAPIError:
+        except (NilveraAPIError, NilveraQueueFullError):
             raise
         except Exception as e:
             raise NilveraConnectionError(str(e))
 
-    def get_invoice_html(self, invoice_uuid: str, is_draft: bool = False):
+    def open_invoice_document(self, invoice_uuid: str, doc_format: str = 'pdf'):
         """
-        Fatura HTML'ini indirir
+        Kesilmiş faturanın dokümanını önbellekten açar (yoksa önce indirir)
+        
+        Dönen nesnenin path / mmap() / open() metotlarıyla doküman belleğe
+        kopyalanmadan sunulabilir (ör. portalda sendfile ile).
+        
+        Args:
+            invoice_uuid: Fatura UUID'si
+            doc_format: 'pdf', 'html' veya 'xml'
+        
+        Returns:
+            CachedDocument
+        """
+        if self.document_cache is None:
+            raise ValueError('open_invoice_document için document_cache gerekli')
+        cached = self.document_cache.get(invoice_uuid, doc_format, self._cache_namespace)
+        if cached is None:
+            self._download_document(invoice_uuid, doc_format)
+            cached = self.document_cache.get(invoice_uuid, doc_format, self._cache_namespace)
+        if cached is None:
+            raise NilveraConnectionError(f'{doc_format.upper()} önbelleğe yazılamadı: {invoice_uuid}')
+        return cached
+
+    def get_invoice_pdf(self, invoice_uuid: str, is_draft: bool = False):
+        """
+        Fatura PDF'ini indirir
         
         Args:
             invoice_uuid: Fatura UUID'si
@@ -413,46 +1086,20 @@ class NilveraClient:
         Returns:
             dict: {'success': bool, 'data': bytes}
         """
-        endpoint_type = "Draft" if is_draft else "Sale"
-        url = f"{self.base_url}/einvoice/{endpoint_type}/{invoice_uuid}/html"
+        return self._download_document(invoice_uuid, 'pdf', is_draft)
+
+    def get_invoice_html(self, invoice_uuid: str, is_draft: bool = False):
+        """
+        Fatura HTML'ini indirir
         
-        try:
-            response = self.session.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                content_type = response.headers.get('Content-Type', '')
-                
-                if 'application/json' in content_type:
-                    try:
-                        json_data = response.json()
-                        if isinstance(json_data, str):
-                            html_content = json_data.encode('utf-8')
-                        elif isinstance(json_data, dict) and 'data' in json_data:
-                            html_content = json_data['data'].encode('utf-8')
-                        else:
-                            html_content = response.content
-                    except:
-                        html_content = response.content
-                else:
-                    html_content = response.content
-                
-                return {
-                    'success': True,
-                    'data': html_content,
-                    'content_type': content_type,
-                    'size': len(html_content)
-                }
-            
-            raise NilveraAPIError(
-                f'HTML indirilemedi: HTTP {response.status_code}',
-                status_code=response.status_code,
-                response=response.text
-            )
+        Args:
+            invoice_uuid: Fatura UUID'si
+            is_draft: True ise taslak endpoint kullanılır
         
-        except NilveraAPIError:
-            raise
-        except Exception as e:
-            raise NilveraConnectionError(str(e))
+        Returns:
+            dict: {'success': bool, 'data': bytes}
+        """
+        return self._download_document(invoice_uuid, 'html', is_draft)
 
     def get_invoice_xml(self, invoice_uuid: str, is_draft: bool = False):
         """
@@ -465,46 +1112,63 @@ class NilveraClient:
         Returns:
             dict: {'success': bool, 'data': bytes}
         """
-        endpoint_type = "Draft" if is_draft else "Sale"
-        url = f"{self.base_url}/einvoice/{endpoint_type}/{invoice_uuid}/xml"
+        return self._download_document(invoice_uuid, 'xml', is_draft)
+
+    def render_invoice_html(self, invoice_uuid: str, is_draft: bool = False, fallback: bool = True):
+        """
+        Fatura HTML'ini XML'deki gömülü XSLT ile yerel olarak üretir
+        
+        XML bir kez indirilir (document_cache varsa diskten okunur); şablon
+        özetine göre derlenip önbelleğe alındığından tekrarlanan önizlemeler
+        ağ çağrısı yapmaz. lxml kurulu değilse XML hiç indirilmez.
+        
+        Args:
+            invoice_uuid: Fatura UUID'si
+            is_draft: True ise taslak endpoint kullanılır
+            fallback: lxml kurulu değilse veya şablon işlenemezse
+                get_invoice_html ile sunucudan alınır
         
+        Returns:
+            dict: {'success': bool, 'data': bytes, 'content_type': str, 'size': int,
+                'rendered': True (yerel üretildiyse)}
+        """
         try:
-            response = self.session.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                content_type = response.headers.get('Content-Type', '')
-                
-                if 'application/json' in content_type:
-                    try:
-                        json_data = response.json()
-                        if isinstance(json_data, str):
-                            xml_content = json_data.encode('utf-8')
-                        elif isinstance(json_data, dict) and 'data' in json_data:
-                            xml_content = json_data['data'].encode('utf-8')
-                        else:
-                            xml_content = response.content
-                    except:
-                        xml_content = response.content
-                else:
-                    xml_content = response.content
-                
-                return {
-                    'success': True,
-                    'data': xml_content,
-                    'content_type': content_type,
-                    'size': len(xml_content)
-                }
-            
-            raise NilveraAPIError(
-                f'XML indirilemedi: HTTP {response.status_code}',
-                status_code=response.status_code,
-                response=response.text
-            )
+            renderer = self._get_renderer()
+            xml = self._download_document(invoice_uuid, 'xml', is_draft)
+            html = renderer.render(xml['data']).encode('utf-8')
+        except (ImportError, NilveraValidationError) as e:
+            if not fallback:
+                raise
+            logger.info(f"HTML yerel üretilemedi, sunucudan alınıyor: {invoice_uuid} - {e}")
+            return self.get_invoice_html(invoice_uuid, is_draft)
         
-        except NilveraAPIError:
-            raise
-        except Exception as e:
-            raise NilveraConnectionError(str(e))
+        return {
+            'success': True,
+            'data': html,
+            'content_type': 'text/html; charset=utf-8',
+            'size': len(html),
+            'rendered': True
+        }
+
+    def _get_renderer(self):
+        """
+        Yerel HTML üreticisi
+
+        lxml kurulu değilse ImportError hatırlanır; sonraki çağrılar XML
+        indirmeden ve import denemeden doğrudan aynı hatayı alır.
+        """
+        if self.renderer is None:
+            with self._renderer_lock:
+                if self._renderer_error is not None:
+                    raise self._renderer_error
+                if self.renderer is None:
+                    from .rendering import InvoiceRenderer
+                    try:
+                        self.renderer = InvoiceRenderer()
+                    except ImportError as e:
+                        self._renderer_error = e
+                        raise
+        return self.renderer
 
     def cancel_draft_invoice(self, invoice_uuid: str):
         """
@@ -561,6 +1225,59 @@ class NilveraClient:
                 'error': str(e)
             }
     
+    def iter_incoming_invoices(self, start_date: str = None, end_date: str = None,
+                               page_size: int = 500, search: str = None, prefetch: int = 0):
+        """
+        Gelen faturaları tüm sayfalar boyunca tek tek üretir
+        
+        Her sayfa akış olarak okunur (bkz. iter_list); büyük page_size
+        değerleri bellek kullanımını artırmaz.
+        
+        Args:
+            prefetch: 0'dan büyükse sayfalar arka planda bu kadar sayfa
+                önden okunur (bkz. iter_sale_invoices)
+        
+        Yields:
+            dict: Gelen fatura özeti ('UUID', 'InvoiceNumber', 'SenderTitle' ...)
+        
+        Raises:
+            NilveraAPIError / NilveraConnectionError / NilveraTimeoutError
+        """
+        return self._iter_pages('/einvoice/Purchase', start_date, end_date, page_size, search, prefetch)
+    
+    def _iter_pages(self, endpoint: str, start_date, end_date, page_size: int, search, prefetch: int):
+        """Sayfalı liste endpoint'inin öğelerini sırayla, gerekirse önden okuyarak üretir"""
+        items = self._iter_page_items(endpoint, start_date, end_date, page_size, search)
+        if prefetch > 0:
+            return _prefetched(items, page_size * prefetch)
+        return items
+    
+    def _iter_page_items(self, endpoint: str, start_date, end_date, page_size: int, search):
+        page = 1
+        while True:
+            params = {'Page': page, 'PageSize': page_size}
+            if start_date:
+                params['StartDate'] = start_date
+            if end_date:
+                params['EndDate'] = end_date
+            if search:
+                params['Search'] = search
+            
+            meta = {}
+            count = 0
+            for invoice in self.iter_list(endpoint, params=params, item_path=('Content',), meta=meta):
+                count += 1
+                yield invoice
+            
+            # Sunucu PageSize'ı küçültebilir; TotalPages varsa kısa sayfa son sayfa sayılmaz
+            total_pages = meta.get('TotalPages')
+            if isinstance(total_pages, int) and not isinstance(total_pages, bool):
+                if count == 0 or page >= total_pages:
+                    return
+            elif count < page_size:
+                return
+            page += 1
+    
     def get_incoming_invoice_details(self, invoice_uuid: str):
         """
         Gelen fatura detayını getirir
@@ -586,27 +1303,28 @@ class NilveraClient:
         E-Arşiv faturası oluşturur
         
         Args:
-            invoice_data: E-Arşiv fatura verisi (Nilvera formatında)
+            invoice_data: E-Arşiv fatura verisi (Nilvera formatında) veya InvoiceBuilder
         
         Returns:
-            dict: {'success': bool, 'data': dict}
+            dict: {'success': bool, 'data': dict} (mükerrer içerikte 'deduplicated': True,
+                aynı içerik gönderilirken 'in_progress': True)
         """
+        if isinstance(invoice_data, InvoiceBuilder):
+            return self._create_from_builder(invoice_data, '/earchive/Draft/Create')
+        
         archive_request = {
             "ArchiveInvoice": invoice_data
         }
         
-        try:
-            return self._make_request('POST', '/earchive/Draft/Create', data=archive_request)
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return self._create_once('earchive', invoice_data, '/earchive/Draft/Create', archive_request)
     
     def confirm_and_send_archive_drafts(self, invoice_uuids: list):
         """
         E-Arşiv taslak faturalarını onaylayıp gönderir
         
+        confirm_batch_size ayarlıysa tek UUID'li çağrılar diğer thread'lerden
+        gelen çağrılarla birleştirilip toplu gönderilir.
+        
         Args:
             invoice_uuids: Fatura UUID listesi
         
@@ -616,6 +1334,9 @@ class NilveraClient:
         if not invoice_uuids:
             raise ValueError('En az bir fatura UUID\'si gerekli')
         
+        if self.confirm_batch_size and len(invoice_uuids) == 1:
+            return self.submit_confirm_and_send_archive_draft(invoice_uuids[0]).result()
+        
         try:
             return self._make_request('POST', '/earchive/Draft/ConfirmAndSend', data=invoice_uuids)
         except Exception as e:
@@ -624,6 +1345,20 @@ class NilveraClient:
                 'error': str(e)
             }
     
+    def submit_confirm_and_send_archive_draft(self, invoice_uuid: str):
+        """
+        E-Arşiv taslak faturasını bir sonraki toplu onaylama isteğine ekler
+        
+        Args:
+            invoice_uuid: Fatura UUID'si
+        
+        Returns:
+            Future: Bu UUID'ye ait sonuç sözlüğü
+                {'success': bool, 'data': dict, 'uuid': str, 'batch_size': int, 'batch_data': ...}
+        """
+        batcher = self._get_batcher('earchive', '/earchive/Draft/ConfirmAndSend')
+        return batcher.submit(invoice_uuid)
+    
     def get_earchive_series(self):
         """
         E-Arşiv serilerini listeler
@@ -632,7 +1367,7 @@ class NilveraClient:
             dict: E-Arşiv seri listesi
         """
         try:
-            return self._make_request('GET', '/earchive/Series')
+            return self._cached_get('series', '/earchive/Series')
         except Exception as e:
             return {
                 'success': False,
@@ -652,7 +1387,7 @@ class NilveraClient:
             dict: Mükellef durumu bilgisi
         """
         try:
-            return self._make_request('GET', f'/general/GlobalCompany/GetGlobalCustomerInfo/{tax_number}')
+            return self._cached_get('taxpayer', f'/general/GlobalCompany/GetGlobalCustomerInfo/{tax_number}')
         except Exception as e:
             return {
                 'success': False,
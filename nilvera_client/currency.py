@@ -1,21 +1,40 @@
 # nilvera_client/currency.py
 # TCMB (Türkiye Cumhuriyet Merkez Bankası) Döviz Kuru Servisi
 
-import requests
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+from datetime import date as date_type, datetime, timedelta
+from collections import defaultdict
+from collections.abc import Sequence
+from decimal import Decimal, ROUND_HALF_UP
 import logging
 
+from ._lazy import LazyModule
+
+# İlk istekte yüklenir; paket import'u requests / urllib3 maliyetini ödemez
+requests = LazyModule('requests')
+ET = LazyModule('xml.etree.ElementTree')
+
 logger = logging.getLogger(__name__)
 
+RATE_TYPES = ('ForexBuying', 'ForexSelling', 'BanknoteBuying', 'BanknoteSelling')
+
+# Kur bulunamazsa geriye doğru bakılacak gün sayısı (hafta sonları dahil)
+WALK_BACK_DAYS = 10
+
 
 class TCMBCurrencyService:
     """TCMB'den döviz kurlarını çeker"""
     
     BASE_URL = "https://www.tcmb.gov.tr/kurlar"
     
+    # Verilirse (ör. SQLiteCache) günlük kur tabloları önbellekten okunur;
+    # aynı makinedeki tüm process'ler bir günün tablosunu bir kez çeker
+    cache = None
+    # Yayımlanmış tablolar değişmez; yalnızca başarılı tablolar saklanır
+    CACHE_TTL = 7 * 24 * 3600
+    
     @staticmethod
-    def get_exchange_rate(currency_code: str = "USD", date: datetime = None, rate_type: str = "ForexBuying"):
+    def get_exchange_rate(currency_code: str = "USD", date: datetime = None, rate_type: str = "ForexBuying",
+                          parallel: int = None):
         """
         TCMB'den döviz kuru çeker
         
@@ -27,6 +46,9 @@ class TCMBCurrencyService:
                 - ForexSelling: Döviz Satış (Efektif Satış)
                 - BanknoteBuying: Banknot Alış
                 - BanknoteSelling: Banknot Satış
+            parallel: Verilirse istenen günün tablosu yoksa önceki aday iş
+                günlerinden bu kadarı aynı anda sorgulanır (tatil dönüşlerinde
+                seri istekler yerine tek tur)
         
         Returns:
             dict: {
@@ -41,8 +63,11 @@ class TCMBCurrencyService:
         if date is None:
             date = datetime.now()
         
+        if parallel and parallel > 1:
+            return TCMBCurrencyService._walk_back_parallel(currency_code, date, rate_type, parallel)
+        
         # Hafta sonu kontrolü - geriye doğru iş günü ara
-        max_attempts = 10
+        max_attempts = WALK_BACK_DAYS
         attempt = 0
         
         while attempt < max_attempts:
@@ -63,18 +88,93 @@ class TCMBCurrencyService:
             date = date - timedelta(days=1)
             attempt += 1
         
-        return {
-            'success': False,
-            'rate': None,
-            'date': None,
-            'currency': currency_code,
-            'rate_type': rate_type,
-            'error': f'Son {max_attempts} gün içinde kur bulunamadı'
-        }
+        return _not_found(currency_code, rate_type)
+    
+    @staticmethod
+    def _walk_back_parallel(currency_code: str, date: datetime, rate_type: str, window: int):
+        """
+        En yeni iş gününü tek istekle, bulunamazsa önceki aday günleri window'lar
+        halinde paralel sorgular ve en yeni başarılı sonucu döndürür
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        candidates = _candidate_days(date)
+        if not candidates:
+            return _not_found(currency_code, rate_type)
+        # Çoğu gün tablo yayımlanmıştır; paralel sorgu yalnızca tatil dönüşlerinde yapılır
+        result = TCMBCurrencyService._fetch_rate_for_date(currency_code, candidates[0], rate_type)
+        if result['success']:
+            return result
+        
+        executor = ThreadPoolExecutor(max_workers=window, thread_name_prefix='tcmb')
+        futures = []
+        try:
+            for batch in _windows(candidates[1:], window):
+                futures = [
+                    executor.submit(TCMBCurrencyService._fetch_rate_for_date, currency_code, day, rate_type)
+                    for day in batch
+                ]
+                # Sonuçlar en yeni günden başlayarak sırayla beklenir; başarılı ilk
+                # sonuç, daha eski günlerin sonucu beklenmeden döndürülür
+                for future in futures:
+                    result = future.result()
+                    if result['success']:
+                        return result
+        finally:
+            # Henüz başlamamış istekler iptal edilir; çalışmakta olanlar durdurulamaz,
+            # arka planda tamamlanır ve sonuçları yok sayılır
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return _not_found(currency_code, rate_type)
+    
+    @staticmethod
+    async def get_exchange_rate_async(currency_code: str = "USD", date: datetime = None,
+                                      rate_type: str = "ForexBuying", parallel: int = 4):
+        """
+        get_exchange_rate'in asyncio sürümü
+        
+        Önce en yeni iş gününün tablosu sorgulanır; yoksa önceki aday iş
+        günleri parallel adet aynı anda sorgulanır ve en yeni başarılı sonuç
+        döndürülür. Tatil dönüşlerinde gecikme kabaca iki istek süresine iner.
+        İstekler varsayılan executor'da çalışır, event loop bloklanmaz.
+        
+        Returns:
+            dict: get_exchange_rate ile aynı format
+        """
+        import asyncio
+        
+        if date is None:
+            date = datetime.now()
+        
+        loop = asyncio.get_running_loop()
+        fetch = TCMBCurrencyService._fetch_rate_for_date
+        candidates = _candidate_days(date)
+        if not candidates:
+            return _not_found(currency_code, rate_type)
+        result = await loop.run_in_executor(None, fetch, currency_code, candidates[0], rate_type)
+        if result['success']:
+            return result
+        
+        for batch in _windows(candidates[1:], max(1, parallel)):
+            futures = [loop.run_in_executor(None, fetch, currency_code, day, rate_type) for day in batch]
+            try:
+                for future in futures:
+                    result = await future
+                    if result['success']:
+                        return result
+            finally:
+                # Sonuçları beklenmez; executor'da çalışmakta olan istekler durdurulamaz
+                for future in futures:
+                    future.cancel()
+        return _not_found(currency_code, rate_type)
     
     @staticmethod
     def _fetch_rate_for_date(currency_code: str, date: datetime, rate_type: str):
         """Belirli bir tarih için kur çeker"""
+        if TCMBCurrencyService.cache is not None:
+            return TCMBCurrencyService._rate_from_daily_table(currency_code, date, rate_type)
+        
         try:
             # TCMB URL formatı: https://www.tcmb.gov.tr/kurlar/YYYYMM/DDMMYYYY.xml
             date_str = date.strftime("%d%m%Y")
@@ -166,6 +266,189 @@ class TCMBCurrencyService:
                 'error': f'Beklenmeyen hata: {str(e)}'
             }
     
+    @staticmethod
+    def _cached_daily_rates(date: datetime):
+        """Günün kur tablosu, TCMBCurrencyService.cache üzerinden"""
+        return TCMBCurrencyService.cache.get_or_set(
+            f"tcmb|{TCMBCurrencyService.BASE_URL}|{date.strftime('%Y-%m-%d')}",
+            lambda: TCMBCurrencyService.fetch_daily_rates(date),
+            TCMBCurrencyService.CACHE_TTL,
+            cacheable=lambda result: result['success'],
+        )
+    
+    @staticmethod
+    def _rate_from_daily_table(currency_code: str, date: datetime, rate_type: str):
+        """_fetch_rate_for_date ile aynı formatta, önbellekteki günlük tablodan kur"""
+        table = TCMBCurrencyService._cached_daily_rates(date)
+        result = {
+            'success': False,
+            'rate': None,
+            'date': table['date'],
+            'currency': currency_code,
+            'rate_type': rate_type,
+        }
+        if not table['success']:
+            result['error'] = table['error']
+            return result
+        rate_value = table['rates'].get(currency_code, {}).get(rate_type)
+        if rate_value is None:
+            result['error'] = f'{currency_code} bulunamadı'
+            return result
+        result.update(success=True, rate=rate_value, source='TCMB')
+        return result
+    
+    @staticmethod
+    def fetch_daily_rates(date: datetime, timeout: float = 10):
+        """
+        Bir günün tüm kur tablosunu çeker (tatil/hafta sonu için geriye gidilmez)
+        
+        Args:
+            date: Kur tarihi
+            timeout: İstek zaman aşımı (sn)
+        
+        Returns:
+            dict: {
+                'success': bool,
+                'date': str (YYYY-MM-DD),
+                'rates': {para birimi: {kur tipi: float}},
+                'status_code': int (HTTP yanıtı alındıysa),
+                'error': str (hata durumunda)
+            }
+        """
+        day = date.strftime('%Y-%m-%d')
+        url = f"{TCMBCurrencyService.BASE_URL}/{date.strftime('%Y%m')}/{date.strftime('%d%m%Y')}.xml"
+        
+        try:
+            response = requests.get(url, timeout=timeout)
+            if response.status_code != 200:
+                return {
+                    'success': False,
+                    'date': day,
+                    'rates': {},
+                    'status_code': response.status_code,
+                    'error': f'TCMB yanıt vermedi: HTTP {response.status_code}'
+                }
+            
+            rates = {}
+            for currency in ET.fromstring(response.content).findall('Currency'):
+                code = currency.get('CurrencyCode') or currency.get('Kod')
+                values = {}
+                for element in currency:
+                    if element.tag in RATE_TYPES and element.text and element.text.strip():
+                        values[element.tag] = float(element.text.replace(',', '.'))
+                if code and values:
+                    rates[code] = values
+            
+            return {
+                'success': True,
+                'date': day,
+                'rates': rates,
+                'status_code': response.status_code
+            }
+        
+        except requests.exceptions.Timeout:
+            error = 'TCMB bağlantı zaman aşımı'
+        except requests.exceptions.RequestException as e:
+            error = f'Bağlantı hatası: {str(e)}'
+        except ET.ParseError as e:
+            error = f'XML parse hatası: {str(e)}'
+        except Exception as e:
+            error = f'Beklenmeyen hata: {str(e)}'
+        
+        return {
+            'success': False,
+            'date': day,
+            'rates': {},
+            'error': error
+        }
+    
+    @staticmethod
+    def convert_amounts(amounts, currencies, dates=None, rate_type: str = "ForexBuying",
+                        places: int = 2, rate_source=None):
+        """
+        Tutarları toplu olarak TRY'ye çevirir
+        
+        Her farklı (para birimi, tarih) çifti için kur yalnızca bir kez
+        çözülür. Çarpım tamsayı sabit noktalı aritmetikle yapılır ve satır
+        bazında ROUND_HALF_UP (yarım değerler sıfırdan uzağa) kuralıyla
+        yuvarlanır; float ikili gösterim hataları sonuca yansımaz. Toplam,
+        yuvarlanmış satırların toplamıdır (fatura satırlarıyla tutarlı olması için).
+        
+        Args:
+            amounts: Tutarlar (int, float, str veya Decimal)
+            currencies: Para birimi kodları veya tüm tutarlar için tek kod
+            dates: Kur tarihleri (datetime, date veya 'YYYY-MM-DD'), tek tarih
+                ya da None (bugün)
+            rate_type: Kur tipi (bkz. get_exchange_rate)
+            places: Sonuçtaki ondalık basamak sayısı (en fazla 6)
+            rate_source: Kur kaynağı - get_exchange_rate ile aynı imza ve
+                dönüş formatında çağrılabilir nesne (varsayılan: TCMB)
+        
+        Returns:
+            dict: {
+                'success': bool (tüm kurlar bulunduysa True),
+                'amounts': ConvertedAmounts (Decimal dizisi; kuru bulunamayan satırlar None),
+                'total': Decimal,
+                'rates': {(para birimi, 'YYYY-MM-DD'): {'rate': Decimal, 'date': str}},
+                'errors': list[dict]
+            }
+        """
+        if not 0 <= places <= _AMOUNT_DIGITS:
+            raise ValueError(f'places 0 ile {_AMOUNT_DIGITS} arasında olmalı')
+        count = len(amounts)
+        single_currency = isinstance(currencies, str)
+        single_date = dates is None or isinstance(dates, (str, date_type))
+        if (not single_currency and len(currencies) != count) or (not single_date and len(dates) != count):
+            raise ValueError('amounts, currencies ve dates aynı uzunlukta olmalı')
+        
+        rate_source = rate_source or TCMBCurrencyService.get_exchange_rate
+        
+        # Satırları (para birimi, tarih) çiftlerine göre grupla; tarih biçimi
+        # her farklı değer için bir kez normalize edilir. None = tüm satırlar
+        if single_currency and single_date:
+            groups = {(currencies, _date_key(dates)): None}
+        else:
+            currencies = [currencies] * count if single_currency else currencies
+            dates = [dates] * count if single_date else dates
+            raw_groups = defaultdict(list)
+            for i, key in enumerate(zip(currencies, dates)):
+                raw_groups[key].append(i)
+            groups = {}
+            for (currency, day), indexes in raw_groups.items():
+                groups.setdefault((currency, _date_key(day)), []).extend(indexes)
+        
+        rates = {}
+        errors = []
+        minor_units = [0] * count
+        missing = set()
+        for (currency, day), indexes in groups.items():
+            if currency == 'TRY':
+                rates[(currency, day)] = {'rate': Decimal(1), 'date': day}
+            else:
+                result = rate_source(currency, datetime.strptime(day, '%Y-%m-%d'), rate_type)
+                if not result.get('success'):
+                    errors.append({'currency': currency, 'date': day, 'error': result.get('error')})
+                    missing.update(range(count) if indexes is None else indexes)
+                    continue
+                rates[(currency, day)] = {'rate': _to_decimal(result['rate']), 'date': result.get('date', day)}
+            
+            rate = rates[(currency, day)]['rate']
+            if indexes is None:
+                minor_units = _apply_rate(list(amounts), rate, places)
+            else:
+                values = _apply_rate([amounts[i] for i in indexes], rate, places)
+                for i, value in zip(indexes, values):
+                    minor_units[i] = value
+        
+        converted = ConvertedAmounts(minor_units, places, missing)
+        return {
+            'success': not errors,
+            'amounts': converted,
+            'total': converted.total,
+            'rates': rates,
+            'errors': errors
+        }
+    
     @staticmethod
     def get_latest_usd_buy_rate():
         """USD Alış kurunu çeker (bugün veya en yakın iş günü)"""
@@ -175,3 +458,119 @@ class TCMBCurrencyService:
     def get_latest_eur_buy_rate():
         """EUR Alış kurunu çeker (bugün veya en yakın iş günü)"""
         return TCMBCurrencyService.get_exchange_rate('EUR', rate_type='ForexBuying')
+
+
+
+# Hızlı yolda tutarlar 10^-6 hassasiyetli tamsayılara çevrilir; bu sınırın
+# altındaki float'larda çarpım 2^53'ü aşmaz ve sonuç tam olarak yuvarlanır.
+# Daha fazla ondalık taşıyan tutarlar Decimal yoluna gönderilir
+_AMOUNT_DIGITS = 6
+_AMOUNT_SCALE = 10 ** _AMOUNT_DIGITS
+_FAST_LIMIT = 10 ** 9
+_FAST_TYPES = frozenset([float, int])
+
+
+class ConvertedAmounts(Sequence):
+    """
+    convert_amounts sonucu
+
+    Değerler 10^-places birim cinsinden tamsayı olarak tutulur (minor_units),
+    erişildikçe Decimal'e çevrilir. Kuru bulunamayan satırlar None döner.
+    """
+
+    def __init__(self, minor_units: list, places: int, missing=()):
+        self.minor_units = minor_units
+        self.places = places
+        self.missing = frozenset(missing)
+
+    def __len__(self):
+        return len(self.minor_units)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index in self.missing:
+            return None
+        return Decimal(self.minor_units[index]).scaleb(-self.places)
+
+    @property
+    def total(self) -> Decimal:
+        """Yuvarlanmış satırların toplamı (kuru bulunamayanlar hariç)"""
+        total = sum(self.minor_units)
+        return Decimal(total).scaleb(-self.places)
+
+    def __repr__(self):
+        return f'ConvertedAmounts({len(self)} satır, toplam={self.total})'
+
+
+def _apply_rate(values: list, rate: Decimal, places: int) -> list:
+    """Aynı kurdaki tutarları çevirip 10^-places birim cinsinden tamsayı olarak döndürür"""
+    sign, digits, exponent = rate.as_tuple()
+    rate_digits = max(0, -exponent)
+    rate_int = int(rate.scaleb(rate_digits))
+    divisor = 10 ** (_AMOUNT_DIGITS + rate_digits - places)
+    half = divisor // 2
+
+    quantum = Decimal(1).scaleb(-places)
+
+    def exact(v):
+        return int((_to_decimal(v) * rate).quantize(quantum, rounding=ROUND_HALF_UP).scaleb(places))
+
+    fast = bool(values) and set(map(type, values)) <= _FAST_TYPES and \
+        -_FAST_LIMIT < min(values) and max(values) < _FAST_LIMIT
+    if not fast:
+        return [exact(v) for v in values]
+
+    scaled = [round(v * _AMOUNT_SCALE) for v in values]
+    result = [
+        (p + half) // divisor if p >= 0 else -((half - p) // divisor)
+        for p in (s * rate_int for s in scaled)
+    ]
+    # 6'dan fazla ondalıklı tutarlar 10^-6'ya yuvarlanınca sonuç iki kez
+    # yuvarlanmış olur; bunlar Decimal ile hesaplanır
+    for i, (s, v) in enumerate(zip(scaled, values)):
+        if s / _AMOUNT_SCALE != v:
+            result[i] = exact(v)
+    return result
+
+
+def _to_decimal(value) -> Decimal:
+    """float'ları ikili gösterim hatası taşımadan Decimal'e çevirir (10.005 -> Decimal('10.005'))"""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def _date_key(value) -> str:
+    """Tarihi 'YYYY-MM-DD' biçimine getirir (None = bugün)"""
+    if value is None:
+        value = datetime.now()
+    if isinstance(value, str):
+        return value[:10]
+    return value.strftime('%Y-%m-%d')
+
+
+def _candidate_days(date: datetime, days: int = None) -> list:
+    """Tarihten geriye doğru, son WALK_BACK_DAYS gün içindeki iş günleri (en yeni önce)"""
+    days = days or WALK_BACK_DAYS
+    return [date - timedelta(days=i) for i in range(days) if (date - timedelta(days=i)).weekday() < 5]
+
+
+def _windows(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _not_found(currency_code: str, rate_type: str) -> dict:
+    return {
+        'success': False,
+        'rate': None,
+        'date': None,
+        'currency': currency_code,
+        'rate_type': rate_type,
+        'error': f'Son {WALK_BACK_DAYS} gün içinde kur bulunamadı'
+    }
@@ -0,0 +1,183 @@
+# nilvera_client/dedup.py
+# Mükerrer Gönderim Koruması - Fatura içeriğinin kanonik özetine göre yerel indeks
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Aynı faturanın yeniden gönderiminde değişebilen alanlar (yol, anahtar dizisi)
+DEFAULT_VOLATILE_FIELDS = (
+    ('InvoiceInfo', 'UUID'),
+)
+
+PENDING = 'pending'
+CREATED = 'created'
+
+
+def _strip(data, path):
+    """Verilen yoldaki alanı çıkarılmış sığ bir kopya döndürür"""
+    if not isinstance(data, dict) or path[0] not in data:
+        return data
+    data = dict(data)
+    if len(path) == 1:
+        del data[path[0]]
+    else:
+        data[path[0]] = _strip(data[path[0]], path[1:])
+    return data
+
+
+def invoice_fingerprint(invoice_data: dict, kind: str = 'einvoice',
+                        volatile_fields=DEFAULT_VOLATILE_FIELDS) -> bytes:
+    """
+    Faturanın içerik özetini üretir
+
+    Anahtar sırası ve boşluklar özeti etkilemez; volatile_fields içindeki
+    alanlar (varsayılan: InvoiceInfo.UUID) hesaba katılmaz.
+
+    Args:
+        invoice_data: Fatura verisi (Nilvera formatında)
+        kind: 'einvoice' veya 'earchive' (aynı içerik iki türde ayrı sayılır)
+        volatile_fields: Hesaba katılmayacak alan yolları
+
+    Returns:
+        bytes: 16 baytlık SHA-256 özeti
+    """
+    for path in volatile_fields:
+        invoice_data = _strip(invoice_data, tuple(path))
+    raw = json.dumps([kind, invoice_data], sort_keys=True, separators=(',', ':'),
+                     ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).digest()[:16]
+
+
+class DedupIndex:
+    """
+    Fatura özeti -> UUID eşlemesini tutan SQLite (WAL) indeksi
+
+    Özetler 16 baytlık birincil anahtar olarak ROWID'siz tabloda saklanır;
+    milyonlarca kayıtta da arama birkaç sayfa okumasıyla biter.
+
+    claim() atomiktir: aynı içerik farklı thread veya process'lerden aynı anda
+    gelse bile yalnızca biri gönderim hakkını alır, diğerleri ilk UUID'yi ve
+    gönderimin durumunu (pending / created) görür.
+
+    Gönderimi süren ('pending') ayırmalar lease süresi kadar geçerlidir.
+    Sonucu belirsiz kalan (zaman aşımı) veya process çöktüğü için
+    tamamlanmayan ayırmalar bu süreden sonra başka bir gönderime devredilir.
+
+    Args:
+        path: SQLite dosyası (':memory:' ile yalnızca process ömrü boyunca)
+        volatile_fields: Özete katılmayacak alan yolları
+        ttl: Verilirse bu süreden (sn) eski kayıtlar eşleşme sayılmaz
+        lease: 'pending' ayırmaların geçerlilik süresi (sn)
+
+    Kullanım:
+        >>> index = DedupIndex('dedup.db')
+        >>> client = NilveraClient(api_key='...', dedup_index=index)
+    """
+
+    def __init__(self, path: str, volatile_fields=DEFAULT_VOLATILE_FIELDS, ttl: float = None,
+                 lease: float = 300.0):
+        self.path = path
+        self.volatile_fields = tuple(tuple(p) for p in volatile_fields)
+        self.ttl = ttl
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS dedup ('
+            'fingerprint BLOB PRIMARY KEY, uuid TEXT NOT NULL, state TEXT NOT NULL, '
+            'created_at REAL NOT NULL) WITHOUT ROWID'
+        )
+
+    def fingerprint(self, invoice_data: dict, kind: str = 'einvoice') -> bytes:
+        """Bu indeksin ayarlarıyla fatura özeti"""
+        return invoice_fingerprint(invoice_data, kind, self.volatile_fields)
+
+    def claim(self, fingerprint: bytes, invoice_uuid: str):
+        """
+        Özeti bu UUID adına ayırır
+
+        Returns:
+            tuple veya None: Aynı içerik başka bir UUID ile kaydedilmişse
+            (uuid, durum) - durum 'created' (gönderildi) veya 'pending'
+            (gönderim sürüyor); değilse None (gönderim bu çağırana aittir)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT uuid, state, created_at FROM dedup WHERE fingerprint = ?', (fingerprint,)
+                ).fetchone()
+                if row:
+                    existing, state, created_at = row
+                    limit = self.lease if state == PENDING else self.ttl
+                    if limit is None or now - created_at < limit:
+                        self._conn.execute('COMMIT')
+                        return (existing, state) if existing != invoice_uuid else None
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO dedup (fingerprint, uuid, state, created_at) VALUES (?, ?, ?, ?)',
+                    (fingerprint, invoice_uuid, PENDING, now)
+                )
+                self._conn.execute('COMMIT')
+                return None
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def confirm(self, fingerprint: bytes, invoice_uuid: str = None):
+        """Gönderim başarılı oldu; kayıt kalıcıdır"""
+        now = time.time()
+        with self._lock:
+            if invoice_uuid is None:
+                self._conn.execute('UPDATE dedup SET state = ?, created_at = ? WHERE fingerprint = ?',
+                                   (CREATED, now, fingerprint))
+                return
+            # Lease süresi dolup ayırma devredildiyse bile gönderilen fatura kaydedilir
+            self._conn.execute(
+                'INSERT OR REPLACE INTO dedup (fingerprint, uuid, state, created_at) VALUES (?, ?, ?, ?)',
+                (fingerprint, invoice_uuid, CREATED, now)
+            )
+
+    def release(self, fingerprint: bytes, invoice_uuid: str):
+        """API gönderimi reddetti; içerik yeniden gönderilebilir"""
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM dedup WHERE fingerprint = ? AND uuid = ? AND state = ?',
+                (fingerprint, invoice_uuid, PENDING)
+            )
+
+    def lookup(self, invoice_data: dict, kind: str = 'einvoice'):
+        """
+        Aynı içerikle kaydedilmiş UUID
+
+        claim() ile aynı kuralla süresi dolmuş kayıtlar (ttl / lease) eşleşme
+        sayılmaz.
+
+        Returns:
+            str veya None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT uuid, state, created_at FROM dedup WHERE fingerprint = ?',
+                (self.fingerprint(invoice_data, kind),)
+            ).fetchone()
+        if row is None:
+            return None
+        existing, state, created_at = row
+        limit = self.lease if state == PENDING else self.ttl
+        if limit is not None and time.time() - created_at >= limit:
+            return None
+        return existing
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM dedup').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
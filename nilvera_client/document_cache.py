@@ -0,0 +1,216 @@
+# nilvera_client/document_cache.py
+# Doküman Önbelleği - Kesilmiş fatura PDF / HTML / XML dosyaları için içerik adresli disk önbelleği
+
+import hashlib
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class CachedDocument:
+    """
+    Önbellekteki tek bir doküman
+
+    İçerik diskteki dosyada kalır; read() kopya üretir, mmap() ve path ise
+    dosyayı kopyalamadan sunmak (sendfile, FileResponse, wsgi.file_wrapper)
+    için kullanılır.
+    """
+
+    __slots__ = ('uuid', 'format', 'digest', 'path', 'size', 'content_type')
+
+    def __init__(self, uuid, format, digest, path, size, content_type):
+        self.uuid = uuid
+        self.format = format
+        self.digest = digest
+        self.path = path
+        self.size = size
+        self.content_type = content_type
+
+    def open(self):
+        """Dokümanı ikili okuma modunda açar"""
+        return open(self.path, 'rb')
+
+    def mmap(self):
+        """Salt okunur bellek eşlemesi (boş dosyada b'')"""
+        if not self.size:
+            return b''
+        with open(self.path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self) -> bytes:
+        with self.open() as f:
+            return f.read()
+
+    def __repr__(self):
+        return f'<CachedDocument {self.uuid}.{self.format} {self.size} bayt>'
+
+
+class DocumentCache:
+    """
+    Kesilmiş faturaların dokümanları için içerik adresli disk önbelleği
+
+    Kesilmiş (Sale) faturalar değişmez; aynı UUID ve format için doküman bir
+    kez indirilir. İçerik SHA-256 özetiyle adlandırılmış dosyalarda
+    (objects/ab/abcd...) tutulur, aynı içerik birden fazla UUID / format
+    tarafından paylaşılsa da diskte bir kez yer kaplar. UUID -> özet eşlemesi
+    ve son erişim zamanı SQLite (WAL) indeksinde saklanır; aynı dizini
+    birden fazla process kullanabilir.
+
+    Kayıtlar namespace ile ayrılır (client ortam ve API anahtarı özetini
+    verir); test ortamındaki veya başka bir hesabın aynı UUID'li dokümanı
+    okunmaz. Aynı içerik farklı namespace'lerde de diskte bir kez tutulur.
+
+    Toplam boyut max_bytes'ı aşınca en uzun süredir okunmayan içerikler
+    silinir (LRU). Taslak dokümanlar önbelleğe alınmaz; bu kontrol client
+    tarafında yapılır.
+
+    Args:
+        directory: Önbellek dizini (yoksa oluşturulur)
+        max_bytes: Dosyaların toplam boyut sınırı
+
+    Kullanım:
+        >>> cache = DocumentCache('/var/cache/nilvera/documents', max_bytes=5 * 1024 ** 3)
+        >>> client = NilveraClient(api_key='...', document_cache=cache)
+        >>> client.get_invoice_pdf(uuid)          # ilk çağrıda indirilir
+        >>> client.get_invoice_pdf(uuid)          # ağa çıkmadan diskten
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._objects = os.path.join(directory, 'objects')
+        os.makedirs(self._objects, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False,
+                                     isolation_level=None, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS documents ('
+            'namespace TEXT NOT NULL, uuid TEXT NOT NULL, format TEXT NOT NULL, digest TEXT NOT NULL, '
+            'content_type TEXT, PRIMARY KEY (namespace, uuid, format)) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS documents_digest ON documents (digest)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS blobs ('
+            'digest TEXT PRIMARY KEY, size INTEGER NOT NULL, accessed_at REAL NOT NULL) WITHOUT ROWID'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS blobs_accessed_at ON blobs (accessed_at)')
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def get(self, invoice_uuid: str, doc_format: str, namespace: str = ''):
+        """
+        Önbellekteki doküman
+
+        Args:
+            invoice_uuid: Fatura UUID'si
+            doc_format: 'pdf', 'html' veya 'xml'
+            namespace: Ortam / hesap ayracı (client._cache_namespace)
+
+        Returns:
+            CachedDocument veya None
+        """
+        invoice_uuid = invoice_uuid.lower()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT d.digest, d.content_type, b.size FROM documents d '
+                'JOIN blobs b ON b.digest = d.digest WHERE d.namespace = ? AND d.uuid = ? AND d.format = ?',
+                (namespace, invoice_uuid, doc_format)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, content_type, size = row
+            path = self._path(digest)
+            if not os.path.exists(path):
+                # Dosya başka bir process tarafından silinmiş
+                self._conn.execute('DELETE FROM documents WHERE digest = ?', (digest,))
+                self._conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                return None
+            self._conn.execute('UPDATE blobs SET accessed_at = ? WHERE digest = ?', (time.time(), digest))
+        return CachedDocument(invoice_uuid, doc_format, digest, path, size, content_type)
+
+    def put(self, invoice_uuid: str, doc_format: str, content: bytes, content_type: str = None,
+            namespace: str = ''):
+        """
+        Dokümanı saklar (namespace get() ile aynı)
+
+        Returns:
+            CachedDocument
+        """
+        invoice_uuid = invoice_uuid.lower()
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Yarım yazılmış dosya hiçbir zaman görünmez: geçici dosya + atomik rename
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO blobs (digest, size, accessed_at) VALUES (?, ?, ?)',
+                    (digest, len(content), time.time())
+                )
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO documents (namespace, uuid, format, digest, content_type) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (namespace, invoice_uuid, doc_format, digest, content_type)
+                )
+                evicted = self._evict(keep=digest)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        for old_digest in evicted:
+            try:
+                os.unlink(self._path(old_digest))
+            except FileNotFoundError:
+                pass
+        return CachedDocument(invoice_uuid, doc_format, digest, path, len(content), content_type)
+
+    def _evict(self, keep: str) -> list:
+        """Boyut sınırı aşıldıysa en eski erişilen içerikleri indeksten siler"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+        evicted = []
+        if total <= self.max_bytes:
+            return evicted
+        for digest, size in self._conn.execute(
+                'SELECT digest, size FROM blobs WHERE digest != ? ORDER BY accessed_at', (keep,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM documents WHERE digest = ?', (digest,))
+            self._conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+            evicted.append(digest)
+            total -= size
+        return evicted
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
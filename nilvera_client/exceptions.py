@@ -28,3 +28,16 @@ class NilveraAPIError(NilveraException):
         super().__init__(message)
         self.status_code = status_code
         self.response = response
+
+
+class NilveraQueueFullError(NilveraException):
+    """İstek kuyruğu dolu olduğunda (backpressure)"""
+    pass
+
+
+class NilveraValidationError(NilveraException):
+    """Fatura verisi yerel doğrulamadan geçemediğinde"""
+    
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
@@ -0,0 +1,262 @@
+# nilvera_client/hedging.py
+# Hedged İstekler - Idempotent GET'lerde kuyruk gecikmesini azaltmak için yedek istek
+
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .exceptions import NilveraConnectionError, NilveraTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# URL'deki UUID ve sayısal parçalar gecikme istatistiği için tek grupta toplanır
+_VARIABLE_SEGMENT = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)$')
+
+
+def endpoint_key(url: str) -> str:
+    """URL'i değişken parçalarından arındırılmış endpoint anahtarına çevirir"""
+    path = urlsplit(url).path
+    return '/'.join('*' if _VARIABLE_SEGMENT.match(part) else part for part in path.split('/'))
+
+
+class HedgingPolicy:
+    """
+    Idempotent GET istekleri için hedging politikası
+
+    Birincil istek çağıranın thread'inde, hiçbir havuzda beklemeden çalışır.
+    Yanıtı endpoint'in gözlenen gecikme yüzdeliği kadar süre içinde gelmezse
+    aynı istek sınırlı bir havuzda ikinci kez gönderilir. Birincil istek
+    başarılı olursa onun yanıtı kullanılır; henüz gönderilmemiş yedek iptal
+    edilir, gönderilmiş yedeğin yanıtı kapatılıp bağlantısı serbest bırakılır.
+    Birincil istek zaman aşımı veya bağlantı hatasıyla biterse yeniden deneme
+    turu beklenmeden yedeğin sonucu kullanılır.
+
+    Yedekler istek başına thread açılmadan tek bir zamanlayıcı thread'i
+    tarafından başlatılır; havuz doluyken yedek gönderilmez.
+
+    Yedek istekler bir token bütçesiyle sınırlıdır: her birincil istek
+    `budget` kadar token ekler, her yedek istek bir token harcar. Böylece
+    yedek istekler toplam yükün en fazla `budget` oranı kadar artmasına
+    yol açar.
+
+    Args:
+        percentile: Bekleme süresinin hesaplandığı gecikme yüzdeliği
+        min_delay: En kısa bekleme süresi (sn)
+        max_delay: En uzun bekleme süresi (sn)
+        initial_delay: Yeterli örnek yokken kullanılan bekleme süresi (sn)
+        min_samples: Yüzdelik hesabı için gereken en az örnek sayısı
+        window: Endpoint başına tutulan son gecikme örneği sayısı
+        budget: Ek yük oranı üst sınırı (0.1 = en fazla %10 ek istek)
+        max_workers: Aynı anda en fazla yedek istek sayısı (yedek havuzunun boyutu)
+    """
+
+    def __init__(self, percentile: float = 95, min_delay: float = 0.01, max_delay: float = 2.0,
+                 initial_delay: float = 0.5, min_samples: int = 20, window: int = 500,
+                 budget: float = 0.05, max_workers: int = 64):
+        if not 0 <= budget <= 1:
+            raise ValueError('budget 0 ile 1 arasında olmalı')
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+        self.max_tokens = max(1.0, budget * 100)
+
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='nilvera-hedge')
+        self._timer = _HedgeTimer()
+        self._lock = threading.Lock()
+        self._hedges_in_flight = 0
+        self._samples = {}
+        self._tokens = 0.0
+
+        self.primaries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    # ---- Gecikme istatistikleri ----
+
+    def record(self, key: str, latency: float):
+        """Bir yanıt süresini kaydeder"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def delay(self, key: str) -> float:
+        """Yedek istek gönderilmeden önce beklenecek süre (sn)"""
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        samples.sort()
+        index = min(int(len(samples) * self.percentile / 100.0), len(samples) - 1)
+        return min(max(samples[index], self.min_delay), self.max_delay)
+
+    # ---- Bütçe ----
+
+    def _add_primary(self):
+        with self._lock:
+            self.primaries += 1
+            self._tokens = min(self._tokens + self.budget, self.max_tokens)
+
+    def _try_acquire_hedge(self) -> bool:
+        with self._lock:
+            # Havuz doluysa yedek kuyrukta beklemek yerine hiç gönderilmez
+            if self._tokens < 1.0 or self._hedges_in_flight >= self.max_workers:
+                return False
+            self._tokens -= 1.0
+            self._hedges_in_flight += 1
+            self.hedges += 1
+            return True
+
+    def _hedge_done(self, future):
+        with self._lock:
+            self._hedges_in_flight -= 1
+
+    # ---- Yürütme ----
+
+    def execute(self, key: str, fn):
+        """
+        fn'i hedging politikasıyla çalıştırır
+
+        Args:
+            key: Gecikme istatistiğinin tutulduğu endpoint anahtarı
+            fn: Yanıt döndüren çağrı (yan etkisiz olmalı)
+
+        Returns:
+            Birincil isteğin sonucu; birincil zaman aşımı veya bağlantı
+            hatasıyla biterse yedeğin sonucu
+        """
+        self._add_primary()
+
+        def timed():
+            start = time.perf_counter()
+            result = fn()
+            self.record(key, time.perf_counter() - start)
+            return result
+
+        call_lock = threading.Lock()
+        state = {'finished': False, 'hedge': None}
+
+        def launch():
+            with call_lock:
+                if state['finished'] or not self._try_acquire_hedge():
+                    return
+                logger.debug(f"Hedged istek gönderiliyor: {key}")
+                hedge = self._executor.submit(timed)
+                hedge.add_done_callback(self._hedge_done)
+                state['hedge'] = hedge
+
+        entry = self._timer.schedule(self.delay(key), launch)
+        error = None
+        try:
+            result = timed()
+        except (NilveraTimeoutError, NilveraConnectionError) as e:
+            error = e
+        finally:
+            self._timer.cancel(entry)
+            with call_lock:
+                state['finished'] = True
+                hedge = state['hedge']
+            if hedge is not None and error is None:
+                hedge.add_done_callback(_close_response)
+
+        if error is None:
+            return result
+        if hedge is None:
+            raise error
+        try:
+            result = hedge.result()
+        except (NilveraTimeoutError, NilveraConnectionError):
+            raise error
+        with self._lock:
+            self.hedge_wins += 1
+        return result
+
+    def stats(self) -> dict:
+        """Politika sayaçları"""
+        with self._lock:
+            return {
+                'primaries': self.primaries,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'hedge_ratio': round(self.hedges / self.primaries, 4) if self.primaries else 0.0,
+            }
+
+    def close(self):
+        self._timer.close()
+        self._executor.shutdown(wait=False)
+
+
+class _HedgeTimer:
+    """Zamanı gelen yedek istekleri tek bir thread'den başlatan zamanlayıcı"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+        self._closed = False
+
+    def schedule(self, delay: float, callback) -> list:
+        """callback'i delay saniye sonra çalıştırır; iptal için kayıt döner"""
+        entry = [callback]
+        with self._cond:
+            if self._closed:
+                return entry
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), entry))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='nilvera-hedge-timer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return entry
+
+    def cancel(self, entry: list):
+        with self._cond:
+            entry[0] = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._heap:
+                        remaining = self._heap[0][0] - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    return
+                _, _, entry = heapq.heappop(self._heap)
+                callback, entry[0] = entry[0], None
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("Hedged istek başlatılamadı")
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+
+
+def _close_response(future):
+    """Kaybeden isteğin yanıtını kapatıp bağlantıyı havuza iade eder"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), 'close', None)
+    if close:
+        close()
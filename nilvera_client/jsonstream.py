@@ -0,0 +1,184 @@
+# nilvera_client/jsonstream.py
+# Artımlı JSON Ayrıştırma - Büyük liste yanıtlarının öğelerini gövde geldikçe üretir
+
+import codecs
+import json
+import re
+
+# Yapısal karakterler; aradaki sayı / sabit / boşluk karakterleri tek tek incelenmez
+_STRUCTURAL = re.compile(r'["\[\]{},:]')
+_STRING_END = re.compile(r'["\\]')
+_NON_WHITESPACE = re.compile(r'\S')
+
+_decode = json.JSONDecoder().raw_decode
+
+
+class JSONArrayStream:
+    """
+    JSON gövdesindeki bir dizinin öğelerini parça parça üretir
+
+    Gövde bytes parçaları halinde okunur. Hedef diziye kadar yalnızca yapısal
+    karakterler taranır; dizinin her öğesi tamamlandığı anda json modülünün
+    C ayrıştırıcısıyla (raw_decode) çözülüp üretilir. Bellekte en fazla bir
+    öğe ve bir parça tutulur; sayfa boyutu büyüdükçe tepe bellek artmaz.
+
+    Hedef dizi path ile seçilir: () gövdenin kendisi bir diziyse, ('Content',)
+    {"Content": [...]} gibi sayfalı yanıtlar için. Üst seviye nesnenin skaler
+    alanları (TotalCount, TotalPages ...) okundukça meta'ya yazılır; dizi
+    tüketildikten sonra tamamı erişilebilir.
+
+    Args:
+        chunks: bytes parçaları üreten iterable (ör. response.iter_content())
+        path: Hedef dizinin anahtar yolu
+
+    Kullanım:
+        >>> stream = JSONArrayStream(response.iter_content(65536), path=('Content',))
+        >>> for invoice in stream:
+        ...     process(invoice)
+        >>> stream.meta.get('TotalPages')
+    """
+
+    def __init__(self, chunks, path=()):
+        self.path = tuple(path)
+        self.meta = {}
+        self.found = False
+        self._chunks = iter(chunks)
+
+    def __iter__(self):
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        buf = ''
+        pos = 0
+        eof = False
+        # Her seviye için [tür, geçerli anahtar, anahtar bekleniyor mu]
+        stack = []
+        target = None
+        need_value = after_comma = False
+        meta_start = None
+        key_start = None
+        in_string = False
+
+        while True:
+            if target is not None and len(stack) == target:
+                # Hedef dizi: her öğe C ayrıştırıcısıyla (raw_decode) tek adımda çözülür
+                match = _NON_WHITESPACE.search(buf, pos)
+                if match is not None:
+                    char = buf[match.start()]
+                    if char == ']':
+                        if after_comma:
+                            raise ValueError('Geçersiz JSON: dizide sondaki virgül')
+                        pos = match.end()
+                        stack.pop()
+                        target = None
+                        continue
+                    if char == ',' and not need_value:
+                        pos = match.end()
+                        need_value = after_comma = True
+                        continue
+                    if not need_value:
+                        raise ValueError(f'Geçersiz JSON: beklenmeyen karakter {char!r}')
+                    try:
+                        value, end = _decode(buf, match.start())
+                        # Parça sonunda kesilen sayı ('-2' + '.5') da çözülebilir;
+                        # öğe ancak ardından ',' veya ']' geldiğinde tamamdır
+                        after = _NON_WHITESPACE.search(buf, end)
+                        complete = after is not None and buf[after.start()] in ',]'
+                    except json.JSONDecodeError:
+                        complete = False
+                    if complete:
+                        yield value
+                        pos = end
+                        need_value = after_comma = False
+                        continue
+                    if eof:
+                        raise ValueError('Geçersiz JSON: dizi öğesi çözülemedi')
+                    pos = match.start()
+                else:
+                    pos = len(buf)
+
+            elif in_string:
+                match = _STRING_END.search(buf, pos)
+                if match is not None:
+                    if buf[match.start()] == '"':
+                        in_string = False
+                        pos = match.end()
+                        if key_start is not None:
+                            stack[-1][1] = json.loads(buf[key_start:pos])
+                            stack[-1][2] = False
+                            key_start = None
+                        continue
+                    if match.start() + 1 < len(buf):
+                        pos = match.start() + 2
+                        continue
+                    # Kaçış karakteri parça sonunda; devamı beklenir
+                    pos = match.start()
+                else:
+                    pos = len(buf)
+
+            else:
+                match = _STRUCTURAL.search(buf, pos)
+                if match is not None:
+                    char = buf[match.start()]
+                    pos = match.end()
+                    depth = len(stack)
+
+                    if char == '"':
+                        in_string = True
+                        if depth and stack[-1][0] == '{' and stack[-1][2]:
+                            key_start = pos - 1
+
+                    elif char == ',':
+                        if depth and stack[-1][0] == '{':
+                            if depth == 1 and meta_start is not None:
+                                self.meta[stack[0][1]] = json.loads(buf[meta_start:pos - 1])
+                                meta_start = None
+                            stack[-1][2] = True
+
+                    elif char == ':':
+                        if depth == 1 and stack[0][0] == '{':
+                            meta_start = pos
+
+                    elif char == '[' or char == '{':
+                        if depth == 1:
+                            # Üst seviyedeki iç içe değerler meta'ya alınmaz
+                            meta_start = None
+                        if (char == '[' and not self.found and
+                                all(level[0] == '{' for level in stack) and
+                                tuple(level[1] for level in stack) == self.path):
+                            self.found = True
+                            target = depth + 1
+                            need_value, after_comma = True, False
+                        stack.append([char, None, char == '{'])
+
+                    else:
+                        if not stack:
+                            raise ValueError('Geçersiz JSON: beklenmeyen kapanış')
+                        if depth == 1 and meta_start is not None:
+                            self.meta[stack[0][1]] = json.loads(buf[meta_start:pos - 1])
+                            meta_start = None
+                        stack.pop()
+                    continue
+                pos = len(buf)
+
+            # Yeni parça gerekli; artık ihtiyaç duyulmayan karakterler atılır
+            if eof:
+                break
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                eof = True
+                buf += decoder.decode(b'', final=True)
+                continue
+            keep = min(x for x in (pos, meta_start, key_start) if x is not None)
+            if keep:
+                buf = buf[keep:]
+                pos -= keep
+                meta_start = None if meta_start is None else meta_start - keep
+                key_start = None if key_start is None else key_start - keep
+            buf += decoder.decode(chunk)
+
+        if stack or in_string:
+            raise ValueError('Geçersiz JSON: gövde beklenmedik şekilde bitti')
+
+
+def iter_json_array(chunks, path=()):
+    """JSONArrayStream kısayolu: hedef dizinin öğelerini üretir"""
+    return iter(JSONArrayStream(chunks, path))
@@ -0,0 +1,379 @@
+# nilvera_client/outbox.py
+# Kalıcı Giden Kutusu - Faturaların SQLite günlüğü üzerinden toplu ve çökme güvenli gönderimi
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid as uuid_lib
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import _split_confirm_result
+from .exceptions import NilveraAPIError, NilveraException
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+CREATING = 'creating'
+CREATED = 'created'
+CONFIRMING = 'confirming'
+SENT = 'sent'
+FAILED = 'failed'
+REVIEW = 'review'
+
+EINVOICE = 'einvoice'
+EARCHIVE = 'earchive'
+
+DEFAULT_ALIAS = "urn:mail:ihracatpk@gtb.gov.tr"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    uuid TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    customer_alias TEXT NOT NULL DEFAULT '',
+    alias TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_state ON outbox (state, created_at);
+"""
+
+
+class InvoiceOutbox:
+    """
+    Fatura gönderimleri için SQLite (WAL) tabanlı kalıcı giden kutusu
+
+    Çağıranlar enqueue() ile faturayı günlüğe yazar ve hemen döner; flush()
+    (veya start() ile başlatılan arka plan thread'i) taslakları oluşturur,
+    toplu olarak onaylayıp gönderir ve sonucu günlüğe kaydeder.
+
+    Her adımdan önce durum günlüğe yazılır (pending -> creating -> created ->
+    confirming -> sent). Process çökerse yarım kalan kayıtlar bir sonraki
+    flush'ta doğrulanarak devam ettirilir:
+        - creating: taslak yeniden oluşturulmaya çalışılır; başarısız olursa
+          taslağın var olup olmadığı sorgulanır (her başarısız oluşturmada
+          olduğu gibi)
+        - confirming: E-Fatura için durum sorgulanır; yalnızca 404'te taslak
+          yeniden onaylanır, diğer hatalarda kayıt beklemede kalır. E-Arşiv'de
+          durum sorgusu olmadığından kayıt 'review' (manuel kontrol) olur
+
+    Onaylama isteği zaman aşımına uğrar veya bağlantı koparsa kayıtlar
+    'confirming' kalır ve tekrar gönderilmeden önce doğrulanır; toplu istek
+    yalnızca API tarafından reddedildiğinde tek tek yeniden denenir.
+
+    Args:
+        client: NilveraClient örneği
+        path: SQLite dosyası
+        batch_size: Bir onaylama isteğindeki en fazla fatura sayısı
+        max_attempts: Bu kadar başarısız denemeden sonra kayıt 'failed' olur
+        workers: Taslak oluşturma için eşzamanlı istek sayısı
+
+    Kullanım:
+        >>> outbox = InvoiceOutbox(client, 'outbox.db')
+        >>> outbox.enqueue(invoice_data)
+        >>> outbox.start(interval=5)
+    """
+
+    def __init__(self, client, path: str, batch_size: int = 50, max_attempts: int = 5,
+                 workers: int = 4):
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.workers = workers
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ==================== Günlük ====================
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _set_state(self, uuids, state: str, error: str = None, result=None, count_attempt: bool = False):
+        if not uuids:
+            return
+        now = time.time()
+        result_json = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(
+                    'UPDATE outbox SET state = ?, last_error = ?, result = COALESCE(?, result), '
+                    'attempts = attempts + ?, updated_at = ? WHERE uuid = ?',
+                    [(state, error, result_json, 1 if count_attempt else 0, now, u) for u in uuids]
+                )
+                if count_attempt:
+                    # Deneme hakkı biten kayıtlar kalıcı olarak başarısız sayılır
+                    self._conn.executemany(
+                        'UPDATE outbox SET state = ? WHERE uuid = ? AND attempts >= ? AND state != ?',
+                        [(FAILED, u, self.max_attempts, SENT) for u in uuids]
+                    )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def enqueue(self, invoice_data: dict, kind: str = EINVOICE, customer_alias: str = "",
+                alias: str = DEFAULT_ALIAS) -> str:
+        """
+        Faturayı giden kutusuna yazar ve hemen döner
+
+        Args:
+            invoice_data: Fatura verisi (Nilvera formatında); UUID yoksa üretilir
+            kind: 'einvoice' veya 'earchive'
+            customer_alias: Taslak oluştururken kullanılan müşteri alias'ı (E-Fatura)
+            alias: Gönderimde kullanılan alıcı alias'ı (E-Fatura)
+
+        Returns:
+            str: Fatura UUID'si (aynı UUID ikinci kez eklenirse yok sayılır)
+        """
+        if kind not in (EINVOICE, EARCHIVE):
+            raise ValueError("kind 'einvoice' veya 'earchive' olmalı")
+
+        info = invoice_data.setdefault('InvoiceInfo', {})
+        invoice_uuid = info.get('UUID') or str(uuid_lib.uuid4())
+        info['UUID'] = invoice_uuid
+
+        now = time.time()
+        self._execute(
+            'INSERT OR IGNORE INTO outbox (uuid, kind, payload, customer_alias, alias, state, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (invoice_uuid, kind, json.dumps(invoice_data, ensure_ascii=False), customer_alias or '',
+             alias or '', PENDING, now, now)
+        )
+        self._wakeup.set()
+        return invoice_uuid
+
+    def get(self, invoice_uuid: str):
+        """
+        Kaydın güncel durumunu döndürür
+
+        Returns:
+            dict veya None: {'uuid', 'kind', 'state', 'attempts', 'last_error', 'result'}
+        """
+        rows = self._execute(
+            'SELECT uuid, kind, state, attempts, last_error, result FROM outbox WHERE uuid = ?',
+            (invoice_uuid,)
+        )
+        if not rows:
+            return None
+        u, kind, state, attempts, last_error, result = rows[0]
+        return {
+            'uuid': u,
+            'kind': kind,
+            'state': state,
+            'attempts': attempts,
+            'last_error': last_error,
+            'result': json.loads(result) if result else None,
+        }
+
+    def counts(self) -> dict:
+        """Durum bazında kayıt sayıları"""
+        return dict(self._execute('SELECT state, COUNT(*) FROM outbox GROUP BY state'))
+
+    def _rows(self, state: str, limit: int = None):
+        sql = ('SELECT uuid, kind, payload, customer_alias, alias, attempts FROM outbox '
+               'WHERE state = ? ORDER BY created_at')
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return self._execute(sql, (state,))
+
+    # ==================== Gönderim ====================
+
+    def flush(self, limit: int = None) -> dict:
+        """
+        Bekleyen kayıtları işler
+
+        Args:
+            limit: Bu çağrıda işlenecek en fazla yeni kayıt (None = tümü)
+
+        Returns:
+            dict: Bu flush'ta durum değiştiren kayıt sayıları
+                {'created', 'sent', 'failed', 'retry', 'review'}
+        """
+        with self._flush_lock:
+            summary = {'created': 0, 'sent': 0, 'failed': 0, 'retry': 0, 'review': 0}
+            self._recover_confirming(summary)
+            self._create_drafts(self._rows(CREATING), summary, recovering=True)
+            self._create_drafts(self._rows(PENDING, limit), summary)
+            self._confirm_created(summary)
+            return summary
+
+    def _create_drafts(self, rows, summary: dict, recovering: bool = False):
+        if not rows:
+            return
+        if not recovering:
+            self._set_state([r[0] for r in rows], CREATING)
+
+        def create(row):
+            invoice_uuid, kind, payload, customer_alias, _, _ = row
+            invoice_data = json.loads(payload)
+            if kind == EARCHIVE:
+                result = self.client.create_archive_invoice(invoice_data)
+            else:
+                result = self.client.create_draft_invoice(invoice_data, customer_alias)
+
+            if not result.get('success') and self._draft_exists(invoice_uuid, kind):
+                # Zaman aşımına uğrayan veya çökmeden önce gönderilen istek taslağı oluşturmuş.
+                # Bulunamazsa kayıt PENDING'e döner; UUID sabit olduğundan yeniden
+                # oluşturma ikinci bir taslak üretmez
+                result = {'success': True, 'data': None, 'recovered': True}
+            return invoice_uuid, result
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            results = list(executor.map(create, rows))
+
+        for invoice_uuid, result in results:
+            if result.get('success'):
+                self._set_state([invoice_uuid], CREATED)
+                summary['created'] += 1
+            else:
+                logger.warning(f"Outbox taslak oluşturulamadı ({invoice_uuid}): {result.get('error')}")
+                self._set_state([invoice_uuid], PENDING, error=result.get('error'), count_attempt=True)
+                summary['retry'] += 1
+
+    def _draft_exists(self, invoice_uuid: str, kind: str) -> bool:
+        """Taslağın Nilvera'da var olup olmadığını kontrol eder (yalnızca E-Fatura)"""
+        if kind != EINVOICE:
+            return False
+        try:
+            return self.client.get_invoice_xml(invoice_uuid, is_draft=True).get('success', False)
+        except Exception:
+            return False
+
+    def _recover_confirming(self, summary: dict):
+        """Onaylama sonucu kaydedilemeden kesilen veya belirsiz kalan kayıtları doğrular"""
+        for row in self._rows(CONFIRMING):
+            invoice_uuid, kind = row[0], row[1]
+            if kind != EINVOICE:
+                # E-Arşiv için durum sorgusu yok; körlemesine yeniden onaylamak
+                # faturayı ikinci kez gönderebilir
+                logger.warning(f"Outbox onay sonucu belirsiz, manuel kontrol gerekli ({invoice_uuid})")
+                self._set_state([invoice_uuid], REVIEW, error='Onay sonucu belirsiz; manuel kontrol gerekli')
+                summary['review'] += 1
+                continue
+            try:
+                status = self.client._make_request('GET', f'/einvoice/Sale/{invoice_uuid}/Status')
+            except NilveraAPIError as e:
+                if e.status_code == 404:
+                    # Fatura gönderilmemiş; taslak yeniden onaylanır
+                    self._set_state([invoice_uuid], CREATED)
+                    continue
+                # 401 / 429 / 5xx: sonuç bilinmiyor; bir sonraki flush'ta tekrar sorgulanır
+                logger.warning(f"Outbox durum sorgulanamadı ({invoice_uuid}): {e}")
+                summary['retry'] += 1
+            except NilveraException as e:
+                # Nilvera'ya ulaşılamıyor; bir sonraki flush'ta tekrar denenir
+                logger.warning(f"Outbox durum sorgulanamadı ({invoice_uuid}): {e}")
+                summary['retry'] += 1
+            else:
+                self._set_state([invoice_uuid], SENT, result=status.get('data'))
+                summary['sent'] += 1
+
+    def _confirm_created(self, summary: dict):
+        rows = self._rows(CREATED)
+        groups = {}
+        for invoice_uuid, kind, _, _, alias, _ in rows:
+            groups.setdefault((kind, alias), []).append(invoice_uuid)
+
+        for (kind, alias), uuids in groups.items():
+            for i in range(0, len(uuids), self.batch_size):
+                self._confirm_batch(kind, alias, uuids[i:i + self.batch_size], summary)
+
+    def _confirm_batch(self, kind: str, alias: str, uuids: list, summary: dict):
+        self._set_state(uuids, CONFIRMING)
+        if kind == EARCHIVE:
+            endpoint, items = '/earchive/Draft/ConfirmAndSend', list(uuids)
+        else:
+            endpoint = '/einvoice/Draft/ConfirmAndSend'
+            items = [{"Alias": alias or DEFAULT_ALIAS, "UUID": u} for u in uuids]
+
+        try:
+            result = self.client._make_request('POST', endpoint, data=items)
+        except NilveraAPIError as e:
+            if len(uuids) > 1:
+                logger.warning(f"Outbox toplu onaylama reddedildi ({len(uuids)} fatura), tek tek deneniyor: {e}")
+                for invoice_uuid in uuids:
+                    self._confirm_batch(kind, alias, [invoice_uuid], summary)
+                return
+            # API reddetti; taslak gönderilmedi, bir sonraki flush'ta yeniden onaylanır
+            self._rejected(uuids[0], str(e), summary)
+            return
+        except NilveraException as e:
+            # Sonuç belirsiz (zaman aşımı / bağlantı); kayıtlar 'confirming' kalır ve
+            # bir sonraki flush'ta tekrar gönderilmeden önce doğrulanır. Gönderilmiş
+            # olabilecek fatura deneme sayısı yüzünden 'failed' olmaz
+            logger.warning(f"Outbox onaylama sonucu belirsiz ({len(uuids)} fatura): {e}")
+            self._set_state(uuids, CONFIRMING, error=str(e))
+            summary['retry'] += len(uuids)
+            return
+
+        for position, invoice_uuid in enumerate(uuids):
+            split = _split_confirm_result(result, invoice_uuid, position, len(uuids))
+            if split['success']:
+                self._set_state([invoice_uuid], SENT, result=split['data'] or split['batch_data'])
+                summary['sent'] += 1
+            else:
+                self._rejected(invoice_uuid, split.get('error'), summary)
+
+    def _rejected(self, invoice_uuid: str, error: str, summary: dict):
+        """API'nin reddettiği onaylama; deneme hakkı bitene kadar taslak yeniden onaylanır"""
+        self._set_state([invoice_uuid], CREATED, error=error, count_attempt=True)
+        if self.get(invoice_uuid)['state'] == FAILED:
+            summary['failed'] += 1
+        else:
+            summary['retry'] += 1
+
+    # ==================== Arka Plan ====================
+
+    def start(self, interval: float = 5.0):
+        """
+        Arka planda periyodik flush başlatır
+
+        Args:
+            interval: İki flush arasındaki en uzun süre (sn); enqueue() beklemeyi kısaltır
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Outbox flush hatası: {e}")
+                self._wakeup.wait(interval)
+                self._wakeup.clear()
+
+        self._thread = threading.Thread(target=run, name='nilvera-outbox', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Arka plan flush'ını durdurur"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        """Arka plan thread'ini durdurur ve veritabanını kapatır"""
+        self.stop()
+        with self._lock:
+            self._conn.close()
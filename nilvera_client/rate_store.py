@@ -0,0 +1,371 @@
+# nilvera_client/rate_store.py
+# Geçmiş TCMB Kurları - Gün indeksli, memory-mapped sütunlu kur deposu
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type, datetime, timedelta
+
+from .currency import TCMBCurrencyService, RATE_TYPES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'NVRATES1'
+_HEADER_LENGTH = struct.Struct('<I')
+_NO_SOURCE = -1
+
+
+def _to_date(value) -> date_type:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+class RateStore:
+    """
+    TCMB kurlarının diskteki sütunlu deposu
+
+    Her (para birimi, kur tipi) serisi için gün başına bir float64 değer ve
+    değerin yayımlandığı günü gösteren bir int32 dizisi tutulur. Değerler
+    ileri doldurulmuştur: tatil ve hafta sonu günleri son yayımlanan iş gününün
+    kurunu içerir. Böylece "D tarihinde veya öncesinde yayımlanan son kur"
+    sorgusu tek bir dizi erişimidir; ağ çağrısı yapılmaz.
+
+    Dosya mmap ile açılır; diziler kopyalanmadan okunur ve aynı dosyayı açan
+    process'ler sayfaları paylaşır.
+
+    Dosya düzeni:
+        MAGIC | başlık uzunluğu (uint32) | başlık (JSON) | dolgu (8 bayt hizalama)
+        | seri başına float64[gün] | seri başına int32[gün] (kaynak gün, -1 = yok)
+
+    Kullanım:
+        >>> store = RateStore('kurlar.bin')
+        >>> store.get_rate('USD', datetime(2024, 1, 1))   # 2023-12-29 kuru
+        >>> TCMBCurrencyService.convert_amounts(amounts, 'USD', dates, rate_source=store.get_rate)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'Kur deposu boş: {path}')
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'Geçersiz kur deposu: {path}')
+        offset = len(MAGIC)
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._mmap, offset)
+        offset += _HEADER_LENGTH.size
+        header = json.loads(self._mmap[offset:offset + header_length])
+        if header.get('byteorder', sys.byteorder) != sys.byteorder:
+            self.close()
+            raise ValueError('Kur deposu farklı bayt sıralı bir sistemde oluşturulmuş')
+
+        self.start = _to_date(header['start'])
+        self.days = header['days']
+        self.series = [tuple(s) for s in header['series']]
+        self.unpublished = frozenset(_to_date(d) for d in header.get('unpublished', []))
+
+        data_offset = _align(offset + header_length)
+        view = memoryview(self._mmap)
+        self._views = [view]
+        self._values = {}
+        self._sources = {}
+        values_size = 8 * self.days
+        sources_base = data_offset + values_size * len(self.series)
+        for i, key in enumerate(self.series):
+            values = view[data_offset + i * values_size:data_offset + (i + 1) * values_size].cast('d')
+            sources = view[sources_base + i * 4 * self.days:sources_base + (i + 1) * 4 * self.days].cast('i')
+            self._values[key] = values
+            self._sources[key] = sources
+            self._views += [values, sources]
+
+    @property
+    def end(self) -> date_type:
+        """Depodaki son gün"""
+        return self.start + timedelta(days=self.days - 1)
+
+    def currencies(self) -> list:
+        return sorted({currency for currency, _ in self.series})
+
+    def lookup(self, currency_code: str, date, rate_type: str = 'ForexBuying'):
+        """
+        D tarihinde veya öncesinde yayımlanan son kur
+
+        Returns:
+            tuple veya None: (kur, yayım tarihi)
+        """
+        values = self._values.get((currency_code, rate_type))
+        if values is None:
+            return None
+        index = (_to_date(date) - self.start).days
+        if not 0 <= index < self.days:
+            return None
+        source = self._sources[(currency_code, rate_type)][index]
+        if source == _NO_SOURCE:
+            return None
+        return values[index], self.start + timedelta(days=source)
+
+    def get_rate(self, currency_code: str = 'USD', date=None, rate_type: str = 'ForexBuying'):
+        """
+        TCMBCurrencyService.get_exchange_rate ile aynı formatta kur döndürür
+
+        convert_amounts için rate_source olarak verilebilir.
+        """
+        date = date or datetime.now()
+        found = self.lookup(currency_code, date, rate_type)
+        if found is None:
+            return {
+                'success': False,
+                'rate': None,
+                'date': None,
+                'currency': currency_code,
+                'rate_type': rate_type,
+                'error': f'Depoda kur yok: {currency_code} {_to_date(date)}'
+            }
+        rate, published = found
+        return {
+            'success': True,
+            'rate': rate,
+            'date': published.strftime('%Y-%m-%d'),
+            'currency': currency_code,
+            'rate_type': rate_type,
+            'source': 'store'
+        }
+
+    def published_tables(self) -> dict:
+        """Yayımlanmış günlerin kur tabloları {tarih: {para birimi: {kur tipi: değer}}}"""
+        tables = {}
+        for (currency, rate_type), sources in self._sources.items():
+            values = self._values[(currency, rate_type)]
+            for index, source in enumerate(sources):
+                if source == index:
+                    day = self.start + timedelta(days=index)
+                    tables.setdefault(day, {}).setdefault(currency, {})[rate_type] = values[index]
+        return tables
+
+    def close(self):
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_store(path: str, tables: dict, start=None, end=None, unpublished=()):
+    """
+    Günlük kur tablolarından depo dosyası yazar (atomik olarak değiştirilir)
+
+    Args:
+        path: Hedef dosya
+        tables: {tarih: {para birimi: {kur tipi: değer}}} - yalnızca yayımlanan günler
+        start, end: Depo aralığı (varsayılan: tabloların ilk ve son günü)
+        unpublished: Kur yayımlanmadığı bilinen günler (başlıkta saklanır,
+            backfill bunları tekrar sorgulamaz)
+    """
+    tables = {_to_date(day): table for day, table in tables.items()}
+    if not tables and (start is None or end is None):
+        raise ValueError('Depo için en az bir günlük tablo gerekli')
+    start = _to_date(start) if start is not None else min(tables)
+    end = _to_date(end) if end is not None else max(tables)
+    days = (end - start).days + 1
+
+    series = sorted({
+        (currency, rate_type)
+        for table in tables.values()
+        for currency, rates in table.items()
+        for rate_type in rates
+    })
+
+    header = json.dumps({
+        'start': start.isoformat(),
+        'days': days,
+        'series': series,
+        'byteorder': sys.byteorder,
+        'unpublished': sorted(_to_date(d).isoformat() for d in unpublished if start <= _to_date(d) <= end),
+    }).encode('utf-8')
+
+    all_values = []
+    all_sources = []
+    for currency, rate_type in series:
+        values = array('d', [math.nan]) * days
+        sources = array('i', [_NO_SOURCE]) * days
+        last_value, last_source = math.nan, _NO_SOURCE
+        for index in range(days):
+            rate = tables.get(start + timedelta(days=index), {}).get(currency, {}).get(rate_type)
+            if rate is not None:
+                last_value, last_source = rate, index
+            values[index] = last_value
+            sources[index] = last_source
+        all_values.append(values)
+        all_sources.append(sources)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(b'\0' * (_align(f.tell()) - f.tell()))
+        for values in all_values:
+            values.tofile(f)
+        for sources in all_sources:
+            sources.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_existing(path: str):
+    """Mevcut depodan yayımlanmış tabloları ve yayımlanmadığı bilinen günleri okur"""
+    if not os.path.exists(path):
+        return {}, set()
+    with RateStore(path) as store:
+        return store.published_tables(), set(store.unpublished)
+
+
+def backfill(path: str, start, end=None, currencies=None, workers: int = 8,
+             fetch=None, progress=None) -> dict:
+    """
+    TCMB günlük kur tablolarını indirip depoya yazar
+
+    Depo zaten varsa yalnızca henüz sorgulanmamış iş günleri indirilir.
+    Hafta sonları sorgulanmaz; 404 dönen geçmiş günler (tatiller) yayımlanmadı
+    olarak kaydedilir. Ağ hatası alınan günler kaydedilmez, bir sonraki çalıştırmada
+    tekrar denenir.
+
+    Args:
+        path: Depo dosyası
+        start: İlk gün
+        end: Son gün (varsayılan: bugün)
+        currencies: Saklanacak para birimleri (None = tümü)
+        workers: Eşzamanlı indirme sayısı
+        fetch: Günlük tablo kaynağı (varsayılan: TCMBCurrencyService.fetch_daily_rates)
+        progress: Her gün için çağrılan fonksiyon (tamamlanan, toplam)
+
+    Returns:
+        dict: {'success': bool, 'fetched': int, 'published': int, 'failed': list[str]}
+    """
+    fetch = fetch or TCMBCurrencyService.fetch_daily_rates
+    today = datetime.now().date()
+    start = _to_date(start)
+    end = _to_date(end or datetime.now())
+    wanted = set(currencies) if currencies else None
+
+    tables, unpublished = _read_existing(path)
+    if tables:
+        start = min(start, min(tables))
+        end = max(end, max(tables))
+
+    days = [
+        start + timedelta(days=i)
+        for i in range((end - start).days + 1)
+        if (start + timedelta(days=i)).weekday() < 5
+    ]
+    todo = [day for day in days if day not in tables and day not in unpublished]
+
+    failed = []
+    published = 0
+
+    def fetch_day(day):
+        return day, fetch(datetime(day.year, day.month, day.day))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for done, (day, result) in enumerate(executor.map(fetch_day, todo), 1):
+            if result.get('success'):
+                rates = result['rates']
+                if wanted is not None:
+                    rates = {code: values for code, values in rates.items() if code in wanted}
+                tables[day] = rates
+                published += 1
+            elif result.get('status_code') == 404:
+                # Günün kuru henüz yayımlanmamış olabilir; yalnızca geçmiş günler kesinleşir
+                if day < today:
+                    unpublished.add(day)
+            else:
+                failed.append(day.isoformat())
+            if progress:
+                progress(done, len(todo))
+
+    if tables:
+        write_store(path, tables, start=start, end=end, unpublished=unpublished)
+    if failed:
+        logger.warning(f"Kur deposu: {len(failed)} gün indirilemedi, tekrar çalıştırın")
+
+    return {
+        'success': not failed,
+        'fetched': len(todo),
+        'published': published,
+        'failed': failed
+    }
+
+
+def main(argv=None):
+    """
+    Komut satırı:
+        python -m nilvera_client.rate_store backfill --path kurlar.bin --start 2020-01-01
+        python -m nilvera_client.rate_store lookup --path kurlar.bin USD 2024-01-01
+    """
+    parser = argparse.ArgumentParser(prog='python -m nilvera_client.rate_store',
+                                     description='TCMB geçmiş kur deposu')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fill = commands.add_parser('backfill', help='Kurları indirip depoya yaz')
+    fill.add_argument('--path', required=True, help='Depo dosyası')
+    fill.add_argument('--start', required=True, help='İlk gün (YYYY-MM-DD)')
+    fill.add_argument('--end', help='Son gün (varsayılan: bugün)')
+    fill.add_argument('--currencies', help='Virgülle ayrılmış para birimleri (varsayılan: tümü)')
+    fill.add_argument('--workers', type=int, default=8, help='Eşzamanlı indirme sayısı')
+
+    lookup = commands.add_parser('lookup', help='Depodan kur sorgula')
+    lookup.add_argument('--path', required=True, help='Depo dosyası')
+    lookup.add_argument('--rate-type', default='ForexBuying', choices=RATE_TYPES)
+    lookup.add_argument('currency')
+    lookup.add_argument('date')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'backfill':
+        def progress(done, total):
+            if done == total or done % 50 == 0:
+                print(f'\r{done}/{total} gün', end='', file=sys.stderr, flush=True)
+
+        result = backfill(
+            args.path, args.start, args.end,
+            currencies=args.currencies.split(',') if args.currencies else None,
+            workers=args.workers,
+            progress=progress
+        )
+        print(file=sys.stderr)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0 if result['success'] else 1
+
+    with RateStore(args.path) as store:
+        result = store.get_rate(args.currency, _to_date(args.date), args.rate_type)
+    print(json.dumps(result, ensure_ascii=False))
+    return 0 if result['success'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+# nilvera_client/reconcile.py
+# Mutabakat - Muhasebe kayıtlarını Nilvera giden fatura listesiyle tek geçişte karşılaştırır
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan karşılaştırılan tutar alanları
+DEFAULT_AMOUNT_FIELDS = ('PayableAmount',)
+
+
+def _normalize_uuid(value):
+    if value in (None, ''):
+        return None
+    return str(value).strip().lower()
+
+
+def _normalize_number(value):
+    if value in (None, ''):
+        return None
+    return str(value).strip().upper()
+
+
+def _to_float(value):
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Mismatch:
+    """Her iki tarafta bulunan ama alanları farklı olan fatura"""
+
+    __slots__ = ('key', 'ledger', 'remote', 'differences')
+
+    def __init__(self, key: str, ledger: dict, remote: dict, differences: dict):
+        self.key = key
+        self.ledger = ledger
+        self.remote = remote
+        # alan -> (defterdeki değer, Nilvera'daki değer)
+        self.differences = differences
+
+    def to_dict(self) -> dict:
+        return {
+            'key': self.key,
+            'differences': {field: list(pair) for field, pair in self.differences.items()},
+            'ledger': self.ledger,
+            'remote': self.remote,
+        }
+
+    def __repr__(self):
+        return f'<Mismatch {self.key} {sorted(self.differences)}>'
+
+
+class ReconciliationReport:
+    """
+    Mutabakat sonucu
+
+    Attributes:
+        matched: Birebir eşleşen fatura sayısı
+        missing: Defterde olup Nilvera'da bulunmayan kayıtlar
+        extra: Nilvera'da olup defterde bulunmayan faturalar
+        mismatched: Alanları farklı olan eşleşmeler (Mismatch listesi)
+        duplicates: Aynı UUID / numarayla birden fazla gelen kayıtlar
+    """
+
+    def __init__(self, matched: int, missing: list, extra: list, mismatched: list, duplicates: list):
+        self.matched = matched
+        self.missing = missing
+        self.extra = extra
+        self.mismatched = mismatched
+        self.duplicates = duplicates
+
+    @property
+    def success(self) -> bool:
+        """Fark yoksa True"""
+        return not (self.missing or self.extra or self.mismatched or self.duplicates)
+
+    def summary(self) -> dict:
+        return {
+            'success': self.success,
+            'matched': self.matched,
+            'missing': len(self.missing),
+            'extra': len(self.extra),
+            'mismatched': len(self.mismatched),
+            'duplicates': len(self.duplicates),
+        }
+
+    def to_dict(self) -> dict:
+        result = self.summary()
+        result.update({
+            'missing': self.missing,
+            'extra': self.extra,
+            'mismatched': [m.to_dict() for m in self.mismatched],
+            'duplicates': self.duplicates,
+        })
+        return result
+
+    def __repr__(self):
+        s = self.summary()
+        return (f"<ReconciliationReport eşleşen={s['matched']} eksik={s['missing']} "
+                f"fazla={s['extra']} farklı={s['mismatched']}>")
+
+
+class Reconciler:
+    """
+    Defter ile Nilvera giden faturaları arasında mutabakat
+
+    Defter kayıtları UUID ve fatura numarası üzerinden iki hash indeksine
+    alınır; Nilvera listesi feed() ile akış halinde verilir ve her fatura
+    sabit sürede eşleştirilir. Nilvera tarafı bellekte tutulmaz, tek geçişte
+    eksik / fazla / farklı faturalar çıkar.
+
+    Eşleştirme önce UUID ile yapılır; UUID'si olmayan defter kayıtları fatura
+    numarasıyla eşleşir. Tutar alanları tolerance içinde, fields ile verilen
+    alanlar birebir karşılaştırılır.
+
+    Args:
+        ledger: Defter kayıtları (dict iterable'ı)
+        amount_fields: Sayısal karşılaştırılacak alanlar
+        fields: Birebir karşılaştırılacak alanlar (ör. ('CurrencyCode',))
+        tolerance: Tutar farkı toleransı
+        field_map: Defter alan adları farklıysa Nilvera alan adı -> defter alan adı
+            (ör. {'InvoiceNumber': 'fatura_no'})
+
+    Kullanım:
+        >>> reconciler = Reconciler(ledger_rows, field_map={'PayableAmount': 'tutar'})
+        >>> reconciler.feed_all(client.iter_sale_invoices(start, end))
+        >>> report = reconciler.report()
+        >>> report.summary()
+    """
+
+    def __init__(self, ledger, amount_fields=DEFAULT_AMOUNT_FIELDS, fields=(),
+                 tolerance: float = 0.01, field_map: dict = None):
+        self.amount_fields = tuple(amount_fields)
+        self.fields = tuple(fields)
+        self.tolerance = tolerance
+        self.field_map = dict(field_map or {})
+
+        self._ledger = []
+        self._by_uuid = {}
+        self._by_number = {}
+        self._seen = bytearray()
+        self._matched = 0
+        self._extra = []
+        self._mismatched = []
+        self._duplicates = []
+
+        for record in ledger:
+            self._index(record)
+
+    def _get(self, record: dict, field: str):
+        return record.get(self.field_map.get(field, field))
+
+    def _index(self, record: dict):
+        position = len(self._ledger)
+        uuid = _normalize_uuid(self._get(record, 'UUID'))
+        number = _normalize_number(self._get(record, 'InvoiceNumber'))
+        if (uuid is not None and uuid in self._by_uuid) or \
+                (uuid is None and number is not None and number in self._by_number):
+            self._duplicates.append({'side': 'ledger', 'record': record})
+            return
+        self._ledger.append(record)
+        self._seen.append(0)
+        if uuid is not None:
+            self._by_uuid[uuid] = position
+        if number is not None:
+            self._by_number.setdefault(number, position)
+
+    def _lookup(self, uuid, number):
+        if uuid is not None:
+            position = self._by_uuid.get(uuid)
+            if position is not None:
+                return position
+        if number is not None:
+            position = self._by_number.get(number)
+            if position is not None:
+                ledger_uuid = _normalize_uuid(self._get(self._ledger[position], 'UUID'))
+                # UUID'si farklı bir defter kaydı numara üzerinden eşleşmez
+                if ledger_uuid is None or uuid is None:
+                    return position
+        return None
+
+    def _compare(self, ledger: dict, remote: dict) -> dict:
+        differences = {}
+        for field in self.amount_fields:
+            ledger_value = self._get(ledger, field)
+            remote_value = remote.get(field)
+            a, b = _to_float(ledger_value), _to_float(remote_value)
+            if a is None and b is None:
+                continue
+            if a is None or b is None or abs(a - b) > self.tolerance:
+                differences[field] = (ledger_value, remote_value)
+        for field in self.fields:
+            ledger_value = self._get(ledger, field)
+            remote_value = remote.get(field)
+            if ledger_value != remote_value:
+                differences[field] = (ledger_value, remote_value)
+        ledger_number = _normalize_number(self._get(ledger, 'InvoiceNumber'))
+        remote_number = _normalize_number(remote.get('InvoiceNumber'))
+        if ledger_number and remote_number and ledger_number != remote_number:
+            differences['InvoiceNumber'] = (self._get(ledger, 'InvoiceNumber'), remote.get('InvoiceNumber'))
+        return differences
+
+    def feed(self, remote: dict) -> str:
+        """
+        Nilvera'dan gelen bir faturayı eşleştirir
+
+        Returns:
+            str: 'matched', 'mismatched', 'extra' veya 'duplicate'
+        """
+        uuid = _normalize_uuid(remote.get('UUID'))
+        number = _normalize_number(remote.get('InvoiceNumber'))
+        position = self._lookup(uuid, number)
+        if position is None:
+            self._extra.append(remote)
+            return 'extra'
+        if self._seen[position]:
+            self._duplicates.append({'side': 'remote', 'record': remote})
+            return 'duplicate'
+        self._seen[position] = 1
+
+        ledger = self._ledger[position]
+        differences = self._compare(ledger, remote)
+        if differences:
+            key = uuid or number
+            self._mismatched.append(Mismatch(key, ledger, remote, differences))
+            return 'mismatched'
+        self._matched += 1
+        return 'matched'
+
+    def feed_all(self, remotes):
+        """Nilvera faturalarını (ör. iter_sale_invoices) sırayla eşleştirir"""
+        for remote in remotes:
+            self.feed(remote)
+        return self
+
+    def report(self) -> ReconciliationReport:
+        """Henüz eşleşmemiş defter kayıtları 'missing' olarak raporlanır"""
+        missing = [record for record, seen in zip(self._ledger, self._seen) if not seen]
+        report = ReconciliationReport(self._matched, missing, list(self._extra),
+                                      list(self._mismatched), list(self._duplicates))
+        logger.info(f"Mutabakat: {report.summary()}")
+        return report
+
+
+def reconcile(ledger, remotes, **options) -> ReconciliationReport:
+    """
+    Defter ile Nilvera fatura listesini karşılaştırır
+
+    Args:
+        ledger: Defter kayıtları
+        remotes: Nilvera faturaları (liste veya üreteç)
+        **options: Reconciler seçenekleri
+
+    Returns:
+        ReconciliationReport
+    """
+    return Reconciler(ledger, **options).feed_all(remotes).report()
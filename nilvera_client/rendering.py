@@ -0,0 +1,156 @@
+# nilvera_client/rendering.py
+# Yerel Görüntüleme - UBL faturasındaki gömülü XSLT ile HTML'i sunucuya gitmeden üretir
+
+import base64
+import binascii
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from .exceptions import NilveraValidationError
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_XSLT_EXTENSIONS = ('.xslt', '.xsl')
+
+
+def _load_lxml():
+    try:
+        from lxml import etree
+    except ImportError:
+        raise ImportError("Yerel HTML üretimi için lxml gerekli: pip install lxml")
+    return etree
+
+
+def _is_stylesheet(binary) -> bool:
+    filename = (binary.get('filename') or '').lower()
+    if filename.endswith(_XSLT_EXTENSIONS):
+        return True
+    # Bazı entegratörler dosya adı yerine belge tipini 'XSLT' yazar
+    # (EmbeddedDocumentBinaryObject -> Attachment -> AdditionalDocumentReference)
+    for child in binary.getparent().getparent():
+        if isinstance(child.tag, str) and child.tag.rsplit('}', 1)[-1] == 'DocumentType':
+            return (child.text or '').strip().upper() == 'XSLT'
+    return False
+
+
+class InvoiceRenderer:
+    """
+    UBL faturalarını gömülü XSLT şablonlarıyla yerel olarak HTML'e çevirir
+
+    Her UBL-TR faturası kendi görüntüleme şablonunu (XSLT) taşır. Şablon
+    SHA-256 özetine göre bir kez derlenir ve LRU önbellekte tutulur; aynı
+    şablonu kullanan sonraki faturalar ağ çağrısı olmadan, yalnızca dönüşüm
+    süresi kadar CPU ile görüntülenir. Aynı şablonun eşzamanlı derlemeleri
+    SingleFlight ile birleştirilir.
+
+    Şablonlar gelen faturalarda karşı tarafın kontrolündedir; dönüşüm sırasında
+    dosya ve ağ erişimi kapalıdır (XSLTAccessControl.DENY_ALL), XML dış
+    varlıkları çözülmez.
+
+    Args:
+        max_stylesheets: Önbellekte tutulacak derlenmiş şablon sayısı
+        default_stylesheet: Şablon taşımayan faturalar için kullanılacak XSLT (bytes)
+
+    Kullanım:
+        >>> renderer = InvoiceRenderer()
+        >>> xml = client.get_invoice_xml(uuid)['data']
+        >>> html = renderer.render(xml)
+    """
+
+    def __init__(self, max_stylesheets: int = 32, default_stylesheet: bytes = None):
+        self._etree = _load_lxml()
+        self.max_stylesheets = max_stylesheets
+        self.default_stylesheet = default_stylesheet
+        self._lock = threading.Lock()
+        self._stylesheets = OrderedDict()
+        self._flight = SingleFlight()
+        self._parser = self._etree.XMLParser(resolve_entities=False, no_network=True)
+        self._access = self._etree.XSLTAccessControl.DENY_ALL
+        self.compiled = 0
+
+    def _parse(self, data: bytes):
+        try:
+            return self._etree.fromstring(data, self._parser)
+        except self._etree.XMLSyntaxError as e:
+            raise NilveraValidationError(f'XML ayrıştırılamadı: {e}') from None
+
+    def extract_stylesheet(self, document) -> bytes:
+        """
+        Faturanın gömülü XSLT şablonu
+
+        Args:
+            document: UBL XML (bytes) veya ayrıştırılmış kök eleman
+
+        Returns:
+            bytes veya şablon yoksa None
+
+        Raises:
+            NilveraValidationError: Şablon geçerli base64 değilse
+        """
+        root = self._parse(document) if isinstance(document, (bytes, bytearray)) else document
+        for binary in root.iterfind('.//{*}AdditionalDocumentReference/{*}Attachment/'
+                                    '{*}EmbeddedDocumentBinaryObject'):
+            if _is_stylesheet(binary) and binary.text:
+                try:
+                    return base64.b64decode(binary.text)
+                except (binascii.Error, ValueError) as e:
+                    raise NilveraValidationError(f'XSLT eki çözülemedi: {e}') from None
+        return None
+
+    def _compile(self, stylesheet: bytes):
+        digest = hashlib.sha256(stylesheet).hexdigest()
+        with self._lock:
+            transform = self._stylesheets.get(digest)
+            if transform is not None:
+                self._stylesheets.move_to_end(digest)
+                return transform
+
+        def compile_once():
+            with self._lock:
+                transform = self._stylesheets.get(digest)
+            if transform is not None:
+                return transform
+            try:
+                transform = self._etree.XSLT(self._parse(stylesheet), access_control=self._access)
+            except self._etree.XSLTParseError as e:
+                raise NilveraValidationError(f'XSLT derlenemedi: {e}') from None
+            with self._lock:
+                self.compiled += 1
+                self._stylesheets[digest] = transform
+                while len(self._stylesheets) > self.max_stylesheets:
+                    self._stylesheets.popitem(last=False)
+            logger.debug(f"XSLT derlendi: {digest[:12]} ({len(stylesheet)} bayt)")
+            return transform
+
+        return self._flight.do(digest, compile_once)[0]
+
+    def render(self, xml: bytes) -> str:
+        """
+        Faturayı HTML'e çevirir
+
+        Args:
+            xml: UBL XML (get_invoice_xml()['data'] veya önbellekteki kopya)
+
+        Returns:
+            str: HTML
+
+        Raises:
+            NilveraValidationError: XML / XSLT bozuksa ya da şablon bulunamazsa
+        """
+        root = self._parse(xml)
+        stylesheet = self.extract_stylesheet(root) or self.default_stylesheet
+        if stylesheet is None:
+            raise NilveraValidationError('Faturada gömülü XSLT şablonu yok')
+        transform = self._compile(stylesheet)
+        try:
+            result = transform(root)
+        except self._etree.XSLTApplyError as e:
+            raise NilveraValidationError(f'XSLT uygulanamadı: {e}') from None
+        return str(result)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._stylesheets)
@@ -0,0 +1,143 @@
+# nilvera_client/scheduling.py
+# Öncelik Şeritleri - Etkileşimli çağrıların toplu işlerin arkasında beklememesi için
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from .exceptions import NilveraQueueFullError, NilveraTimeoutError
+
+INTERACTIVE = 'interactive'
+NORMAL = 'normal'
+BULK = 'bulk'
+
+# Yüksekten düşüğe öncelik sırası
+PRIORITIES = (INTERACTIVE, NORMAL, BULK)
+
+_current_priority = contextvars.ContextVar('nilvera_priority', default=NORMAL)
+
+
+def current_priority() -> str:
+    """Çalışan thread/task için geçerli öncelik sınıfı"""
+    return _current_priority.get()
+
+
+@contextmanager
+def priority(level: str):
+    """
+    Blok içindeki tüm client çağrılarının öncelik sınıfını belirler
+
+    Kullanım:
+        >>> with priority(BULK):
+        ...     for uuid in uuids:
+        ...         client.get_invoice_xml(uuid)
+    """
+    if level not in PRIORITIES:
+        raise ValueError(f"Bilinmeyen öncelik: {level} (seçenekler: {', '.join(PRIORITIES)})")
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class PriorityScheduler:
+    """
+    Öncelik sınıflarına göre eşzamanlılık kotası uygulayan zamanlayıcı
+
+    Toplam eşzamanlı istek `max_concurrency` ile sınırlıdır; her sınıfın
+    ayrıca kendi kotası vardır. Boşalan yer önce bekleyen yüksek öncelikli
+    çağrılara verilir. Toplu (bulk) kota toplamdan küçük tutularak
+    etkileşimli çağrılar için her zaman yer kalması sağlanır; toplu işler
+    geri kalan kapasiteyi kullanır.
+
+    Her sınıfın bekleme kuyruğu sınırlıdır; kuyruk doluysa çağrı beklemeden
+    NilveraQueueFullError ile reddedilir (backpressure).
+
+    Args:
+        max_concurrency: Toplam eşzamanlı istek sınırı (bağlantı havuzu boyutu kadar verin)
+        limits: Sınıf başına eşzamanlılık kotası
+            (varsayılan: interactive ve normal için tamamı, bulk için yarısı)
+        queue_sizes: Sınıf başına en fazla bekleyen çağrı sayısı
+        queue_timeout: Kuyrukta en fazla bekleme süresi (sn, None = süresiz)
+    """
+
+    def __init__(self, max_concurrency: int = 10, limits: dict = None, queue_sizes: dict = None,
+                 queue_timeout: float = None):
+        self.max_concurrency = max_concurrency
+        self.limits = {
+            INTERACTIVE: max_concurrency,
+            NORMAL: max_concurrency,
+            BULK: max(1, max_concurrency // 2),
+        }
+        self.limits.update(limits or {})
+        self.queue_sizes = {INTERACTIVE: 1000, NORMAL: 1000, BULK: 1000}
+        self.queue_sizes.update(queue_sizes or {})
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._active = dict.fromkeys(PRIORITIES, 0)
+        self._waiting = dict.fromkeys(PRIORITIES, 0)
+        self._total = 0
+
+    def _can_run(self, level: str) -> bool:
+        if self._total >= self.max_concurrency or self._active[level] >= self.limits[level]:
+            return False
+        for higher in PRIORITIES[:PRIORITIES.index(level)]:
+            if self._waiting[higher] and self._active[higher] < self.limits[higher]:
+                return False
+        return True
+
+    def acquire(self, level: str = None, timeout: float = None):
+        """
+        Sınıf için bir yer ayırır
+
+        Raises:
+            NilveraQueueFullError: Sınıfın bekleme kuyruğu dolu
+            NilveraTimeoutError: Kuyrukta bekleme süresi doldu
+        """
+        level = level or current_priority()
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            if not self._can_run(level):
+                if self._waiting[level] >= self.queue_sizes[level]:
+                    raise NilveraQueueFullError(f'{level} kuyruğu dolu ({self.queue_sizes[level]} bekleyen istek)')
+                self._waiting[level] += 1
+                try:
+                    while not self._can_run(level):
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise NilveraTimeoutError(f'{level} kuyruğunda bekleme zaman aşımına uğradı')
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting[level] -= 1
+            self._active[level] += 1
+            self._total += 1
+        return level
+
+    def release(self, level: str):
+        """Ayrılan yeri serbest bırakır"""
+        with self._cond:
+            self._active[level] -= 1
+            self._total -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, level: str = None):
+        """acquire/release için context manager"""
+        level = self.acquire(level)
+        try:
+            yield level
+        finally:
+            self.release(level)
+
+    def stats(self) -> dict:
+        """Sınıf bazında çalışan ve bekleyen istek sayıları"""
+        with self._cond:
+            return {
+                level: {'active': self._active[level], 'waiting': self._waiting[level]}
+                for level in PRIORITIES
+            }
@@ -0,0 +1,79 @@
+# nilvera_client/singleflight.py
+# Single-Flight - Aynı anda yapılan özdeş isteklerin tek HTTP çağrısında birleştirilmesi
+
+import threading
+
+
+class _Call:
+    """Devam eden tek bir çağrının durumu"""
+
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla eşzamanlı yapılan çağrıları birleştirir
+
+    Bir anahtar için çağrı devam ederken gelen diğer çağıranlar yeni bir
+    çağrı başlatmaz, ilk çağrının bitmesini bekler ve aynı sonucu (veya
+    aynı exception'ı) alır. Çağrı bittikten sonra gelen istekler yeni bir
+    çağrı başlatır; yani sonuçlar önbelleğe alınmaz.
+
+    Kullanım:
+        >>> flight = SingleFlight()
+        >>> result, shared = flight.do(('GET', url), lambda: fetch(url))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        fn'i anahtar başına en fazla bir kez eşzamanlı çalıştırır
+
+        Returns:
+            tuple: (sonuç, shared) - shared True ise sonuç başka bir çağrıdan paylaşıldı
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result, False
+
+    @property
+    def in_flight(self) -> int:
+        """Devam eden farklı çağrı sayısı"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,284 @@
+# nilvera_client/tenancy.py
+# Çok Kiracılı Client Kaydı - Tüm kiracılar tek bir bağlantı havuzunu paylaşır
+
+import http.cookiejar
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .client import NilveraClient
+from .exceptions import NilveraTimeoutError
+from .transport import BaseTransport, RequestsTransport
+
+logger = logging.getLogger(__name__)
+
+
+def disable_cookies(transport: BaseTransport):
+    """
+    Paylaşılan transport'un çerez kavanozunu kapatır
+
+    Tek session'daki çerezler diğer kiracıların isteklerine de eklenir;
+    tüm çerezleri reddeden bir politika kiracılar arası sızıntıyı önler.
+    """
+    policy = http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+    session = getattr(transport, 'session', None)
+    if session is not None and hasattr(session, 'cookies'):
+        session.cookies.set_policy(policy)
+        session.cookies.clear()
+    client = getattr(transport, 'client', None)
+    if client is not None and hasattr(client, 'cookies'):
+        # httpx.Client
+        client.cookies.jar.set_policy(policy)
+        client.cookies.clear()
+
+
+class TenantTransport(BaseTransport):
+    """
+    Paylaşılan bir transport'u saran, kiracı başına eşzamanlılık sınırı uygulayan transport
+
+    Args:
+        inner: Paylaşılan transport
+        max_concurrency: Kiracının aynı anda yapabileceği en fazla istek (None = sınırsız)
+        acquire_timeout: Sınır doluyken en fazla bekleme süresi (sn, None = süresiz)
+    """
+
+    def __init__(self, inner: BaseTransport, max_concurrency: int = None, acquire_timeout: float = None):
+        self.inner = inner
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self._active = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def active(self) -> int:
+        """Şu an devam eden istek sayısı"""
+        return self._active
+
+    def _acquire(self):
+        if self._semaphore is not None:
+            acquired = self._semaphore.acquire(
+                timeout=self.acquire_timeout if self.acquire_timeout is not None else -1
+            )
+            if not acquired:
+                raise NilveraTimeoutError('Kiracı eşzamanlılık sınırı dolu, bekleme zaman aşımına uğradı')
+
+        with self._lock:
+            self._active += 1
+            self.last_used = time.monotonic()
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+            self.last_used = time.monotonic()
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def request(self, method: str, url: str, **kwargs):
+        self._acquire()
+        try:
+            return self.inner.request(method, url, **kwargs)
+        finally:
+            self._release()
+
+    def stream(self, method: str, url: str, **kwargs):
+        """Akış yanıtı kapatılana kadar kiracı sınırından bir yer tutar"""
+        self._acquire()
+        try:
+            response = self.inner.stream(method, url, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+
+        close = response.close
+        released = threading.Event()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self._release()
+
+        response.close = close_and_release
+        return response
+
+    def close(self):
+        # Paylaşılan transport registry tarafından kapatılır
+        pass
+
+
+class NilveraClientRegistry:
+    """
+    Kiracı (firma) bazında NilveraClient dağıtan kayıt
+
+    Tüm client'lar tek bir transport ve bağlantı havuzunu paylaşır; her kiracının
+    API anahtarı istek bazında Authorization header'ı olarak eklenir. Paylaşılan
+    transport'un çerezleri kapatılır (bkz. disable_cookies).
+    En uzun süre kullanılmayan boştaki kiracılar LRU sırasıyla bırakılır ve
+    client'ları kapatılır.
+
+    Args:
+        environment: 'test' veya 'production'
+        test_url: Özel test URL'i (opsiyonel)
+        production_url: Özel production URL'i (opsiyonel)
+        transport: Paylaşılacak transport (opsiyonel, varsayılan RequestsTransport)
+        api_key_provider: Kiracı ID'sinden API anahtarı döndüren fonksiyon (opsiyonel)
+        max_tenants: Bellekte tutulacak en fazla kiracı sayısı
+        idle_ttl: Bu süreden (sn) uzun kullanılmayan kiracılar bırakılır (None = süresiz)
+        max_concurrency_per_tenant: Kiracı başına eşzamanlı istek sınırı
+        acquire_timeout: Kiracı sınırı doluyken en fazla bekleme süresi (sn)
+        pool_connections, pool_maxsize, pool_block: Paylaşılan havuz ayarları
+        **client_options: Her NilveraClient'a aktarılan diğer ayarlar
+            (connect_timeout, read_timeout, keep_alive)
+
+    Kullanım:
+        >>> registry = NilveraClientRegistry(environment='production',
+        ...                                  api_key_provider=lambda tid: keys[tid],
+        ...                                  max_concurrency_per_tenant=4, pool_maxsize=64)
+        >>> registry.get('firma-42').get_invoice_status(invoice_uuid)
+    """
+
+    def __init__(self, environment: str = 'test', test_url: str = None, production_url: str = None,
+                 transport: BaseTransport = None, api_key_provider=None,
+                 max_tenants: int = 1000, idle_ttl: float = None,
+                 max_concurrency_per_tenant: int = None, acquire_timeout: float = None,
+                 pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 **client_options):
+        self.environment = environment
+        self.test_url = test_url
+        self.production_url = production_url
+        self.api_key_provider = api_key_provider
+        self.max_tenants = max_tenants
+        self.idle_ttl = idle_ttl
+        self.max_concurrency_per_tenant = max_concurrency_per_tenant
+        self.acquire_timeout = acquire_timeout
+        self.client_options = client_options
+
+        self._owns_transport = transport is None
+        self.transport = transport or RequestsTransport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        disable_cookies(self.transport)
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id, api_key: str = None) -> NilveraClient:
+        """
+        Kiracıya ait client'ı döndürür, yoksa oluşturur
+
+        Args:
+            tenant_id: Kiracı ID'si
+            api_key: Kiracının API anahtarı (verilmezse api_key_provider kullanılır)
+
+        Returns:
+            NilveraClient: Paylaşılan havuzu kullanan kiracı client'ı
+        """
+        with self._lock:
+            client = self._clients.get(tenant_id)
+            if client is not None and (api_key is None or client.api_key == api_key):
+                self._clients.move_to_end(tenant_id)
+                return client
+
+        if api_key is None:
+            if self.api_key_provider is None:
+                raise KeyError(f'Kiracı için API anahtarı bulunamadı: {tenant_id}')
+            api_key = self.api_key_provider(tenant_id)
+
+        client = NilveraClient(
+            api_key=api_key,
+            environment=self.environment,
+            test_url=self.test_url,
+            production_url=self.production_url,
+            transport=TenantTransport(self.transport, self.max_concurrency_per_tenant, self.acquire_timeout),
+            **self.client_options
+        )
+
+        with self._lock:
+            existing = self._clients.get(tenant_id)
+            if existing is not None and existing.api_key == api_key:
+                # Başka bir thread aynı anda oluşturdu
+                closing = [client]
+                client = existing
+            else:
+                # API anahtarı değişen kiracının eski client'ı kapatılır
+                closing = [existing] if existing is not None else []
+                self._clients[tenant_id] = client
+            self._clients.move_to_end(tenant_id)
+            closing.extend(self._evict_locked())
+        self._close_clients(closing)
+        return client
+
+    def _evict_locked(self) -> list:
+        """
+        Süresi dolan ve LRU sınırını aşan boştaki kiracıları kayıttan çıkarır
+
+        Returns:
+            list: Kilit bırakıldıktan sonra kapatılacak client'lar
+        """
+        evicted = []
+        now = time.monotonic()
+        if self.idle_ttl is not None:
+            expired = [
+                tid for tid, c in self._clients.items()
+                if c.transport.active == 0 and now - c.transport.last_used > self.idle_ttl
+            ]
+            for tid in expired:
+                evicted.append(self._clients.pop(tid))
+                logger.debug(f"Kiracı boşta kaldığı için bırakıldı: {tid}")
+
+        if len(self._clients) <= self.max_tenants:
+            return evicted
+        for tid in list(self._clients):
+            if len(self._clients) <= self.max_tenants:
+                break
+            if self._clients[tid].transport.active == 0:
+                evicted.append(self._clients.pop(tid))
+                logger.debug(f"Kiracı LRU sınırı nedeniyle bırakıldı: {tid}")
+        return evicted
+
+    @staticmethod
+    def _close_clients(clients):
+        """Arka plan toplayıcılarını durdurur; paylaşılan transport açık kalır"""
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Kiracı client'ı kapatılamadı: {e}")
+
+    def evict(self, tenant_id) -> bool:
+        """Kiracıyı kayıttan çıkarır ve client'ını kapatır"""
+        with self._lock:
+            client = self._clients.pop(tenant_id, None)
+        if client is None:
+            return False
+        self._close_clients([client])
+        return True
+
+    def __contains__(self, tenant_id):
+        with self._lock:
+            return tenant_id in self._clients
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+    def close(self):
+        """Tüm kiracıları bırakır ve (registry oluşturduysa) paylaşılan transport'u kapatır"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        self._close_clients(clients)
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,414 @@
+# nilvera_client/transport.py
+# HTTP Transport Katmanı - NilveraClient'ın ağ erişimi bu katman üzerinden yapılır
+
+import json
+import socket
+from urllib.parse import urlencode
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.connection import HTTPConnection
+
+from .exceptions import NilveraConnectionError, NilveraTimeoutError
+
+
+TIMEOUT_MESSAGE = 'Bağlantı zaman aşımına uğradı'
+CONNECTION_MESSAGE = 'Sunucuya bağlanılamadı. İnternet bağlantınızı kontrol edin.'
+
+
+class TransportResponse:
+    """
+    Transport'lardan dönen yanıt
+
+    requests.Response ile aynı alanları (status_code, headers, content,
+    text, json()) sağlar; client yanıtın hangi backend'den geldiğini bilmez.
+    """
+
+    def __init__(self, status_code: int, headers=None, content: bytes = b'', url: str = None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content or b''
+        self.url = url
+
+    @property
+    def encoding(self):
+        content_type = self.headers.get('Content-Type', '')
+        for part in content_type.split(';')[1:]:
+            key, _, value = part.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"')
+        return 'utf-8'
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 65536):
+        """İçeriği parça parça döndürür"""
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class StreamingResponse(TransportResponse):
+    """
+    Gövdesi henüz okunmamış yanıt
+
+    iter_content() gövdeyi ağdan geldikçe üretir; content / text / json()
+    gövdenin kalanını okur. Kullanım sonunda close() çağrılmalıdır.
+    """
+
+    def __init__(self, status_code: int, headers, iter_chunks, read, close, url: str = None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.url = url
+        self._iter_chunks = iter_chunks
+        self._read = read
+        self._close = close
+        self._content = None
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self._read() or b''
+        return self._content
+
+    def iter_content(self, chunk_size: int = 65536):
+        if self._content is not None:
+            yield from super().iter_content(chunk_size)
+            return
+        yield from self._iter_chunks(chunk_size)
+
+    def close(self):
+        self._close()
+
+
+class BaseTransport:
+    """
+    Tüm transport'ların temel sınıfı
+
+    Alt sınıflar request() metodunu uygular ve:
+        - TransportResponse (veya requests.Response) uyumlu bir nesne döndürür
+        - Zaman aşımında NilveraTimeoutError fırlatır
+        - Bağlantı hatalarında NilveraConnectionError fırlatır
+
+    stream() gövdeyi okumadan döner; varsayılan uygulama request() sonucunu
+    kullanır (gövde yine belleğe alınır). Ağdan akış destekleyen transport'lar
+    bunu ezer.
+    """
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None):
+        raise NotImplementedError
+
+    def stream(self, method: str, url: str, params=None, headers=None, timeout=None):
+        """Yanıtı gövdesi iter_content() ile parça parça okunacak şekilde döndürür"""
+        return self.request(method, url, params=params, headers=headers, timeout=timeout)
+
+    def close(self):
+        """Transport'un tuttuğu kaynakları serbest bırakır"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def keepalive_socket_options(idle: int = None, interval: int = None, count: int = None) -> list:
+    """
+    TCP keep-alive soket seçeneklerini üretir
+
+    Args:
+        idle: İlk keep-alive probundan önceki boşta kalma süresi (sn)
+        interval: Problar arası süre (sn)
+        count: Bağlantı ölü sayılmadan önceki başarısız prob sayısı
+
+    Platformun desteklemediği seçenekler atlanır.
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', interval), ('TCP_KEEPCNT', count)):
+        if value is not None and hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), int(value)))
+    return options
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """Soket seçenekleri verilebilen HTTPAdapter"""
+
+    def __init__(self, socket_options: list = None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.socket_options:
+            pool_kwargs['socket_options'] = HTTPConnection.default_socket_options + self.socket_options
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+class RequestsTransport(BaseTransport):
+    """
+    requests.Session tabanlı varsayılan transport
+
+    Thread güvenliği: Transport çağrı başına paylaşılan bir durum tutmaz;
+    bağlantılar thread-safe urllib3 havuzundan alınır. Tek bir örnek
+    (ve onu kullanan tek bir NilveraClient) tüm thread'ler arasında
+    paylaşılabilir. Session ayarları (header, proxy, adapter) thread'ler
+    çalışmaya başladıktan sonra değiştirilmemelidir.
+
+    Args:
+        session: Kullanılacak requests.Session (opsiyonel)
+        pool_connections: Havuzda tutulacak host sayısı
+        pool_maxsize: Host başına en fazla açık bağlantı sayısı
+        pool_block: True ise havuz doluyken yeni bağlantı açılmaz, boşalması beklenir
+        socket_options: Ek soket seçenekleri (bkz. keepalive_socket_options)
+    """
+
+    def __init__(self, session: requests.Session = None, pool_connections: int = 10,
+                 pool_maxsize: int = 10, pool_block: bool = False, socket_options: list = None):
+        self.session = session or requests.Session()
+        self.adapter = PooledHTTPAdapter(
+            socket_options=socket_options,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None):
+        try:
+            return self.session.request(
+                method=method,
+                url=url,
+                params=params,
+                json=json,
+                data=data,
+                headers=headers,
+                timeout=timeout
+            )
+        except requests.exceptions.Timeout:
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        except requests.exceptions.ConnectionError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+
+    def stream(self, method: str, url: str, params=None, headers=None, timeout=None):
+        try:
+            return self.session.request(method=method, url=url, params=params, headers=headers,
+                                        timeout=timeout, stream=True)
+        except requests.exceptions.Timeout:
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        except requests.exceptions.ConnectionError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+
+    def close(self):
+        self.session.close()
+
+
+def _split_timeout(timeout):
+    """(connect, read) tuple'ı veya tek bir değeri ikiye ayırır"""
+    if isinstance(timeout, (tuple, list)):
+        return timeout[0], timeout[1]
+    return timeout, timeout
+
+
+class Urllib3Transport(BaseTransport):
+    """
+    Doğrudan urllib3 üzerinde çalışan hafif transport
+
+    requests'in oturum, cookie ve hook katmanlarını atlar; çağrı başına
+    maliyeti düşüktür. Yönlendirmeler takip edilmez ve yeniden deneme yapılmaz.
+
+    Args:
+        pool_connections: Havuzda tutulacak host sayısı
+        pool_maxsize: Host başına en fazla açık bağlantı sayısı
+        pool_block: True ise havuz doluyken yeni bağlantı açılmaz, boşalması beklenir
+        socket_options: Ek soket seçenekleri (bkz. keepalive_socket_options)
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, socket_options: list = None):
+        pool_kwargs = {}
+        if socket_options:
+            pool_kwargs['socket_options'] = HTTPConnection.default_socket_options + socket_options
+        self.pool = urllib3.PoolManager(
+            num_pools=pool_connections,
+            maxsize=pool_maxsize,
+            block=pool_block,
+            retries=False,
+            **pool_kwargs
+        )
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None, preload_content: bool = True):
+        if params:
+            query = urlencode({k: v for k, v in params.items() if v is not None})
+            url = f"{url}{'&' if '?' in url else '?'}{query}"
+
+        request_headers = {'Accept-Encoding': 'gzip, deflate'}
+        request_headers.update(headers or {})
+
+        body = data
+        if json is not None:
+            body = _json_dumps(json)
+            request_headers.setdefault('Content-Type', 'application/json')
+        chunked = body is not None and not isinstance(body, (bytes, bytearray, str))
+
+        connect, read = _split_timeout(timeout)
+        try:
+            response = self.pool.request(
+                method,
+                url,
+                body=body,
+                headers=request_headers,
+                timeout=urllib3.Timeout(connect=connect, read=read),
+                redirect=False,
+                chunked=chunked,
+                preload_content=preload_content
+            )
+        except urllib3.exceptions.NewConnectionError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+        except urllib3.exceptions.TimeoutError:
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        except urllib3.exceptions.HTTPError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+
+        if not preload_content:
+            return StreamingResponse(
+                response.status, response.headers,
+                iter_chunks=lambda size: response.stream(size, decode_content=True),
+                read=response.read, close=response.release_conn, url=url
+            )
+        return TransportResponse(response.status, response.headers, response.data, url=url)
+
+    def stream(self, method: str, url: str, params=None, headers=None, timeout=None):
+        return self.request(method, url, params=params, headers=headers, timeout=timeout,
+                            preload_content=False)
+
+    def close(self):
+        self.pool.clear()
+
+
+class HTTPXTransport(BaseTransport):
+    """
+    httpx tabanlı HTTP/2 transport
+
+    HTTP/2 ile çok sayıda eşzamanlı istek (durum sorguları, doküman indirme)
+    birkaç bağlantı üzerinden çoklanır; soket ve TLS el sıkışması sayısı düşer.
+    httpx.Client thread-safe'dir, tek örnek tüm thread'lerce paylaşılabilir.
+
+    Gereksinim: pip install 'httpx[http2]'
+
+    Args:
+        http2: HTTP/2 kullanılsın mı (False ise HTTP/1.1)
+        max_connections: Toplam en fazla bağlantı sayısı
+        max_keepalive_connections: Boşta tutulacak en fazla bağlantı sayısı
+        keepalive_expiry: Boştaki bağlantının kapatılma süresi (sn)
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 10,
+                 max_keepalive_connections: int = None, keepalive_expiry: float = 5.0):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTP/2 transport için httpx gerekli: pip install 'httpx[http2]'")
+
+        self._httpx = httpx
+        self.client = httpx.Client(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+
+    def request(self, method: str, url: str, params=None, json=None, data=None,
+                headers=None, timeout=None):
+        httpx = self._httpx
+        connect, read = _split_timeout(timeout)
+        content = data
+        if json is not None:
+            content = _json_dumps(json)
+            headers = dict(headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+
+        try:
+            return self.client.request(
+                method,
+                url,
+                params=params,
+                content=content,
+                headers=headers,
+                timeout=httpx.Timeout(read, connect=connect)
+            )
+        except httpx.TimeoutException:
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        except httpx.TransportError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+
+    def stream(self, method: str, url: str, params=None, headers=None, timeout=None):
+        httpx = self._httpx
+        connect, read = _split_timeout(timeout)
+        request = self.client.build_request(method, url, params=params, headers=headers,
+                                            timeout=httpx.Timeout(read, connect=connect))
+        try:
+            response = self.client.send(request, stream=True)
+        except httpx.TimeoutException:
+            raise NilveraTimeoutError(TIMEOUT_MESSAGE)
+        except httpx.TransportError:
+            raise NilveraConnectionError(CONNECTION_MESSAGE)
+        return StreamingResponse(
+            response.status_code, response.headers,
+            iter_chunks=response.iter_bytes, read=response.read, close=response.close, url=url
+        )
+
+    def close(self):
+        self.client.close()
+
+
+def _json_dumps(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'urllib3': Urllib3Transport,
+    'http2': HTTPXTransport,
+}
+
+
+def create_transport(name: str, pool_connections: int = 10, pool_maxsize: int = 10,
+                     pool_block: bool = False, socket_options: list = None) -> BaseTransport:
+    """
+    İsimle transport oluşturur
+
+    Args:
+        name: 'requests', 'urllib3' veya 'http2'
+        pool_connections: Havuzda tutulacak host sayısı
+        pool_maxsize: Host başına en fazla bağlantı (http2 için toplam bağlantı)
+        pool_block: Havuz doluyken bekle (http2 için geçersiz)
+        socket_options: Ek soket seçenekleri (http2 için geçersiz)
+
+    Returns:
+        BaseTransport: Yeni transport örneği
+    """
+    if name not in TRANSPORTS:
+        raise ValueError(f"Bilinmeyen transport: {name} (seçenekler: {', '.join(TRANSPORTS)})")
+    if name == 'http2':
+        return HTTPXTransport(http2=True, max_connections=pool_maxsize)
+    return TRANSPORTS[name](
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        socket_options=socket_options
+    )
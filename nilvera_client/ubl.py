@@ -0,0 +1,361 @@
+# nilvera_client/ubl.py
+# UBL Ayrıştırma - Fatura XML'lerinden alan çıkarma ve process havuzu ile sütunlu dışa aktarma
+
+import csv
+import io
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Alan adı -> kök elemana göre yol. Yollar ad alanı öneki olmadan yazılır
+# ('cac:' / 'cbc:' önekleri yok sayılır). Son adımda [@öznitelik=A|B] ile
+# filtre, '/@öznitelik' ile öznitelik değeri seçilebilir.
+DEFAULT_FIELDS = {
+    'UUID': 'UUID',
+    'InvoiceNumber': 'ID',
+    'IssueDate': 'IssueDate',
+    'ProfileID': 'ProfileID',
+    'InvoiceTypeCode': 'InvoiceTypeCode',
+    'CurrencyCode': 'DocumentCurrencyCode',
+    'SupplierTaxNumber': 'AccountingSupplierParty/Party/PartyIdentification/ID[@schemeID=VKN|TCKN]',
+    'SupplierName': 'AccountingSupplierParty/Party/PartyName/Name',
+    'CustomerTaxNumber': 'AccountingCustomerParty/Party/PartyIdentification/ID[@schemeID=VKN|TCKN]',
+    'CustomerName': 'AccountingCustomerParty/Party/PartyName/Name',
+    'TaxAmount': 'TaxTotal/TaxAmount',
+    'LineExtensionAmount': 'LegalMonetaryTotal/LineExtensionAmount',
+    'TaxExclusiveAmount': 'LegalMonetaryTotal/TaxExclusiveAmount',
+    'TaxInclusiveAmount': 'LegalMonetaryTotal/TaxInclusiveAmount',
+    'PayableAmount': 'LegalMonetaryTotal/PayableAmount',
+}
+
+# Kalem alanları InvoiceLine elemanına göredir
+DEFAULT_LINE_FIELDS = {
+    'LineID': 'ID',
+    'ItemName': 'Item/Name',
+    'Quantity': 'InvoicedQuantity',
+    'UnitCode': 'InvoicedQuantity/@unitCode',
+    'PriceAmount': 'Price/PriceAmount',
+    'LineAmount': 'LineExtensionAmount',
+    'LineTaxAmount': 'TaxTotal/TaxAmount',
+    'GTIPNo': 'Delivery/Shipment/GoodsItem/RequiredCustomsID',
+}
+
+_NUMERIC_SUFFIXES = ('Amount', 'Quantity', 'Numeric', 'Percent', 'Rate')
+_LINE = 'InvoiceLine'
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+class _FieldPath:
+    """Derlenmiş alan yolu"""
+
+    __slots__ = ('name', 'steps', 'filter_attr', 'filter_values', 'attribute', 'numeric')
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.filter_attr = None
+        self.filter_values = None
+        self.attribute = None
+
+        parts = [part.split(':', 1)[-1] for part in path.strip('/').split('/')]
+        if parts[-1].startswith('@'):
+            self.attribute = parts.pop()[1:]
+        last = parts[-1]
+        if '[@' in last and last.endswith(']'):
+            last, condition = last[:-1].split('[@', 1)
+            attr, _, values = condition.partition('=')
+            self.filter_attr = attr
+            self.filter_values = frozenset(values.split('|')) if values else None
+            parts[-1] = last
+        self.steps = tuple(parts)
+        self.numeric = self.attribute is None and self.steps[-1].endswith(_NUMERIC_SUFFIXES)
+
+    def value(self, elem):
+        """Eleman bu alana uyuyorsa değeri, uymuyorsa None"""
+        if self.filter_attr is not None:
+            attr_value = elem.get(self.filter_attr)
+            if attr_value is None or (self.filter_values is not None and attr_value not in self.filter_values):
+                return None
+        if self.attribute is not None:
+            return elem.get(self.attribute)
+        text = (elem.text or '').strip()
+        if self.numeric and text:
+            try:
+                return float(text)
+            except ValueError:
+                return text
+        return text
+
+
+def _compile(fields: dict) -> dict:
+    """Yol adımları -> o yoldaki alanlar"""
+    compiled = {}
+    for name, path in fields.items():
+        field = _FieldPath(name, path)
+        compiled.setdefault(field.steps, []).append(field)
+    return compiled
+
+
+def _open_source(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'rb')
+
+
+def extract_fields(source, fields: dict = None, line_fields: dict = None) -> list:
+    """
+    Tek bir UBL belgesinden alanları çıkarır
+
+    Belge iterparse ile okunur ve okunan elemanlar hemen temizlenir; gömülü
+    XSLT ve ekler belleğe alınmaz. Kalem alanı istenmemişse tüm başlık
+    alanları bulunduğu anda okuma durur.
+
+    Args:
+        source: Dosya yolu, bytes veya ikili dosya nesnesi
+        fields: Başlık alanları (varsayılan: DEFAULT_FIELDS)
+        line_fields: Kalem alanları; verilirse her kalem için bir satır üretilir
+
+    Returns:
+        list: Satırlar (dict). Kalem alanı yoksa tek satır.
+    """
+    header = _compile(DEFAULT_FIELDS if fields is None else fields)
+    lines = _compile(line_fields) if line_fields else None
+    return _extract(source, header, lines)
+
+
+def _extract(source, header: dict, lines) -> list:
+    row = {}
+    wanted = sum(len(group) for group in header.values())
+    line_rows = []
+    line = None
+    stack = []
+    root = None
+
+    stream = _open_source(source)
+    try:
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                else:
+                    stack.append(_local(elem.tag))
+                    if lines is not None and len(stack) == 1 and stack[0] == _LINE:
+                        line = {}
+                continue
+
+            if elem is root:
+                break
+            path = tuple(stack)
+            group = header.get(path)
+            if group is not None:
+                for field in group:
+                    if field.name not in row:
+                        value = field.value(elem)
+                        if value is not None:
+                            row[field.name] = value
+                if lines is None and len(row) == wanted:
+                    break
+            elif line is not None:
+                if path == (_LINE,):
+                    line_rows.append(line)
+                    line = None
+                else:
+                    group = lines.get(path[1:])
+                    if group is not None:
+                        for field in group:
+                            if field.name not in line:
+                                value = field.value(elem)
+                                if value is not None:
+                                    line[field.name] = value
+
+            stack.pop()
+            elem.clear()
+            if not stack:
+                # Kök altındaki bitmiş elemanlar da bırakılır
+                root.clear()
+    finally:
+        if stream is not source:
+            stream.close()
+
+    if lines is None:
+        return [row]
+    return [dict(row, **line) for line in line_rows] or [row]
+
+
+def _extract_batch(batch, header: dict, lines) -> list:
+    """Process havuzunda çalışır: bir grup belgeyi işler, hataları satıra yazar"""
+    rows = []
+    for label, source in batch:
+        try:
+            for row in _extract(source, header, lines):
+                row['Source'] = label
+                rows.append(row)
+        except Exception as e:
+            rows.append({'Source': label, 'Error': f'{type(e).__name__}: {e}'})
+    return rows
+
+
+def iter_xml_files(directory: str):
+    """Dizindeki (alt dizinler dahil) .xml dosyalarını sıralı üretir"""
+    for current, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith('.xml'):
+                yield os.path.join(current, name)
+
+
+class UBLExtractor:
+    """
+    Çok sayıda UBL faturasından alanları paralel çıkarır
+
+    Belgeler batch_size'lık gruplar halinde process havuzuna dağıtılır; her
+    worker belgeyi iterparse ile akış halinde okur, bellek kullanımı belge
+    sayısından ve boyutundan bağımsızdır. Aynı anda en fazla 2 * workers grup
+    işlenir ve sonuçlar girdi sırasıyla üretilir. Okunamayan belgeler işi
+    durdurmaz, 'Error' sütunuyla raporlanır.
+
+    Windows / macOS (spawn) üzerinde çağıran kod `if __name__ == '__main__':`
+    bloğunda olmalıdır.
+
+    Args:
+        fields: Başlık alanları (varsayılan: DEFAULT_FIELDS)
+        line_fields: Kalem alanları; verilirse kalem başına bir satır
+            (True = DEFAULT_LINE_FIELDS)
+        workers: Process sayısı (varsayılan: CPU sayısı; 1 = aynı process'te)
+        batch_size: Bir worker'a tek seferde gönderilen belge sayısı
+
+    Kullanım:
+        >>> extractor = UBLExtractor(line_fields=True, workers=8)
+        >>> with open('muhasebe.csv', 'w', newline='', encoding='utf-8') as f:
+        ...     extractor.to_csv(iter_xml_files('xml/'), f)
+    """
+
+    def __init__(self, fields: dict = None, line_fields=None, workers: int = None, batch_size: int = 32):
+        self.fields = dict(DEFAULT_FIELDS if fields is None else fields)
+        if line_fields is True:
+            line_fields = DEFAULT_LINE_FIELDS
+        self.line_fields = dict(line_fields) if line_fields else {}
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self._header = _compile(self.fields)
+        self._lines = _compile(self.line_fields) if self.line_fields else None
+
+    @property
+    def columns(self) -> list:
+        return ['Source'] + list(self.fields) + list(self.line_fields) + ['Error']
+
+    def _batches(self, sources):
+        batch = []
+        for index, source in enumerate(sources):
+            label = source if isinstance(source, str) else str(index)
+            batch.append((label, source))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def iter_rows(self, sources):
+        """
+        Belgelerden satırları girdi sırasıyla üretir
+
+        Args:
+            sources: Dosya yolları veya bytes (ör. iter_xml_files(dizin))
+
+        Yields:
+            dict: 'Source' ve alanlar; hatalı belgelerde 'Error'
+        """
+        if self.workers <= 1:
+            for batch in self._batches(sources):
+                yield from _extract_batch(batch, self._header, self._lines)
+            return
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for batch in self._batches(sources):
+                pending.append(executor.submit(_extract_batch, batch, self._header, self._lines))
+                if len(pending) >= self.workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def to_csv(self, sources, output) -> dict:
+        """
+        Satırları CSV olarak akış halinde yazar
+
+        Args:
+            sources: Dosya yolları veya bytes
+            output: Yazılabilir metin akışı (newline='' ile açılmış)
+
+        Returns:
+            dict: {'success', 'rows', 'failed', 'elapsed_s'}
+        """
+        started = time.perf_counter()
+        writer = csv.DictWriter(output, fieldnames=self.columns, extrasaction='ignore')
+        writer.writeheader()
+        rows = failed = 0
+        for row in self.iter_rows(sources):
+            writer.writerow(row)
+            rows += 1
+            if 'Error' in row:
+                failed += 1
+                logger.warning(f"UBL okunamadı: {row['Source']} - {row['Error']}")
+        output.flush()
+        return {
+            'success': failed == 0,
+            'rows': rows,
+            'failed': failed,
+            'elapsed_s': round(time.perf_counter() - started, 3),
+        }
+
+    def to_numpy(self, sources, text_width: int = 64, block_size: int = 4096):
+        """
+        Satırları NumPy structured array olarak döndürür
+
+        Sayısal alanlar float64 (boşsa NaN), diğerleri text_width uzunluğunda
+        metin sütunlarıdır. Satırlar block_size'lık bloklarda dönüştürülür;
+        Python dict'leri blok boyunu aşacak kadar birikmez.
+
+        Raises:
+            ImportError: numpy kurulu değilse
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("to_numpy için numpy gerekli: pip install numpy")
+
+        numeric = {field.name for group in self._header.values() for field in group if field.numeric}
+        if self._lines is not None:
+            numeric |= {field.name for group in self._lines.values() for field in group if field.numeric}
+        columns = self.columns
+        dtype = [(name, 'f8' if name in numeric else f'U{text_width}') for name in columns]
+
+        def convert(row):
+            values = []
+            for name in columns:
+                value = row.get(name)
+                if name in numeric:
+                    values.append(value if isinstance(value, float) else float('nan'))
+                else:
+                    values.append('' if value is None else str(value))
+            return tuple(values)
+
+        blocks = []
+        block = []
+        for row in self.iter_rows(sources):
+            block.append(convert(row))
+            if len(block) >= block_size:
+                blocks.append(np.array(block, dtype=dtype))
+                block = []
+        if block or not blocks:
+            blocks.append(np.array(block, dtype=dtype))
+        return np.concatenate(blocks)
@@ -0,0 +1,233 @@
+# nilvera_client/validation.py
+# Yerel Fatura Doğrulama - Hatalı faturalar API'ye gönderilmeden yakalanır
+
+import re
+
+from .exceptions import NilveraValidationError
+
+EINVOICE = 'einvoice'
+EARCHIVE = 'earchive'
+
+# Nilvera sayısal kodları ve metin karşılıkları
+INVOICE_TYPE_ISTISNA = 2
+INVOICE_PROFILE_IHRACAT = 3
+_INVOICE_TYPE_NAMES = {'ISTISNA': INVOICE_TYPE_ISTISNA}
+_INVOICE_PROFILE_NAMES = {'IHRACAT': INVOICE_PROFILE_IHRACAT}
+
+_UUID_RE = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+_CURRENCY_RE = re.compile(r'^[A-Z]{3}$')
+_ISSUE_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+_REQUIRED_INFO = {
+    EINVOICE: ('InvoiceType', 'InvoiceProfile', 'InvoiceSerieOrNumber', 'IssueDate', 'CurrencyCode'),
+    EARCHIVE: ('InvoiceType', 'InvoiceSerieOrNumber', 'IssueDate', 'CurrencyCode'),
+}
+_REQUIRED_LINE = ('Name', 'Quantity', 'UnitType', 'Price')
+_REQUIRED_EXPORT_DELIVERY = ('GTIPNo', 'DeliveryTermCode')
+
+
+def _code(value, names):
+    """'ISTISNA' gibi metin kodları sayısal karşılığına çevirir"""
+    if isinstance(value, str):
+        return names.get(value.upper(), value)
+    return value
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class InvoiceValidator:
+    """
+    Nilvera fatura yapısı için derlenmiş doğrulayıcı
+
+    Kurallar örnek oluşturulurken fatura türüne göre bir kez seçilir;
+    validate() yalnızca bu kural listesini sırayla çalıştırır. Tek geçişte
+    tüm hatalar toplanır.
+
+    Kontroller:
+        - Zorunlu InvoiceInfo alanları, UUID / tarih / para birimi biçimi
+        - İhracat: InvoiceProfile IHRACAT ise InvoiceType ISTISNA olmalı,
+          ExportCustomerInfo ve kalemlerde GTİP / teslim şartı bulunmalı, KDV 0 olmalı
+        - Kalemler: zorunlu alanlar, Quantity > 0, Price >= 0,
+          KDVTotal = Quantity * Price * KDVPercent / 100
+        - Toplamlar: LineExtensionAmount = Σ Quantity * Price, KdvTotal = Σ KDVTotal,
+          PayableAmount = LineExtensionAmount + KdvTotal
+        - Döviz: TRY dışındaki para birimlerinde ExchangeRate > 0
+
+    Args:
+        kind: 'einvoice' veya 'earchive'
+        tolerance: Tutar karşılaştırmalarında kabul edilen yuvarlama farkı
+
+    Kullanım:
+        >>> validator = InvoiceValidator()
+        >>> errors = validator.validate(invoice_data)
+        >>> validator.check(invoice_data)  # hata varsa NilveraValidationError
+    """
+
+    def __init__(self, kind: str = EINVOICE, tolerance: float = 0.01):
+        if kind not in _REQUIRED_INFO:
+            raise ValueError("kind 'einvoice' veya 'earchive' olmalı")
+        self.kind = kind
+        self.tolerance = tolerance
+        self._required_info = _REQUIRED_INFO[kind]
+        self._rules = [self._check_info, self._check_parties, self._check_lines_and_totals]
+        if kind == EINVOICE:
+            self._rules.append(self._check_export)
+
+    def validate(self, invoice_data) -> list:
+        """
+        Faturayı doğrular
+
+        Returns:
+            list: Hata mesajları (geçerliyse boş liste)
+        """
+        if not isinstance(invoice_data, dict):
+            return ['Fatura verisi dict olmalı']
+        info = invoice_data.get('InvoiceInfo')
+        if not isinstance(info, dict):
+            return ['InvoiceInfo eksik']
+        lines = invoice_data.get('InvoiceLines')
+        if not isinstance(lines, list) or not lines:
+            return ['InvoiceLines boş olamaz']
+
+        errors = []
+        for rule in self._rules:
+            rule(invoice_data, info, lines, errors)
+        return errors
+
+    def check(self, invoice_data):
+        """Fatura geçersizse NilveraValidationError fırlatır"""
+        errors = self.validate(invoice_data)
+        if errors:
+            raise NilveraValidationError('; '.join(errors), errors=errors)
+
+    # ==================== Kurallar ====================
+
+    def _check_info(self, invoice, info, lines, errors):
+        for field in self._required_info:
+            if info.get(field) in (None, ''):
+                errors.append(f'InvoiceInfo.{field} zorunlu')
+
+        invoice_uuid = info.get('UUID')
+        if invoice_uuid and not _UUID_RE.match(str(invoice_uuid)):
+            errors.append(f'InvoiceInfo.UUID geçersiz: {invoice_uuid}')
+
+        issue_date = info.get('IssueDate')
+        if issue_date and not _ISSUE_DATE_RE.match(str(issue_date)):
+            errors.append(f'InvoiceInfo.IssueDate geçersiz: {issue_date}')
+
+        currency = info.get('CurrencyCode')
+        if currency:
+            if not _CURRENCY_RE.match(str(currency)):
+                errors.append(f'InvoiceInfo.CurrencyCode geçersiz: {currency}')
+            elif currency != 'TRY':
+                rate = info.get('ExchangeRate')
+                if not _number(rate) or rate <= 0:
+                    errors.append(f'{currency} faturasında InvoiceInfo.ExchangeRate pozitif olmalı')
+
+    def _check_parties(self, invoice, info, lines, errors):
+        if not isinstance(invoice.get('CompanyInfo'), dict):
+            errors.append('CompanyInfo eksik')
+        if self._is_export(info):
+            return
+        if not isinstance(invoice.get('CustomerInfo'), dict):
+            errors.append('CustomerInfo eksik')
+
+    def _check_export(self, invoice, info, lines, errors):
+        if not self._is_export(info):
+            return
+        if _code(info.get('InvoiceType'), _INVOICE_TYPE_NAMES) != INVOICE_TYPE_ISTISNA:
+            errors.append('IHRACAT profilinde InvoiceType ISTISNA olmalı')
+        if not isinstance(invoice.get('ExportCustomerInfo'), dict):
+            errors.append('IHRACAT profilinde ExportCustomerInfo zorunlu')
+
+        for i, line in enumerate(lines):
+            if not isinstance(line, dict):
+                continue
+            delivery = line.get('DeliveryInfo')
+            if not isinstance(delivery, dict):
+                errors.append(f'InvoiceLines[{i}].DeliveryInfo ihracatta zorunlu')
+            else:
+                for field in _REQUIRED_EXPORT_DELIVERY:
+                    if not delivery.get(field):
+                        errors.append(f'InvoiceLines[{i}].DeliveryInfo.{field} ihracatta zorunlu')
+            if line.get('KDVPercent'):
+                errors.append(f'InvoiceLines[{i}].KDVPercent ihracatta 0 olmalı')
+
+    def _check_lines_and_totals(self, invoice, info, lines, errors):
+        tolerance = self.tolerance
+        line_total = 0.0
+        kdv_total = 0.0
+        totals_valid = True
+
+        for i, line in enumerate(lines):
+            if not isinstance(line, dict):
+                errors.append(f'InvoiceLines[{i}] dict olmalı')
+                totals_valid = False
+                continue
+            for field in _REQUIRED_LINE:
+                if line.get(field) in (None, ''):
+                    errors.append(f'InvoiceLines[{i}].{field} zorunlu')
+
+            quantity = line.get('Quantity')
+            price = line.get('Price')
+            if not _number(quantity) or not _number(price):
+                totals_valid = False
+                continue
+            if quantity <= 0:
+                errors.append(f'InvoiceLines[{i}].Quantity pozitif olmalı')
+            if price < 0:
+                errors.append(f'InvoiceLines[{i}].Price negatif olamaz')
+
+            percent = line.get('KDVPercent') or 0
+            if not _number(percent):
+                errors.append(f'InvoiceLines[{i}].KDVPercent sayı olmalı: {percent!r}')
+                totals_valid = False
+                continue
+
+            amount = quantity * price
+            line_total += amount
+
+            line_kdv = line.get('KDVTotal')
+            if _number(line_kdv):
+                expected = amount * percent / 100
+                if abs(line_kdv - expected) > tolerance:
+                    errors.append(f'InvoiceLines[{i}].KDVTotal {line_kdv} != {expected:.2f}')
+                kdv_total += line_kdv
+            else:
+                kdv_total += amount * percent / 100
+
+        if not totals_valid:
+            return
+
+        extension = info.get('LineExtensionAmount')
+        if _number(extension) and abs(extension - line_total) > tolerance * len(lines):
+            errors.append(f'InvoiceInfo.LineExtensionAmount {extension} != kalem toplamı {line_total:.2f}')
+
+        kdv = info.get('KdvTotal')
+        if _number(kdv) and abs(kdv - kdv_total) > tolerance * len(lines):
+            errors.append(f'InvoiceInfo.KdvTotal {kdv} != kalem KDV toplamı {kdv_total:.2f}')
+
+        payable = info.get('PayableAmount')
+        if _number(payable):
+            expected = (extension if _number(extension) else line_total) + (kdv if _number(kdv) else kdv_total)
+            if abs(payable - expected) > tolerance * len(lines):
+                errors.append(f'InvoiceInfo.PayableAmount {payable} != {expected:.2f}')
+
+    def _is_export(self, info):
+        return (self.kind == EINVOICE and
+                _code(info.get('InvoiceProfile'), _INVOICE_PROFILE_NAMES) == INVOICE_PROFILE_IHRACAT)
+
+
+_DEFAULT_VALIDATORS = {kind: InvoiceValidator(kind) for kind in _REQUIRED_INFO}
+
+
+def validate_invoice(invoice_data: dict, kind: str = EINVOICE) -> list:
+    """
+    Faturayı varsayılan ayarlarla doğrular
+
+    Returns:
+        list: Hata mesajları (geçerliyse boş liste)
+    """
+    return _DEFAULT_VALIDATORS[kind].validate(invoice_data)
@@ -0,0 +1,432 @@
+# nilvera_client/webhooks.py
+# Durum Bildirimleri - Fatura durum callback'lerini alan yerel alıcı ve sessiz UUID'ler için yoklama
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIGNATURE_HEADER = 'X-Nilvera-Signature'
+DEFAULT_PATH = '/nilvera/webhook'
+DEFAULT_MAX_BODY = 1024 * 1024
+
+_UUID_KEYS = ('UUID', 'Uuid', 'uuid', 'InvoiceUUID', 'InvoiceUuid')
+_STATUS_KEYS = ('StatusCode', 'Status', 'status', 'StatusDetail')
+
+# Bu durumlardan sonra fatura için yeni bildirim beklenmez (büyük/küçük harf duyarsız)
+DEFAULT_FINAL_STATUSES = ('succeed', 'error', 'accepted', 'rejected', 'cancelled', 'canceled')
+# Son durumu bilinen UUID'lerden bellekte tutulan en fazla kayıt
+DEFAULT_MAX_FINAL = 10000
+
+_REASONS = {
+    200: 'OK', 204: 'No Content', 400: 'Bad Request', 401: 'Unauthorized',
+    404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+def sign_payload(body: bytes, secret) -> str:
+    """Gövdenin HMAC-SHA256 imzası (hex)"""
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+    return hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(body: bytes, signature: str, secret) -> bool:
+    """
+    Callback imzasını sabit zamanlı karşılaştırma ile doğrular
+
+    'sha256=<hex>' ve yalın '<hex>' biçimleri kabul edilir.
+    """
+    if not signature:
+        return False
+    signature = signature.strip()
+    if signature.startswith('sha256='):
+        signature = signature[len('sha256='):]
+    return hmac.compare_digest(sign_payload(body, secret), signature.lower())
+
+
+def _status_key(status):
+    return str(status).lower() if status is not None else None
+
+
+def _first(data: dict, keys):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+class StatusEvent:
+    """Tek bir fatura durum değişikliği"""
+
+    __slots__ = ('uuid', 'status', 'source', 'payload', 'received_at')
+
+    def __init__(self, uuid: str, status, source: str, payload: dict, received_at: float = None):
+        self.uuid = uuid
+        self.status = status
+        self.source = source
+        self.payload = payload
+        self.received_at = time.time() if received_at is None else received_at
+
+    @classmethod
+    def from_payload(cls, payload: dict, source: str = 'webhook'):
+        """Callback gövdesindeki bir kayıttan olay üretir (UUID yoksa None)"""
+        if not isinstance(payload, dict):
+            return None
+        uuid = _first(payload, _UUID_KEYS)
+        if uuid is None:
+            return None
+        return cls(str(uuid).lower(), _first(payload, _STATUS_KEYS), source, payload)
+
+    def __repr__(self):
+        return f'<StatusEvent {self.uuid} {self.status!r} ({self.source})>'
+
+
+class StatusTracker:
+    """
+    Fatura durumlarının yerel kopyası ve olay dağıtıcısı
+
+    Webhook'tan gelen olaylar dispatch() ile işlenir: yerel durum güncellenir
+    ve kayıtlı handler'lar çağrılır. watch() ile izlemeye alınan UUID'lerden
+    silence_timeout boyunca olay gelmeyenler poll_silent() ile (veya start()
+    ile başlatılan arka plan thread'inde) get_invoice_status üzerinden
+    yoklanır; böylece yoklama yalnızca bildirimi kaçan faturalar için yapılır.
+
+    Son duruma ulaşan UUID'ler izlemeden ve etkin durum tablosundan çıkarılır;
+    son durumları max_final kayıtlık bir LRU'da tutulur (get() ve tekrar
+    gelen bildirimlerin elenmesi için). Böylece uzun süre çalışan bir
+    alıcıda bellek kullanımı sınırlı kalır. Son duruma ulaşmış UUID için geç
+    gelen veya yeniden denenen ara durum bildirimleri yok sayılır.
+
+    Args:
+        client: Yoklama için NilveraClient (verilmezse yoklama yapılmaz)
+        silence_timeout: Bu süre (sn) olay gelmeyen UUID yoklanır
+        final_statuses: Bu durumlara ulaşan UUID'ler izlemeden çıkarılır
+            (büyük/küçük harf duyarsız, varsayılan DEFAULT_FINAL_STATUSES)
+        max_final: Son durumu saklanan en fazla UUID sayısı
+
+    Kullanım:
+        >>> tracker = StatusTracker(client, silence_timeout=600)
+        >>> tracker.on(lambda event: print(event.uuid, event.status))
+        >>> tracker.watch(invoice_uuid)
+        >>> tracker.start(interval=60)
+    """
+
+    def __init__(self, client=None, silence_timeout: float = 900, final_statuses=DEFAULT_FINAL_STATUSES,
+                 max_final: int = DEFAULT_MAX_FINAL):
+        if not final_statuses:
+            raise ValueError('final_statuses boş olamaz; izlenen UUID\'ler hiç çıkarılmaz')
+        self.client = client
+        self.silence_timeout = silence_timeout
+        self.final_statuses = {_status_key(status) for status in final_statuses}
+        self.max_final = max_final
+        self._lock = threading.Lock()
+        self._states = {}
+        self._final = OrderedDict()
+        self._watched = {}
+        self._handlers = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on(self, handler, status=None):
+        """
+        Handler kaydeder
+
+        Args:
+            handler: StatusEvent alan fonksiyon
+            status: Verilirse yalnızca bu durumdaki olaylar için çağrılır
+                (büyük/küçük harf duyarsız)
+        """
+        with self._lock:
+            self._handlers.append((handler, _status_key(status)))
+        return handler
+
+    def watch(self, invoice_uuid: str):
+        """UUID'yi izlemeye alır; sessiz kalırsa yoklanır"""
+        with self._lock:
+            self._watched.setdefault(invoice_uuid.lower(), time.time())
+
+    def unwatch(self, invoice_uuid: str):
+        with self._lock:
+            self._watched.pop(invoice_uuid.lower(), None)
+
+    def get(self, invoice_uuid: str):
+        """
+        Bilinen son durum
+
+        Returns:
+            dict veya None: {'status', 'source', 'updated_at'}
+        """
+        invoice_uuid = invoice_uuid.lower()
+        with self._lock:
+            state = self._states.get(invoice_uuid) or self._final.get(invoice_uuid)
+            return dict(state) if state else None
+
+    @property
+    def watched(self) -> list:
+        with self._lock:
+            return list(self._watched)
+
+    def dispatch(self, event: StatusEvent) -> bool:
+        """
+        Olayı işler
+
+        Returns:
+            bool: Durum değiştiyse True (handler'lar yalnızca bu durumda çağrılır)
+        """
+        key = _status_key(event.status)
+        final = key in self.final_statuses
+        with self._lock:
+            previous = self._states.get(event.uuid) or self._final.get(event.uuid)
+            if event.uuid in self._watched:
+                self._watched[event.uuid] = event.received_at
+            if previous is not None and _status_key(previous['status']) == key:
+                previous['updated_at'] = event.received_at
+                return False
+            if not final and event.uuid in self._final:
+                # Son durumdan sonra gelen ara durum geç kalmış bir bildirimdir
+                logger.debug(f"Son durumdan sonra gelen olay yok sayıldı: {event!r}")
+                return False
+            state = {
+                'status': event.status,
+                'source': event.source,
+                'updated_at': event.received_at,
+            }
+            if final:
+                self._watched.pop(event.uuid, None)
+                self._states.pop(event.uuid, None)
+                self._final[event.uuid] = state
+                self._final.move_to_end(event.uuid)
+                while len(self._final) > self.max_final:
+                    self._final.popitem(last=False)
+            else:
+                self._states[event.uuid] = state
+            handlers = [handler for handler, status in self._handlers
+                        if status is None or status == key]
+
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Durum handler hatası ({event.uuid}): {e}")
+        return True
+
+    def poll_silent(self) -> int:
+        """
+        silence_timeout boyunca olay gelmeyen UUID'leri yoklar
+
+        Returns:
+            int: Yoklanan UUID sayısı
+        """
+        if self.client is None:
+            return 0
+        cutoff = time.time() - self.silence_timeout
+        with self._lock:
+            silent = [uuid for uuid, seen in self._watched.items() if seen <= cutoff]
+
+        for uuid in silent:
+            self._poll(uuid)
+        if silent:
+            logger.debug(f"Sessiz {len(silent)} fatura yoklandı")
+        return len(silent)
+
+    def _poll(self, uuid: str):
+        result = self.client.get_invoice_status(uuid)
+        now = time.time()
+        with self._lock:
+            if uuid in self._watched:
+                self._watched[uuid] = now
+        if not result.get('success'):
+            logger.warning(f"Durum yoklaması başarısız ({uuid}): {result.get('error')}")
+            return
+        data = result.get('data')
+        if isinstance(data, dict):
+            self.dispatch(StatusEvent(uuid, _first(data, _STATUS_KEYS), 'poll', data, now))
+
+    def start(self, interval: float = 60.0):
+        """Sessiz UUID'leri arka planda periyodik olarak yoklar"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.poll_silent()
+                except Exception as e:
+                    logger.error(f"Durum yoklama hatası: {e}")
+
+        self._thread = threading.Thread(target=run, name='nilvera-status-poll', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Arka plan yoklamasını durdurur"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class WebhookReceiver:
+    """
+    Durum callback'lerini kabul eden HTTP uç noktası
+
+    Aynı örnek hem WSGI uygulaması olarak (Flask / Django / gunicorn'a
+    bağlanabilir) hem de start_server() ile bağımsız bir asyncio sunucusu
+    olarak çalışır. Gövde, secret ile HMAC-SHA256 imzasına göre doğrulanır;
+    tek bir kayıt veya kayıt listesi içeren JSON kabul edilir ve her kayıt
+    tracker'a dağıtılır.
+
+    Args:
+        tracker: Olayların dağıtılacağı StatusTracker
+        secret: İmza anahtarı (verify=True iken zorunlu)
+        verify: False ise imza doğrulanmaz (yalnızca test için; uyarı loglanır)
+        path: Kabul edilen istek yolu
+        signature_header: İmzanın geldiği HTTP başlığı
+        max_body: Kabul edilen en büyük gövde (bayt)
+
+    Kullanım:
+        >>> receiver = WebhookReceiver(tracker, secret='paylasilan-anahtar')
+        >>> # WSGI: app.wsgi_app = receiver  veya  gunicorn modul:receiver
+        >>> # asyncio: server = await receiver.start_server('0.0.0.0', 8080)
+    """
+
+    def __init__(self, tracker: StatusTracker, secret=None, path: str = DEFAULT_PATH,
+                 signature_header: str = DEFAULT_SIGNATURE_HEADER, max_body: int = DEFAULT_MAX_BODY,
+                 verify: bool = True):
+        if verify and not secret:
+            raise ValueError('Webhook imza doğrulaması için secret gerekli (test için verify=False)')
+        if not verify:
+            logger.warning("Webhook imza doğrulaması kapalı; imzasız gövdeler kabul edilecek")
+        self.tracker = tracker
+        self.secret = secret if verify else None
+        self.path = path
+        self.signature_header = signature_header
+        self.max_body = max_body
+
+    def handle(self, method: str, path: str, headers: dict, body: bytes):
+        """
+        Ham isteği işler (WSGI ve asyncio sunucusu için ortak)
+
+        Args:
+            headers: Küçük harfli başlık adı -> değer
+
+        Returns:
+            tuple: (HTTP durum kodu, yanıt gövdesi)
+        """
+        if path.split('?', 1)[0] != self.path:
+            return 404, b''
+        if method != 'POST':
+            return 405, b''
+        if len(body) > self.max_body:
+            return 413, b''
+        if self.secret is not None and not verify_signature(
+                body, headers.get(self.signature_header.lower()), self.secret):
+            logger.warning("Webhook imzası geçersiz")
+            return 401, b''
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, b'{"error": "JSON gecersiz"}'
+
+        records = payload if isinstance(payload, list) else [payload]
+        events = [StatusEvent.from_payload(record) for record in records]
+        if any(event is None for event in events):
+            return 400, b'{"error": "UUID eksik"}'
+
+        for event in events:
+            self.tracker.dispatch(event)
+        return 204, b''
+
+    # ==================== WSGI ====================
+
+    def __call__(self, environ, start_response):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > self.max_body:
+            status, body = 413, b''
+        else:
+            headers = {
+                key[5:].replace('_', '-').lower(): value
+                for key, value in environ.items() if key.startswith('HTTP_')
+            }
+            body = environ['wsgi.input'].read(length) if length else b''
+            status, body = self.handle(environ.get('REQUEST_METHOD', 'GET'),
+                                       environ.get('PATH_INFO', '/'), headers, body)
+        start_response(f'{status} {_REASONS[status]}', [
+            ('Content-Type', 'application/json'), ('Content-Length', str(len(body)))
+        ])
+        return [body]
+
+    # ==================== asyncio ====================
+
+    async def start_server(self, host: str = '127.0.0.1', port: int = 8080):
+        """
+        Bağımsız asyncio HTTP sunucusunu başlatır
+
+        Returns:
+            asyncio.Server: serve_forever() / close() ile yönetilir
+        """
+        import asyncio
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def _serve_connection(self, reader, writer):
+        import asyncio
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ', 2)
+                except ValueError:
+                    await self._respond(writer, 400, b'', close=True)
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    await self._respond(writer, 400, b'', close=True)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, b'', close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                # Handler'lar bloklayabilir (veritabanı vb.); event loop'u tutmasınlar
+                status, response = await asyncio.get_running_loop().run_in_executor(
+                    None, self.handle, method, target, headers, body
+                )
+                close = headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0'
+                await self._respond(writer, status, response, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status: int, body: bytes, close: bool):
+        writer.write(
+            f'HTTP/1.1 {status} {_REASONS[status]}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
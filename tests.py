@@ -87,6 +87,103 @@ class TestTCMBCurrencyService(unittest.TestCase):
         self.assertTrue(hasattr(TCMBCurrencyService, 'get_latest_usd_buy_rate'))
         self.assertTrue(hasattr(TCMBCurrencyService, 'get_latest_eur_buy_rate'))
 
+    def _holiday_fetch(self, barrier, days=None):
+        """
+        Son üç iş günü tatil; istenen gün tek başına sorgulanır, önceki adaylar
+        aynı anda sorgulanmazsa barrier kırılır
+        """
+        def fetch(currency_code, date, rate_type):
+            day = date.strftime('%Y-%m-%d')
+            if days is not None:
+                days.append(day)
+            if day != '2026-02-16':
+                barrier.wait()
+            if day in ('2026-02-16', '2026-02-13', '2026-02-12'):
+                return {'success': False, 'date': day, 'error': 'HTTP 404'}
+            return {'success': True, 'rate': 34.5, 'date': day, 'currency': currency_code}
+        return fetch
+
+    def test_parallel_walk_back(self):
+        """parallel ile aday günler aynı anda sorgulanır, en yeni başarılı gün döner"""
+        import threading
+        from datetime import datetime
+
+        barrier = threading.Barrier(4, timeout=5)
+        days = []
+        with patch.object(TCMBCurrencyService, '_fetch_rate_for_date',
+                          side_effect=self._holiday_fetch(barrier, days)):
+            result = TCMBCurrencyService.get_exchange_rate('USD', datetime(2026, 2, 16), parallel=4)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['date'], '2026-02-11')
+        self.assertEqual(days[0], '2026-02-16')
+
+    def test_parallel_walk_back_fetches_today_first(self):
+        """Günün tablosu varsa önceki günler sorgulanmaz"""
+        import asyncio
+        from datetime import datetime
+
+        calls = []
+
+        def fetch(currency_code, date, rate_type):
+            calls.append(date)
+            return {'success': True, 'rate': 34.5, 'date': date.strftime('%Y-%m-%d')}
+
+        with patch.object(TCMBCurrencyService, '_fetch_rate_for_date', side_effect=fetch):
+            TCMBCurrencyService.get_exchange_rate('USD', datetime(2026, 2, 13), parallel=4)
+            asyncio.run(TCMBCurrencyService.get_exchange_rate_async('USD', datetime(2026, 2, 13)))
+
+        self.assertEqual(calls, [datetime(2026, 2, 13)] * 2)
+
+    def test_async_walk_back(self):
+        """Async sürüm aynı sonucu döndürür"""
+        import asyncio
+        import threading
+        from datetime import datetime
+
+        barrier = threading.Barrier(4, timeout=5)
+        with patch.object(TCMBCurrencyService, '_fetch_rate_for_date', side_effect=self._holiday_fetch(barrier)):
+            result = asyncio.run(TCMBCurrencyService.get_exchange_rate_async('USD', datetime(2026, 2, 16)))
+
+        self.assertEqual(result['date'], '2026-02-11')
+
+    def test_convert_amounts(self):
+        """Toplu çevirme her kuru bir kez çözer ve ROUND_HALF_UP ile yuvarlar"""
+        from decimal import Decimal
+
+        calls = []
+
+        def rate_source(currency, date, rate_type):
+            calls.append((currency, date.strftime('%Y-%m-%d')))
+            if currency == 'GBP':
+                return {'success': False, 'error': 'GBP bulunamadı'}
+            return {'success': True, 'rate': {'USD': 34.5, 'EUR': 1.005}[currency],
+                    'date': date.strftime('%Y-%m-%d')}
+
+        result = TCMBCurrencyService.convert_amounts(
+            [0.1, 2.0, 10, '-0.5', 7, 3.0],
+            ['USD', 'EUR', 'EUR', 'EUR', 'TRY', 'GBP'],
+            '2026-02-16',
+            rate_source=rate_source
+        )
+
+        self.assertFalse(result['success'])
+        self.assertEqual(sorted(calls), [('EUR', '2026-02-16'), ('GBP', '2026-02-16'), ('USD', '2026-02-16')])
+        self.assertEqual(list(result['amounts']), [
+            Decimal('3.45'), Decimal('2.01'), Decimal('10.05'), Decimal('-0.50'), Decimal('7.00'), None
+        ])
+        self.assertEqual(result['total'], Decimal('22.01'))
+        self.assertEqual(result['errors'][0]['currency'], 'GBP')
+
+    def test_convert_amounts_more_than_six_decimals(self):
+        """6'dan fazla ondalıklı tutarlar iki kez yuvarlanmaz"""
+        from decimal import Decimal
+
+        result = TCMBCurrencyService.convert_amounts([1.0049995, 2.675, -1.0049995, 10], 'TRY', '2026-02-16')
+        self.assertEqual(list(result['amounts']), [
+            Decimal('1.00'), Decimal('2.68'), Decimal('-1.00'), Decimal('10.00')
+        ])
+
 
 class TestExceptions(unittest.TestCase):
     """Exception sınıfları testleri"""
@@ -158,6 +255,2426 @@ class TestClientMethods(unittest.TestCase):
             self.assertTrue(hasattr(self.client, method), f"Missing method: {method}")
 
 
+class TestBenchmarkStubServer(unittest.TestCase):
+    """Benchmark sahte sunucusu testleri"""
+
+    def test_client_against_stub_server(self):
+        """Client sahte sunucu üzerinden uçtan uca çalışır"""
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig()) as server:
+            client = NilveraClient(api_key="bench-key", environment='test', test_url=server.url)
+            status = client.get_invoice_status('abc')
+            pdf = client.get_invoice_pdf('abc')
+
+        self.assertTrue(status['success'])
+        self.assertEqual(status['data']['UUID'], 'abc')
+        self.assertTrue(pdf['data'].startswith(b'%PDF'))
+
+    def test_compare_reports(self):
+        """Rapor karşılaştırma oranları testi"""
+        from benchmarks import compare_reports
+
+        def report(ops, p50):
+            return {'scenarios': {'s': {
+                'throughput_per_second': ops,
+                'latency_ms': {'p50': p50, 'p99': p50 * 2},
+                'peak_memory_bytes': 1000,
+            }}}
+
+        ratios = compare_reports(report(100, 10.0), report(200, 5.0))
+        self.assertEqual(ratios['s']['throughput'], 2.0)
+        self.assertEqual(ratios['s']['p50'], 0.5)
+
+    def test_run_scenario_survives_injected_errors(self):
+        """Hata enjeksiyonunda ısınma ve bellek geçişi de exception fırlatmaz"""
+        import tracemalloc
+        from benchmarks import StubServer, StubConfig, run_scenario
+
+        with StubServer(StubConfig(error_rate=1.0, document_size=1024)) as server:
+            client = NilveraClient(api_key="bench-key", environment='test', test_url=server.url)
+            result = run_scenario('download.get_invoice_pdf', client, iterations=4,
+                                  concurrency=1, memory_iterations=2)
+            client.close()
+
+        self.assertEqual(result['errors'], 4)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class TestCassetteTransport(unittest.TestCase):
+    """Kayıt/tekrar oynatma transport testleri"""
+
+    def setUp(self):
+        import tempfile, os
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class FakeTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(200, {'Content-Type': 'application/json'},
+                                         b'{"StatusCode": "succeed"}', url=url)
+
+        self.fake = FakeTransport()
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'kaset.jsonl.gz')
+
+    def test_record_and_replay(self):
+        """Kaydedilen yanıt ağ olmadan aynen oynatılır"""
+        from nilvera_client.cassette import RecordingTransport, ReplayTransport
+
+        recorder = RecordingTransport(self.fake, self.path)
+        client = NilveraClient(api_key="gizli-anahtar", transport=recorder)
+        recorded = client.get_invoice_status('abc')
+        recorder.close()
+
+        replay = ReplayTransport(self.path)
+        replayed = NilveraClient(api_key="baska-anahtar", transport=replay).get_invoice_status('abc')
+
+        self.assertEqual(recorded, replayed)
+        self.assertEqual(replay.remaining, 0)
+
+    def test_authorization_redacted(self):
+        """Authorization header'ı kasete yazılmaz"""
+        import gzip
+        from nilvera_client.cassette import RecordingTransport
+
+        recorder = RecordingTransport(self.fake, self.path)
+        NilveraClient(api_key="gizli-anahtar", transport=recorder).get_invoice_status('abc')
+        recorder.close()
+
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            content = f.read()
+        self.assertNotIn('gizli-anahtar', content)
+        self.assertIn('"Authorization":"***"', content)
+
+    def test_replay_without_match(self):
+        """Eşleşmeyen istek bağlantı hatası olarak döner"""
+        from nilvera_client.cassette import RecordingTransport, ReplayTransport
+
+        RecordingTransport(self.fake, self.path).close()
+        client = NilveraClient(api_key="k", transport=ReplayTransport(self.path))
+        result = client.get_invoice_status('yok')
+        self.assertFalse(result['success'])
+
+
+    def _write_cassette(self, entries):
+        import json, os
+        path = os.path.join(self.tmpdir, 'elle.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(dict({'method': 'GET', 'params': '', 'body': None, 'status': 200,
+                                         'headers': {}, 'text': '{}'}, **entry)) + '\n')
+        return path
+
+    def test_encoding_headers_not_recorded(self):
+        """Gövde çözülmüş saklandığından Content-Encoding / Content-Length kaydedilmez"""
+        from nilvera_client.cassette import RecordingTransport, ReplayTransport, load_cassette
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class GzipTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(200, {'Content-Type': 'application/json', 'Content-Encoding': 'gzip',
+                                               'Content-Length': '12'}, b'{"a": 1}', url=url)
+
+        recorder = RecordingTransport(GzipTransport(), self.path)
+        recorder.request('GET', 'https://x/a')
+        recorder.close()
+        self.assertEqual(load_cassette(self.path)[0]['headers'], {'Content-Type': 'application/json'})
+
+        old = self._write_cassette([{'url': 'https://x/a', 'headers': {'Content-Encoding': 'gzip'}}])
+        self.assertNotIn('Content-Encoding', ReplayTransport(old).request('GET', 'https://x/a').headers)
+
+    def test_loop_rewinds_only_exhausted_request(self):
+        """loop=True iken yalnızca tükenen isteğin kayıtları başa sarılır"""
+        from nilvera_client.cassette import ReplayTransport
+
+        path = self._write_cassette([{'url': 'https://x/a'}, {'url': 'https://x/b'}])
+        replay = ReplayTransport(path, loop=True)
+        replay.request('GET', 'https://x/b')
+        replay.request('GET', 'https://x/a')
+        replay.request('GET', 'https://x/a')
+        self.assertEqual(replay.remaining, 0)
+
+    def test_original_timing_honors_offsets(self):
+        """'original' modunda yanıtlar kayıttaki zaman damgalarına göre döner"""
+        import time
+        from nilvera_client.cassette import ReplayTransport
+
+        path = self._write_cassette([
+            {'url': 'https://x/a', 't': 10.0, 'elapsed': 0.0},
+            {'url': 'https://x/b', 't': 10.3, 'elapsed': 0.05},
+        ])
+        replay = ReplayTransport(path, timing='original')
+        start = time.monotonic()
+        replay.request('GET', 'https://x/a')
+        self.assertLess(time.monotonic() - start, 0.1)
+        replay.request('GET', 'https://x/b')
+        self.assertGreaterEqual(time.monotonic() - start, 0.34)
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Bağlantı havuzu ve thread güvenliği testleri"""
+
+    def test_pool_and_timeout_options(self):
+        """Havuz ve zaman aşımı ayarları transport'a aktarılır"""
+        client = NilveraClient(api_key="k", pool_maxsize=32, pool_block=True,
+                               connect_timeout=3, read_timeout=60)
+        adapter = client.session.get_adapter('https://api.nilvera.com')
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertTrue(adapter._pool_block)
+        self.assertEqual(client.timeout, (3, 60))
+
+    def test_keep_alive_disabled(self):
+        """keep_alive=False iken bağlantı kapatma header'ı eklenir"""
+        client = NilveraClient(api_key="k", keep_alive=False)
+        self.assertEqual(client._request_headers()['Connection'], 'close')
+
+    def test_shared_client_across_threads(self):
+        """Tek client örneği çok sayıda thread tarafından paylaşılır"""
+        from concurrent.futures import ThreadPoolExecutor
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig()) as server:
+            client = NilveraClient(api_key="k", test_url=server.url, pool_maxsize=16, pool_block=True)
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(client.get_invoice_status, [f'u{i}' for i in range(64)]))
+
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertEqual([r['data']['UUID'] for r in results], [f'u{i}' for i in range(64)])
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Çok kiracılı client kaydı testleri"""
+
+    def setUp(self):
+        import threading
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class CapturingTransport(BaseTransport):
+            def __init__(self):
+                self.auth = []
+                self.lock = threading.Lock()
+                self.gate = threading.Event()
+                self.active = 0
+                self.peak = 0
+
+            def request(self, method, url, headers=None, **kwargs):
+                with self.lock:
+                    self.auth.append(headers['Authorization'])
+                    self.active += 1
+                    self.peak = max(self.peak, self.active)
+                self.gate.wait(1)
+                with self.lock:
+                    self.active -= 1
+                return TransportResponse(200, {'Content-Type': 'application/json'}, b'{}')
+
+        self.transport = CapturingTransport()
+        self.transport.gate.set()
+
+    def test_tenants_share_transport(self):
+        """Kiracılar aynı transport'u kendi anahtarlarıyla kullanır"""
+        from nilvera_client import NilveraClientRegistry
+
+        registry = NilveraClientRegistry(transport=self.transport,
+                                         api_key_provider=lambda tid: f'key-{tid}')
+        registry.get('a').get_invoice_status('x')
+        registry.get('b').get_invoice_status('x')
+
+        self.assertIs(registry.get('a').transport.inner, registry.get('b').transport.inner)
+        self.assertIsNone(registry.get('a').session)
+        self.assertEqual(self.transport.auth, ['Bearer key-a', 'Bearer key-b'])
+
+    def test_lru_eviction(self):
+        """LRU sınırı aşılınca en eski boştaki kiracı bırakılır"""
+        from nilvera_client import NilveraClientRegistry
+
+        registry = NilveraClientRegistry(transport=self.transport, max_tenants=2,
+                                         api_key_provider=lambda tid: 'k')
+        registry.get('a')
+        registry.get('b')
+        registry.get('a')
+        registry.get('c')
+
+        self.assertIn('a', registry)
+        self.assertNotIn('b', registry)
+        self.assertEqual(len(registry), 2)
+
+    def test_per_tenant_concurrency_cap(self):
+        """Kiracı başına eşzamanlılık sınırı uygulanır"""
+        import threading
+        from nilvera_client import NilveraClientRegistry
+
+        self.transport.gate.clear()
+        registry = NilveraClientRegistry(transport=self.transport, max_concurrency_per_tenant=2,
+                                         api_key_provider=lambda tid: 'k')
+        client = registry.get('toplu')
+        threads = [threading.Thread(target=client.get_invoice_status, args=('x',)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        threading.Timer(0.2, self.transport.gate.set).start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.transport.peak, 2)
+
+    def test_evicted_and_replaced_clients_are_closed(self):
+        """LRU'dan düşen, anahtarı değişen ve evict edilen client'lar kapatılır"""
+        from nilvera_client import NilveraClientRegistry
+
+        registry = NilveraClientRegistry(transport=self.transport, max_tenants=1,
+                                         api_key_provider=lambda tid: 'k')
+        first = registry.get('a')
+        first.close = Mock()
+        registry.get('b').close = Mock()
+        self.assertEqual(first.close.call_count, 1)
+
+        second = registry.get('b')
+        registry.get('b', api_key='yeni')
+        self.assertEqual(second.close.call_count, 1)
+
+        third = registry.get('b')
+        third.close = Mock()
+        self.assertTrue(registry.evict('b'))
+        third.close.assert_called_once()
+
+    def test_stream_forwarded_within_tenant_limit(self):
+        """Akış istekleri paylaşılan transport'a iletilir, yanıt kapanınca sınır boşalır"""
+        import json
+        from nilvera_client import NilveraClientRegistry
+        from nilvera_client.transport import TransportResponse
+
+        streamed = []
+        body = json.dumps({'TotalPages': 1, 'Content': [{'UUID': 'a'}, {'UUID': 'b'}]}).encode()
+
+        def stream(method, url, **kwargs):
+            streamed.append(url)
+            return TransportResponse(200, {'Content-Type': 'application/json'}, body)
+
+        self.transport.stream = stream
+        registry = NilveraClientRegistry(transport=self.transport, max_concurrency_per_tenant=1,
+                                         acquire_timeout=0.5, api_key_provider=lambda tid: 'k')
+        client = registry.get('a')
+        self.assertEqual([i['UUID'] for i in client.iter_incoming_invoices()], ['a', 'b'])
+        self.assertEqual([i['UUID'] for i in client.iter_incoming_invoices()], ['a', 'b'])
+        self.assertEqual(len(streamed), 2)
+        self.assertEqual(client.transport.active, 0)
+
+    def test_shared_session_rejects_cookies(self):
+        """Bir kiracıya gelen çerez diğer kiracının isteğine eklenmez"""
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from nilvera_client import NilveraClientRegistry
+
+        seen = []
+
+        class CookieHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                seen.append(self.headers.get('Cookie'))
+                self.send_response(200)
+                self.send_header('Set-Cookie', 'oturum=kiraci-a; Path=/')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+        server = HTTPServer(('127.0.0.1', 0), CookieHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            registry = NilveraClientRegistry(test_url=f'http://127.0.0.1:{server.server_port}',
+                                             api_key_provider=lambda tid: f'key-{tid}')
+            registry.get('a').get_invoice_status('x')
+            registry.get('b').get_invoice_status('x')
+            registry.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(seen, [None, None])
+
+
+class TestTransports(unittest.TestCase):
+    """Alternatif transport testleri"""
+
+    def _exercise(self, transport_name):
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig()) as server:
+            client = NilveraClient(api_key="k", test_url=server.url, transport=transport_name)
+            status = client.get_invoice_status('abc')
+            created = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'u-1'}})
+            pdf = client.get_invoice_pdf('abc')
+            with self.assertRaises(NilveraAPIError):
+                client._make_request('GET', '/yok')
+            client.transport.close()
+        return status, created, pdf
+
+    def test_urllib3_matches_requests(self):
+        """urllib3 transport requests ile aynı sonuçları üretir"""
+        expected = self._exercise('requests')
+        actual = self._exercise('urllib3')
+        self.assertEqual(actual[0], expected[0])
+        self.assertEqual(actual[1], expected[1])
+        self.assertEqual(actual[2]['data'], expected[2]['data'])
+
+    def test_http2_transport(self):
+        """HTTP/2 transport (httpx kuruluysa) aynı sonuçları üretir"""
+        try:
+            import httpx, h2  # noqa: F401
+        except ImportError:
+            self.skipTest('httpx[http2] kurulu değil')
+        expected = self._exercise('requests')
+        actual = self._exercise('http2')
+        self.assertEqual(actual[0], expected[0])
+        self.assertEqual(actual[2]['data'], expected[2]['data'])
+
+    def test_connection_error_mapping(self):
+        """Bağlantı hataları tüm transport'larda aynı exception'a dönüşür"""
+        import socket
+        from nilvera_client.transport import create_transport
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        for name in ('requests', 'urllib3'):
+            with self.assertRaises(NilveraConnectionError):
+                create_transport(name).request('GET', f'http://127.0.0.1:{port}/', timeout=2)
+
+    def test_unknown_transport(self):
+        """Bilinmeyen transport adı hata verir"""
+        with self.assertRaises(ValueError):
+            NilveraClient(api_key="k", transport='carrier-pigeon')
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Single-flight istek birleştirme testleri"""
+
+    def _slow_transport(self):
+        import threading, time
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class SlowTransport(BaseTransport):
+            def __init__(self):
+                self.calls = []
+                self.lock = threading.Lock()
+
+            def request(self, method, url, **kwargs):
+                with self.lock:
+                    self.calls.append((method, url))
+                time.sleep(0.2)
+                return TransportResponse(200, {'Content-Type': 'application/json'},
+                                         b'{"StatusCode": "succeed"}')
+
+        return SlowTransport()
+
+    def _run_parallel(self, fn, args):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(args)) as executor:
+            return list(executor.map(fn, args))
+
+    def test_concurrent_gets_coalesced(self):
+        """Eşzamanlı özdeş GET istekleri tek çağrıya iner"""
+        transport = self._slow_transport()
+        client = NilveraClient(api_key="k", transport=transport, coalesce_gets=True)
+
+        results = self._run_parallel(client.get_invoice_status, ['abc'] * 8)
+
+        self.assertEqual(len(transport.calls), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+        results[0]['data']['StatusCode'] = 'degisti'
+        self.assertEqual(results[1]['data']['StatusCode'], 'succeed')
+
+    def test_different_keys_not_coalesced(self):
+        """Farklı parametreli istekler birleştirilmez"""
+        transport = self._slow_transport()
+        client = NilveraClient(api_key="k", transport=transport, coalesce_gets=True)
+
+        self._run_parallel(client.get_invoice_status, ['a', 'b', 'c'])
+        self.assertEqual(len(transport.calls), 3)
+
+    def test_disabled_by_default(self):
+        """Varsayılan olarak istekler birleştirilmez"""
+        transport = self._slow_transport()
+        client = NilveraClient(api_key="k", transport=transport)
+
+        self._run_parallel(client.get_invoice_status, ['abc'] * 3)
+        self.assertEqual(len(transport.calls), 3)
+
+    def test_error_shared(self):
+        """Lider çağrının hatası bekleyenlere de iletilir"""
+        import threading, time
+        from nilvera_client.singleflight import SingleFlight
+
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(1)
+            raise NilveraTimeoutError('zaman aşımı')
+
+        errors = []
+
+        def call():
+            try:
+                flight.do('k', failing)
+            except NilveraTimeoutError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(1)
+        follower = threading.Thread(target=call)
+        follower.start()
+        for _ in range(1000):
+            if flight.coalesced:
+                break
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(flight.executed, 1)
+
+
+class TestHedging(unittest.TestCase):
+    """Hedged istek testleri"""
+
+    def _transport(self, delays, failures=()):
+        import threading, time
+        from nilvera_client.exceptions import NilveraTimeoutError
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class ScriptedTransport(BaseTransport):
+            def __init__(self):
+                self.delays = list(delays)
+                self.calls = 0
+                self.threads = []
+                self.lock = threading.Lock()
+
+            def request(self, method, url, **kwargs):
+                with self.lock:
+                    index = self.calls
+                    self.calls += 1
+                    self.threads.append(threading.current_thread())
+                time.sleep(self.delays[index] if index < len(self.delays) else 0)
+                if index in failures:
+                    raise NilveraTimeoutError('zaman aşımı')
+                body = ('{"call": %d}' % index).encode()
+                return TransportResponse(200, {'Content-Type': 'application/json'}, body)
+
+        return ScriptedTransport()
+
+    def test_primary_runs_on_caller_thread(self):
+        """Birincil istek çağıranın thread'inde çalışır, yedeğin yanıtı bırakılır"""
+        import threading
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=0.05, budget=1.0)
+        transport = self._transport([0.3, 0.0])
+        client = NilveraClient(api_key="k", transport=transport, hedging=policy)
+
+        result = client.get_invoice_status('abc')
+
+        self.assertEqual(result['data'], {'call': 0})
+        self.assertIs(transport.threads[0], threading.current_thread())
+        self.assertEqual(transport.calls, 2)
+        self.assertEqual(policy.stats()['hedge_wins'], 0)
+
+    def test_hedge_used_when_primary_times_out(self):
+        """Birincil istek zaman aşımına uğrarsa yedeğin yanıtı kullanılır"""
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=0.05, budget=1.0)
+        transport = self._transport([0.3, 0.0], failures={0})
+        client = NilveraClient(api_key="k", transport=transport, hedging=policy)
+
+        result = client.get_invoice_status('abc')
+
+        self.assertEqual(result['data'], {'call': 1})
+        self.assertEqual(transport.calls, 2)
+        self.assertEqual(policy.stats()['hedge_wins'], 1)
+
+    def test_fast_primary_cancels_pending_hedge(self):
+        """Birincil istek erken biterse zamanı gelmemiş yedek gönderilmez"""
+        import time
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=0.1, budget=1.0)
+        transport = self._transport([0.0])
+        client = NilveraClient(api_key="k", transport=transport, hedging=policy)
+
+        client.get_invoice_status('abc')
+        time.sleep(0.2)
+
+        self.assertEqual(transport.calls, 1)
+        self.assertEqual(policy.stats()['hedges'], 0)
+
+    def test_client_closes_owned_policy(self):
+        """hedging=True ile oluşturulan politika client kapanınca kapatılır"""
+        from nilvera_client import HedgingPolicy
+
+        client = NilveraClient(api_key="k", transport=self._transport([0.0]), hedging=True)
+        self.assertIsInstance(client.hedging, HedgingPolicy)
+        client.close()
+        with self.assertRaises(RuntimeError):
+            client.hedging._executor.submit(lambda: None)
+
+        policy = HedgingPolicy()
+        NilveraClient(api_key="k", transport=self._transport([0.0]), hedging=policy).close()
+        policy._executor.submit(lambda: None).result()
+        policy.close()
+
+    def test_budget_limits_hedges(self):
+        """Bütçe yokken yedek istek gönderilmez"""
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=0.01, budget=0.0)
+        transport = self._transport([0.1])
+        client = NilveraClient(api_key="k", transport=transport, hedging=policy)
+
+        result = client.get_invoice_status('abc')
+        self.assertEqual(result['data'], {'call': 0})
+        self.assertEqual(transport.calls, 1)
+        self.assertEqual(policy.stats()['hedges'], 0)
+
+    def test_primaries_not_limited_by_hedge_pool(self):
+        """Birincil istekler yedek havuzunun boyutuyla sınırlanmaz"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=5.0, budget=1.0, max_workers=2)
+        client = NilveraClient(api_key="k", transport=self._transport([0.2] * 8), hedging=policy)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(client.get_invoice_status, ['abc'] * 8))
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(policy.stats()['hedges'], 0)
+
+    def test_no_hedge_when_pool_full(self):
+        """Yedek havuzu doluyken yedek istek kuyruğa alınmaz"""
+        from concurrent.futures import ThreadPoolExecutor
+        from nilvera_client import HedgingPolicy
+
+        policy = HedgingPolicy(initial_delay=0.05, budget=1.0, max_workers=1)
+        transport = self._transport([0.3] * 10)
+        client = NilveraClient(api_key="k", transport=transport, hedging=policy)
+        policy._tokens = policy.max_tokens
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(client.get_invoice_status, ['abc'] * 4))
+
+        self.assertEqual(policy.stats()['hedges'], 1)
+        self.assertEqual(transport.calls, 5)
+
+    def test_delay_from_percentile(self):
+        """Bekleme süresi gözlenen gecikme yüzdeliğinden hesaplanır"""
+        from nilvera_client.hedging import HedgingPolicy, endpoint_key
+
+        policy = HedgingPolicy(percentile=90, min_samples=10, max_delay=5)
+        key = endpoint_key('https://api.nilvera.com/einvoice/Sale/550e8400-e29b-41d4-a716-446655440000/Status')
+        self.assertEqual(key, '/einvoice/Sale/*/Status')
+        for i in range(100):
+            policy.record(key, i / 100.0)
+        self.assertAlmostEqual(policy.delay(key), 0.90)
+
+
+class TestConfirmBatching(unittest.TestCase):
+    """Onaylama çağrılarının mikro toplanması testleri"""
+
+    def _transport(self):
+        import json, threading
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class BatchTransport(BaseTransport):
+            def __init__(self):
+                self.bodies = []
+                self.lock = threading.Lock()
+
+            def request(self, method, url, json=None, **kwargs):
+                with self.lock:
+                    self.bodies.append(json)
+                uuids = [item['UUID'] if isinstance(item, dict) else item for item in json]
+                if 'bad' in uuids:
+                    return TransportResponse(400, {'Content-Type': 'application/json'},
+                                             '{"Message": "Geçersiz UUID"}'.encode())
+                return TransportResponse(200, {'Content-Type': 'application/json'},
+                                         ('{"Count": %d}' % len(json)).encode())
+
+        return BatchTransport()
+
+    def _confirm_parallel(self, client, uuids, archive=False):
+        from concurrent.futures import ThreadPoolExecutor
+        method = client.confirm_and_send_archive_drafts if archive else client.confirm_and_send_draft
+        with ThreadPoolExecutor(max_workers=len(uuids)) as executor:
+            return list(executor.map(lambda u: method([u]), uuids))
+
+    def test_single_confirms_batched(self):
+        """Farklı thread'lerden gelen tekil onaylamalar tek istekte gönderilir"""
+        transport = self._transport()
+        client = NilveraClient(api_key="k", transport=transport,
+                               confirm_batch_size=50, confirm_batch_wait=0.2)
+        uuids = [f'u{i}' for i in range(20)]
+
+        results = self._confirm_parallel(client, uuids)
+        client.close()
+
+        self.assertLess(len(transport.bodies), 5)
+        self.assertEqual(sum(len(b) for b in transport.bodies), 20)
+        self.assertEqual([r['uuid'] for r in results], uuids)
+        self.assertTrue(all(r['success'] for r in results))
+
+    def test_archive_batch_size_limit(self):
+        """Toplu çağrı boyutu sınırı aşılmaz"""
+        transport = self._transport()
+        client = NilveraClient(api_key="k", transport=transport,
+                               confirm_batch_size=4, confirm_batch_wait=0.2)
+
+        self._confirm_parallel(client, [f'u{i}' for i in range(10)], archive=True)
+        client.close()
+
+        self.assertTrue(all(len(b) <= 4 for b in transport.bodies))
+        self.assertTrue(all(isinstance(item, str) for b in transport.bodies for item in b))
+
+    def test_rejected_batch_falls_back(self):
+        """Reddedilen toplu istekte yalnızca hatalı UUID başarısız olur"""
+        transport = self._transport()
+        client = NilveraClient(api_key="k", transport=transport,
+                               confirm_batch_size=10, confirm_batch_wait=0.2)
+
+        results = {r['uuid']: r for r in self._confirm_parallel(client, ['a', 'bad', 'c'])}
+        client.close()
+
+        self.assertTrue(results['a']['success'])
+        self.assertTrue(results['c']['success'])
+        self.assertFalse(results['bad']['success'])
+
+    def test_batch_response_split_per_uuid(self):
+        """Toplu yanıt UUID bazında bölünür; her çağıran kendi sonucunu alır"""
+        import json as json_lib
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class ResultTransport(BaseTransport):
+            def request(self, method, url, json=None, **kwargs):
+                body = [{'UUID': item['UUID'], 'IsSuccess': item['UUID'] != 'b',
+                         'ErrorMessage': 'Alıcı bulunamadı' if item['UUID'] == 'b' else None}
+                        for item in json]
+                return TransportResponse(200, {'Content-Type': 'application/json'},
+                                         json_lib.dumps(body).encode())
+
+        client = NilveraClient(api_key="k", transport=ResultTransport(),
+                               confirm_batch_size=10, confirm_batch_wait=0.2)
+        results = {r['uuid']: r for r in self._confirm_parallel(client, ['a', 'b', 'c'])}
+        client.close()
+
+        self.assertEqual(results['a']['data']['UUID'], 'a')
+        self.assertTrue(results['a']['success'])
+        self.assertTrue(results['c']['success'])
+        self.assertFalse(results['b']['success'])
+        self.assertEqual(results['b']['error'], 'Alıcı bulunamadı')
+
+    def test_timeout_not_retried_per_uuid(self):
+        """Zaman aşımında toplu istek tek tek yeniden gönderilmez"""
+        from nilvera_client.transport import BaseTransport
+
+        class TimeoutTransport(BaseTransport):
+            def __init__(self):
+                self.calls = 0
+
+            def request(self, method, url, json=None, **kwargs):
+                self.calls += 1
+                raise requests.exceptions.Timeout('zaman aşımı')
+
+        transport = TimeoutTransport()
+        client = NilveraClient(api_key="k", transport=transport,
+                               confirm_batch_size=10, confirm_batch_wait=0.2)
+        results = self._confirm_parallel(client, ['a', 'b', 'c'])
+        client.close()
+
+        self.assertFalse(any(r['success'] for r in results))
+        self.assertLessEqual(transport.calls, 3)
+
+
+class TestPriorityScheduler(unittest.TestCase):
+    """Öncelik şeritleri testleri"""
+
+    def test_bulk_quota_leaves_room_for_interactive(self):
+        """Toplu kota dolduğunda etkileşimli çağrılar beklemeden çalışır"""
+        from nilvera_client import PriorityScheduler
+
+        scheduler = PriorityScheduler(max_concurrency=4, limits={'bulk': 2}, queue_timeout=0.05)
+        scheduler.acquire('bulk')
+        scheduler.acquire('bulk')
+
+        with self.assertRaises(NilveraTimeoutError):
+            scheduler.acquire('bulk')
+        self.assertEqual(scheduler.acquire('interactive'), 'interactive')
+
+    def test_queue_full_backpressure(self):
+        """Kuyruk doluyken çağrı hemen reddedilir"""
+        import threading
+        from nilvera_client import PriorityScheduler, NilveraQueueFullError
+
+        scheduler = PriorityScheduler(max_concurrency=1, queue_sizes={'bulk': 1})
+        scheduler.acquire('bulk')
+        waiter = threading.Thread(target=lambda: scheduler.release(scheduler.acquire('bulk')))
+        waiter.start()
+        while scheduler.stats()['bulk']['waiting'] == 0:
+            waiter.join(0.001)
+
+        with self.assertRaises(NilveraQueueFullError):
+            scheduler.acquire('bulk')
+        scheduler.release('bulk')
+        waiter.join()
+
+    def test_interactive_served_first(self):
+        """Boşalan yer önce etkileşimli bekleyene verilir"""
+        import threading
+        from nilvera_client import PriorityScheduler
+
+        scheduler = PriorityScheduler(max_concurrency=1)
+        scheduler.acquire('normal')
+        order = []
+
+        def worker(level):
+            scheduler.acquire(level)
+            order.append(level)
+            scheduler.release(level)
+
+        threads = [threading.Thread(target=worker, args=(level,)) for level in ('bulk', 'interactive')]
+        for t in threads:
+            t.start()
+        while sum(v['waiting'] for v in scheduler.stats().values()) < 2:
+            threads[0].join(0.001)
+        scheduler.release('normal')
+        for t in threads:
+            t.join()
+
+        self.assertEqual(order, ['interactive', 'bulk'])
+
+    def test_client_priority_context(self):
+        """client.priority bloğu istekleri ilgili sınıfa yönlendirir"""
+        from nilvera_client import PriorityScheduler
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        scheduler = PriorityScheduler(max_concurrency=2)
+        seen = []
+
+        class RecordingTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                seen.append({k: v['active'] for k, v in scheduler.stats().items() if v['active']})
+                return TransportResponse(200, {}, b'{}')
+
+        client = NilveraClient(api_key="k", transport=RecordingTransport(), scheduler=scheduler)
+        with client.priority('bulk'):
+            client.get_invoice_status('a')
+        client.get_invoice_status('b')
+
+        self.assertEqual(seen, [{'bulk': 1}, {'normal': 1}])
+
+
+class TestInvoiceOutbox(unittest.TestCase):
+    """Kalıcı giden kutusu testleri"""
+
+    def setUp(self):
+        import tempfile, os
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'outbox.db')
+        self.calls = []
+        self.down = False
+        # yol soneki -> HTTP durum kodu veya fırlatılacak hata
+        self.failures = {}
+        test = self
+
+        class FakeTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                if test.down:
+                    raise NilveraConnectionError('kapalı')
+                path = url.split('/v1', 1)[-1] if '/v1' in url else url
+                test.calls.append((method, path, kwargs.get('json')))
+                for suffix, failure in test.failures.items():
+                    if path.endswith(suffix):
+                        if isinstance(failure, Exception):
+                            raise failure
+                        return TransportResponse(failure, {}, b'{"Message": "hata"}')
+                return TransportResponse(200, {}, b'{}')
+
+        self.client = NilveraClient(api_key="k", transport=FakeTransport())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _paths(self):
+        return [c[1].rsplit('/', 2)[-2:] for c in self.calls]
+
+    def test_enqueue_and_batched_flush(self):
+        """Kuyruğa alınan faturalar tek onaylama isteğiyle gönderilir"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path, batch_size=10)
+        uuids = [outbox.enqueue({'InvoiceInfo': {}}) for _ in range(3)]
+        self.assertEqual(self.calls, [])
+
+        summary = outbox.flush()
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(summary['sent'], 3)
+        confirms = [c for c in self.calls if c[1].endswith('ConfirmAndSend')]
+        self.assertEqual(len(confirms), 1)
+        self.assertEqual(sorted(item['UUID'] for item in confirms[0][2]), sorted(uuids))
+        self.assertEqual(outbox.counts(), {'sent': 3})
+        outbox.close()
+
+    def test_pending_survives_outage_and_restart(self):
+        """Nilvera kapalıyken kayıtlar kaybolmaz, yeniden açılışta gönderilir"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        invoice_uuid = outbox.enqueue({'InvoiceInfo': {'UUID': 'u-1'}})
+        self.assertEqual(invoice_uuid, 'u-1')
+        self.down = True
+        self.assertEqual(outbox.flush()['retry'], 1)
+        self.assertEqual(outbox.get('u-1')['state'], 'pending')
+        outbox.close()
+
+        self.down = False
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.flush()
+        self.assertEqual(outbox.get('u-1')['state'], 'sent')
+        outbox.close()
+
+    def test_crash_during_confirm_is_not_resent(self):
+        """Onaylama sırasında kesilen kayıt durum sorgusuyla doğrulanır, tekrar gönderilmez"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.enqueue({'InvoiceInfo': {'UUID': 'u-2'}})
+        outbox._set_state(['u-2'], 'confirming')
+        outbox.close()
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.flush()
+        self.assertEqual(outbox.get('u-2')['state'], 'sent')
+        self.assertEqual(self._paths(), [['u-2', 'Status']])
+        outbox.close()
+
+    def test_status_errors_other_than_404_keep_confirming(self):
+        """Durum sorgusu yalnızca 404'te yeniden onaylatır; 429 / 5xx'te kayıt bekler"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.enqueue({'InvoiceInfo': {'UUID': 'u-3'}})
+        outbox._set_state(['u-3'], 'confirming')
+
+        for status in (401, 429, 503):
+            self.failures = {'/Status': status}
+            self.assertEqual(outbox.flush()['retry'], 1)
+            self.assertEqual(outbox.get('u-3')['state'], 'confirming')
+        self.assertFalse([c for c in self.calls if c[1].endswith('ConfirmAndSend')])
+
+        self.failures = {'/Status': 404}
+        outbox.flush()
+        self.assertEqual(outbox.get('u-3')['state'], 'sent')
+        self.assertEqual(len([c for c in self.calls if c[1].endswith('ConfirmAndSend')]), 1)
+        outbox.close()
+
+    def test_archive_confirming_needs_review(self):
+        """Sonucu belirsiz E-Arşiv kaydı yeniden onaylanmaz, manuel kontrole ayrılır"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.enqueue({'InvoiceInfo': {'UUID': 'a-1'}}, kind='earchive')
+        outbox._set_state(['a-1'], 'confirming')
+
+        self.assertEqual(outbox.flush()['review'], 1)
+        self.assertEqual(outbox.get('a-1')['state'], 'review')
+        self.assertEqual(self.calls, [])
+        outbox.close()
+
+    def test_confirm_timeout_is_verified_not_split(self):
+        """Zaman aşımında toplu onay bölünmez; kayıtlar durum sorgusuyla doğrulanır"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path, batch_size=10)
+        for i in range(3):
+            outbox.enqueue({'InvoiceInfo': {'UUID': f't-{i}'}})
+        self.failures = {'ConfirmAndSend': NilveraTimeoutError('zaman aşımı')}
+        summary = outbox.flush()
+        self.assertEqual(summary['retry'], 3)
+        self.assertEqual(len([c for c in self.calls if c[1].endswith('ConfirmAndSend')]), 1)
+        self.assertEqual(outbox.counts(), {'confirming': 3})
+
+        self.failures = {}
+        self.calls.clear()
+        outbox.flush()
+        self.assertEqual(outbox.counts(), {'sent': 3})
+        self.assertFalse([c for c in self.calls if c[1].endswith('ConfirmAndSend')])
+        outbox.close()
+
+    def test_rejected_batch_retried_per_uuid(self):
+        """API toplu onayı reddederse faturalar tek tek yeniden gönderilir"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path, batch_size=10)
+        for i in range(2):
+            outbox.enqueue({'InvoiceInfo': {'UUID': f'r-{i}'}})
+        self.failures = {'ConfirmAndSend': 400}
+        summary = outbox.flush()
+        self.assertEqual(summary['retry'], 2)
+        self.assertEqual(len([c for c in self.calls if c[1].endswith('ConfirmAndSend')]), 3)
+        self.assertEqual(outbox.counts(), {'created': 2})
+        outbox.close()
+
+    def test_create_timeout_checks_draft_first(self):
+        """Zaman aşımına uğrayan oluşturma, taslak varsa tekrar gönderilmez"""
+        from nilvera_client import InvoiceOutbox
+
+        outbox = InvoiceOutbox(self.client, self.path)
+        outbox.enqueue({'InvoiceInfo': {'UUID': 'c-1'}})
+        self.failures = {'Draft/Create': NilveraTimeoutError('zaman aşımı')}
+        summary = outbox.flush()
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['sent'], 1)
+        self.assertIn(['c-1', 'xml'], self._paths())
+        self.assertEqual(len([c for c in self.calls if c[1].endswith('Draft/Create')]), 1)
+        outbox.close()
+
+
+class TestDedupIndex(unittest.TestCase):
+    """Mükerrer gönderim koruması testleri"""
+
+    def _client(self, calls, status=200):
+        from nilvera_client import DedupIndex
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class FakeTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                calls.append(kwargs.get('json'))
+                return TransportResponse(status, {}, b'{}')
+
+        return NilveraClient(api_key="k", transport=FakeTransport(), dedup_index=DedupIndex(':memory:'))
+
+    def test_fingerprint_ignores_uuid_and_key_order(self):
+        """Özet UUID'den ve anahtar sırasından bağımsızdır"""
+        from nilvera_client.dedup import invoice_fingerprint
+
+        a = {'InvoiceInfo': {'UUID': '1', 'InvoiceType': 'ISTISNA'}, 'Notes': ['x']}
+        b = {'Notes': ['x'], 'InvoiceInfo': {'InvoiceType': 'ISTISNA', 'UUID': '2'}}
+        self.assertEqual(invoice_fingerprint(a), invoice_fingerprint(b))
+        self.assertNotEqual(invoice_fingerprint(a), invoice_fingerprint(a, 'earchive'))
+        self.assertEqual(a['InvoiceInfo']['UUID'], '1')
+
+    def test_duplicate_returns_existing_uuid(self):
+        """Aynı içerik yeni UUID ile gelirse API'ye gitmeden ilk UUID döner"""
+        calls = []
+        client = self._client(calls)
+
+        first = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'a'}, 'Lines': [1]})
+        second = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'b'}, 'Lines': [1]})
+
+        self.assertTrue(first['success'])
+        self.assertNotIn('deduplicated', first)
+        self.assertTrue(second['deduplicated'])
+        self.assertEqual(second['uuid'], 'a')
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_create_is_released(self):
+        """Başarısız oluşturma indeksi kilitlemez"""
+        calls = []
+        client = self._client(calls, status=500)
+        client.create_archive_invoice({'InvoiceInfo': {'UUID': 'a'}})
+        result = client.create_archive_invoice({'InvoiceInfo': {'UUID': 'b'}})
+
+        self.assertNotIn('deduplicated', result)
+        self.assertEqual(len(calls), 2)
+
+    def test_pending_claim_reports_in_progress(self):
+        """Gönderimi süren içerik için başarı değil 'gönderiliyor' döner"""
+        from nilvera_client import DedupIndex
+        from nilvera_client.dedup import PENDING
+
+        index = DedupIndex(':memory:')
+        fingerprint = index.fingerprint({'InvoiceInfo': {}, 'Lines': [1]})
+        self.assertIsNone(index.claim(fingerprint, 'a'))
+        self.assertEqual(index.claim(fingerprint, 'b'), ('a', PENDING))
+
+        client = NilveraClient(api_key="k", transport=Mock(), dedup_index=index)
+        result = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'b'}, 'Lines': [1]})
+        self.assertFalse(result['success'])
+        self.assertTrue(result['in_progress'])
+        self.assertEqual(result['uuid'], 'a')
+        self.assertNotIn('deduplicated', result)
+
+    def test_pending_claim_expires_after_lease(self):
+        """Süresi dolan 'pending' ayırma yeni gönderime devredilir"""
+        import time
+        from nilvera_client import DedupIndex
+
+        index = DedupIndex(':memory:', lease=0.05)
+        fingerprint = index.fingerprint({'InvoiceInfo': {}})
+        index.claim(fingerprint, 'a')
+        time.sleep(0.1)
+        self.assertIsNone(index.claim(fingerprint, 'b'))
+        index.confirm(fingerprint, 'b')
+        self.assertEqual(index.claim(fingerprint, 'c'), ('b', 'created'))
+
+    def test_missing_uuid_assigned_without_mutating_caller(self):
+        """UUID'siz veya boş UUID'li faturaya UUID atanır, çağıranın sözlüğü değişmez"""
+        calls = []
+        client = self._client(calls)
+
+        invoice = {'InvoiceInfo': {'UUID': ''}, 'Lines': [1]}
+        first = client.create_draft_invoice(invoice)
+        self.assertEqual(invoice, {'InvoiceInfo': {'UUID': ''}, 'Lines': [1]})
+        self.assertTrue(first['uuid'])
+        self.assertEqual(calls[0]['EInvoice']['InvoiceInfo']['UUID'], first['uuid'])
+
+        archive = {'Lines': [2]}
+        result = client.create_archive_invoice(archive)
+        self.assertEqual(archive, {'Lines': [2]})
+        self.assertEqual(calls[1]['ArchiveInvoice']['InvoiceInfo']['UUID'], result['uuid'])
+
+        again = client.create_draft_invoice({'InvoiceInfo': {'UUID': None}, 'Lines': [1]})
+        self.assertTrue(again['deduplicated'])
+        self.assertEqual(again['uuid'], first['uuid'])
+        self.assertEqual(len(calls), 2)
+
+    def test_lookup_honors_ttl(self):
+        """lookup süresi dolmuş kayıtları eşleşme saymaz"""
+        import time
+        from nilvera_client import DedupIndex
+
+        invoice = {'InvoiceInfo': {'UUID': 'a'}, 'Lines': [1]}
+        index = DedupIndex(':memory:', ttl=0.05)
+        fingerprint = index.fingerprint(invoice)
+        index.claim(fingerprint, 'a')
+        index.confirm(fingerprint, 'a')
+        self.assertEqual(index.lookup(invoice), 'a')
+        time.sleep(0.1)
+        self.assertIsNone(index.lookup(invoice))
+
+    def test_timeout_keeps_claim(self):
+        """Zaman aşımında ayırma bırakılmaz; aynı içerik tekrar gönderilmez"""
+        from nilvera_client import DedupIndex
+        from nilvera_client.transport import BaseTransport
+
+        calls = []
+
+        class TimeoutTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                calls.append(kwargs.get('json'))
+                raise NilveraTimeoutError('zaman aşımı')
+
+        client = NilveraClient(api_key="k", transport=TimeoutTransport(), dedup_index=DedupIndex(':memory:'))
+        first = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'a'}, 'Lines': [1]})
+        second = client.create_draft_invoice({'InvoiceInfo': {'UUID': 'b'}, 'Lines': [1]})
+
+        self.assertFalse(first['success'])
+        self.assertTrue(second['in_progress'])
+        self.assertEqual(len(calls), 1)
+
+
+class TestInvoiceValidator(unittest.TestCase):
+    """Yerel fatura doğrulama testleri"""
+
+    def _invoice(self):
+        return {
+            'InvoiceInfo': {
+                'UUID': '550e8400-e29b-41d4-a716-446655440000',
+                'InvoiceType': 2,
+                'InvoiceProfile': 3,
+                'InvoiceSerieOrNumber': 'IHR',
+                'IssueDate': '2026-02-15T10:00:00.000Z',
+                'CurrencyCode': 'USD',
+                'ExchangeRate': 34.5,
+                'LineExtensionAmount': 21.0,
+                'KdvTotal': 0.0,
+                'PayableAmount': 21.0,
+            },
+            'CompanyInfo': {'TaxNumber': '1234567890'},
+            'ExportCustomerInfo': {'LegalRegistrationName': 'Example Inc.'},
+            'InvoiceLines': [
+                {'Name': 'Ürün', 'Quantity': 2, 'UnitType': 'C62', 'Price': 10.5,
+                 'KDVPercent': 0, 'KDVTotal': 0.0,
+                 'DeliveryInfo': {'GTIPNo': '84212100', 'DeliveryTermCode': 'EXW'}}
+            ],
+        }
+
+    def test_valid_export_invoice(self):
+        """Geçerli ihracat faturası hata üretmez"""
+        from nilvera_client import validate_invoice
+        self.assertEqual(validate_invoice(self._invoice()), [])
+
+    def test_export_rules_and_totals(self):
+        """İhracat kombinasyonu, toplamlar ve döviz kuru kontrol edilir"""
+        from nilvera_client import InvoiceValidator, NilveraValidationError
+
+        invoice = self._invoice()
+        invoice['InvoiceInfo']['InvoiceType'] = 'SATIS'
+        invoice['InvoiceInfo']['PayableAmount'] = 30.0
+        del invoice['InvoiceInfo']['ExchangeRate']
+        del invoice['InvoiceLines'][0]['DeliveryInfo']['GTIPNo']
+
+        with self.assertRaises(NilveraValidationError) as ctx:
+            InvoiceValidator().check(invoice)
+        errors = ' | '.join(ctx.exception.errors)
+        self.assertEqual(len(ctx.exception.errors), 4)
+        for text in ('ISTISNA', 'PayableAmount', 'ExchangeRate', 'GTIPNo'):
+            self.assertIn(text, errors)
+
+    def test_client_rejects_invalid_locally(self):
+        """validate=True iken geçersiz fatura API'ye gönderilmez"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        calls = []
+
+        class FakeTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                calls.append(url)
+                return TransportResponse(200, {}, b'{}')
+
+        client = NilveraClient(api_key="k", transport=FakeTransport(), validate=True)
+        invoice = self._invoice()
+        invoice['InvoiceLines'][0]['Quantity'] = 0
+
+        result = client.create_draft_invoice(invoice)
+        self.assertFalse(result['success'])
+        self.assertTrue(result['validation_errors'])
+        self.assertEqual(calls, [])
+        self.assertTrue(client.create_draft_invoice(self._invoice())['success'])
+
+    def test_non_numeric_kdv_percent_is_reported(self):
+        """Metin KDVPercent TypeError fırlatmaz, doğrulama hatası olur"""
+        from nilvera_client import validate_invoice
+
+        invoice = self._invoice()
+        invoice['InvoiceLines'][0]['KDVPercent'] = '0'
+        errors = validate_invoice(invoice)
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(any('KDVPercent sayı olmalı' in e for e in errors))
+
+        del invoice['InvoiceLines'][0]['KDVTotal']
+        self.assertTrue(any('KDVPercent sayı olmalı' in e for e in validate_invoice(invoice)))
+
+    def test_client_validator_error_returns_dict(self):
+        """Doğrulayıcı hata fırlatsa da create_draft_invoice hata sözlüğü döndürür"""
+        client = NilveraClient(api_key="k", transport=Mock(), validate=True)
+        client._validators['einvoice'].validate = Mock(side_effect=TypeError('beklenmeyen tip'))
+
+        result = client.create_draft_invoice(self._invoice())
+        self.assertFalse(result['success'])
+        self.assertIn('beklenmeyen tip', result['error'])
+        client.transport.request.assert_not_called()
+
+
+class TestInvoiceBuilder(unittest.TestCase):
+    """Sütun bazlı fatura oluşturucu testleri"""
+
+    def _builder(self, kind='einvoice'):
+        from nilvera_client import InvoiceBuilder
+
+        builder = InvoiceBuilder(
+            {'UUID': '550e8400-e29b-41d4-a716-446655440000', 'InvoiceType': 2, 'InvoiceProfile': 3,
+             'InvoiceSerieOrNumber': 'IHR', 'IssueDate': '2026-02-15T10:00:00.000Z',
+             'CurrencyCode': 'USD', 'ExchangeRate': 34.5},
+            {'TaxNumber': '1234567890'},
+            kind=kind,
+            ExportCustomerInfo={'LegalRegistrationName': 'Example "Inc."'},
+        )
+        builder.add_line('Ürün "A"\n', 2, 10.5, gtip='84212100', delivery_term='EXW',
+                         exemption=('301', 'Mal ihracatı'))
+        builder.add_lines(['B', 'C'], [1, 3], [4.0, 0.25], kdv_percent=20)
+        return builder
+
+    def test_encodes_expected_structure(self):
+        """Üretilen gövde geçerli JSON'dur, toplamlar hesaplanır"""
+        import json
+
+        builder = self._builder()
+        body = json.loads(b''.join(builder.iter_json(chunk_size=64)))
+        invoice = body['EInvoice']
+        lines = invoice['InvoiceLines']
+
+        self.assertEqual(body['CustomerAlias'], '')
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]['Name'], 'Ürün "A"\n')
+        self.assertEqual(lines[0]['DeliveryInfo'], {'GTIPNo': '84212100', 'DeliveryTermCode': 'EXW'})
+        self.assertEqual(lines[0]['Taxes'][0]['ReasonCode'], '301')
+        self.assertEqual(lines[2]['KDVTotal'], 0.15)
+        self.assertEqual(invoice['InvoiceInfo']['LineExtensionAmount'], 25.75)
+        self.assertEqual(invoice['InvoiceInfo']['KdvTotal'], 0.95)
+        self.assertEqual(invoice['InvoiceInfo']['PayableAmount'], 26.7)
+        self.assertEqual(self._builder('earchive').to_dict()['InvoiceLines'], lines)
+
+    def test_client_streams_body(self):
+        """Client builder gövdesini parça parça gönderir"""
+        import json
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        sent = []
+
+        class FakeTransport(BaseTransport):
+            def request(self, method, url, json=None, data=None, **kwargs):
+                sent.append((json, data if isinstance(data, bytes) else b''.join(data)))
+                return TransportResponse(200, {}, b'{}')
+
+        client = NilveraClient(api_key="k", transport=FakeTransport())
+        self.assertTrue(client.create_draft_invoice(self._builder(), customer_alias='urn:x')['success'])
+
+        json_body, data = sent[0]
+        self.assertIsNone(json_body)
+        self.assertEqual(json.loads(data)['CustomerAlias'], 'urn:x')
+
+
+class TestRateStore(unittest.TestCase):
+    """Geçmiş kur deposu testleri"""
+
+    def setUp(self):
+        import tempfile, os
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'kurlar.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _fetch(self, fetched):
+        def fetch(date):
+            day = date.strftime('%Y-%m-%d')
+            fetched.append(day)
+            if day == '2024-01-01':
+                return {'success': False, 'status_code': 404, 'rates': {}}
+            if day == '2024-01-04' and fetched.count(day) == 1:
+                return {'success': False, 'error': 'zaman aşımı', 'rates': {}}
+            return {'success': True, 'rates': {'USD': {'ForexBuying': float(date.day)}, 'EUR': {'ForexBuying': 1.0}}}
+        return fetch
+
+    def test_backfill_and_forward_filled_lookup(self):
+        """Tatil ve hafta sonları son yayımlanan iş gününün kurunu döndürür"""
+        from datetime import date
+        from nilvera_client.rate_store import RateStore, backfill
+
+        fetched = []
+        result = backfill(self.path, '2024-01-01', '2024-01-07', currencies=['USD'], fetch=self._fetch(fetched))
+        self.assertFalse(result['success'])
+        self.assertEqual(result['failed'], ['2024-01-04'])
+        self.assertEqual(len(fetched), 5)
+
+        with RateStore(self.path) as store:
+            self.assertEqual(store.currencies(), ['USD'])
+            self.assertIsNone(store.lookup('USD', date(2024, 1, 1)))
+            self.assertEqual(store.lookup('USD', date(2024, 1, 4)), (3.0, date(2024, 1, 3)))
+            rate = store.get_rate('USD', date(2024, 1, 7))
+            self.assertEqual((rate['rate'], rate['date']), (5.0, '2024-01-05'))
+            self.assertFalse(store.get_rate('USD', date(2023, 12, 31))['success'])
+
+        # Yalnızca başarısız gün tekrar indirilir
+        fetch = self._fetch(fetched)
+        del fetched[:]
+        fetched.append('2024-01-04')
+        self.assertTrue(backfill(self.path, '2024-01-01', '2024-01-07', currencies=['USD'],
+                                 fetch=fetch)['success'])
+        self.assertEqual(fetched, ['2024-01-04', '2024-01-04'])
+        with RateStore(self.path) as store:
+            self.assertEqual(store.lookup('USD', date(2024, 1, 4)), (4.0, date(2024, 1, 4)))
+
+    @patch('nilvera_client.currency.requests.get')
+    def test_fetch_daily_rates(self, mock_get):
+        """Günlük tablo tüm para birimleri ve kur tipleriyle okunur"""
+        from datetime import datetime
+
+        mock_get.return_value = Mock(status_code=200, content=b'''<Tarih_Date>
+            <Currency CurrencyCode="USD"><Unit>1</Unit><ForexBuying>34.5</ForexBuying>
+            <ForexSelling>34.6</ForexSelling><BanknoteBuying></BanknoteBuying></Currency>
+            <Currency CurrencyCode="EUR"><ForexBuying>37,1</ForexBuying></Currency>
+        </Tarih_Date>''')
+
+        result = TCMBCurrencyService.fetch_daily_rates(datetime(2024, 1, 2))
+        self.assertTrue(result['success'])
+        self.assertEqual(result['rates'], {
+            'USD': {'ForexBuying': 34.5, 'ForexSelling': 34.6},
+            'EUR': {'ForexBuying': 37.1},
+        })
+
+    @patch('nilvera_client.currency.requests.get')
+    def test_fetch_daily_rates_malformed_rate(self, mock_get):
+        """Bozuk kur değeri hata fırlatmaz, hata sözlüğü döner"""
+        from datetime import datetime
+
+        mock_get.return_value = Mock(status_code=200, content=b'''<Tarih_Date>
+            <Currency CurrencyCode="USD"><ForexBuying>34.5.1</ForexBuying></Currency>
+        </Tarih_Date>''')
+
+        result = TCMBCurrencyService.fetch_daily_rates(datetime(2024, 1, 2))
+        self.assertFalse(result['success'])
+        self.assertIn('Beklenmeyen hata', result['error'])
+
+
+class TestLazyImports(unittest.TestCase):
+    """Gecikmeli import testleri"""
+
+    def _run(self, code):
+        import subprocess, sys, os
+        completed = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        return completed.stdout.split()
+
+    def test_package_import_does_not_load_requests(self):
+        """Paket, istisnalar ve TCMB servisi requests'i yüklemeden kullanılabilmeli"""
+        loaded = self._run(
+            "import sys\n"
+            "import nilvera_client\n"
+            "print('requests' in sys.modules)\n"
+            "from nilvera_client import NilveraAPIError, TCMBCurrencyService\n"
+            "print('requests' in sys.modules)\n"
+            "nilvera_client.NilveraClient\n"
+            "print('requests' in sys.modules)\n"
+        )
+        self.assertEqual(loaded, ['False', 'False', 'True'])
+
+    def test_client_import_does_not_load_sqlite(self):
+        """NilveraClient dedup / önbellek verilmedikçe sqlite3 ve mmap yüklemez"""
+        loaded = self._run(
+            "import sys\n"
+            "from nilvera_client import NilveraClient\n"
+            "NilveraClient(api_key='k')\n"
+            "print('sqlite3' in sys.modules, 'mmap' in sys.modules)\n"
+        )
+        self.assertEqual(loaded, ['False', 'False'])
+
+    def test_lazy_attributes(self):
+        """__all__ içindeki her isim erişilebilir, bilinmeyen isim AttributeError"""
+        import nilvera_client
+        for name in nilvera_client.__all__:
+            self.assertIsNotNone(getattr(nilvera_client, name))
+            self.assertIn(name, dir(nilvera_client))
+        with self.assertRaises(AttributeError):
+            nilvera_client.DoesNotExist
+
+
+class TestResponseCache(unittest.TestCase):
+    """Paylaşılan önbellek testleri"""
+
+    def setUp(self):
+        import tempfile, os
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'cache.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_cache_ttl_and_lru(self):
+        """Süresi dolan ve sınırı aşan kayıtlar düşer"""
+        from nilvera_client.cache import MemoryCache, MISS
+        cache = MemoryCache(max_entries=2)
+        cache.set('a', 1, ttl=60)
+        cache.set('b', 2, ttl=60)
+        cache.get('a')
+        cache.set('c', 3, ttl=60)
+        self.assertIs(cache.get('b'), MISS)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('d', 4, ttl=-1)
+        self.assertIs(cache.get('d'), MISS)
+
+    def test_sqlite_fill_once_across_instances(self):
+        """Aynı dosyayı açan farklı örnekler (process'ler) bir anahtarı bir kez doldurur"""
+        import threading, time
+        from concurrent.futures import ThreadPoolExecutor
+        from nilvera_client.cache import SQLiteCache
+        calls = []
+        lock = threading.Lock()
+
+        def factory():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return {'success': True, 'data': ['EXP']}
+
+        caches = [SQLiteCache(self.path, poll_interval=0.01) for _ in range(6)]
+        try:
+            with ThreadPoolExecutor(max_workers=6) as executor:
+                results = list(executor.map(lambda c: c.get_or_set('series', factory, 60), caches))
+        finally:
+            for cache in caches:
+                cache.close()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == {'success': True, 'data': ['EXP']} for r in results))
+
+    def test_sqlite_failed_fill_releases_lease(self):
+        """Saklanmayan sonuç veya hata sonrası sonraki çağıran kaynağı yeniden dener"""
+        from nilvera_client.cache import SQLiteCache, MISS
+        cache = SQLiteCache(self.path, lease_timeout=60)
+
+        result = cache.get_or_set('k', lambda: {'success': False}, 60,
+                                  cacheable=lambda r: r['success'])
+        self.assertFalse(result['success'])
+        self.assertIs(cache.get('k'), MISS)
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_set('k', Mock(side_effect=RuntimeError('hata')), 60)
+        self.assertEqual(cache.get_or_set('k', lambda: 'ok', 60), 'ok')
+        self.assertEqual(cache.get('k'), 'ok')
+        cache.close()
+
+    def test_sqlite_size_limit(self):
+        """Boyut sınırı aşılınca en eski kayıtlar silinir"""
+        from nilvera_client.cache import SQLiteCache, MISS
+        cache = SQLiteCache(self.path, max_bytes=250)
+        for i in range(5):
+            cache.set(f'k{i}', 'x' * 100, ttl=60)
+        self.assertIs(cache.get('k0'), MISS)
+        self.assertEqual(cache.get('k4'), 'x' * 100)
+        self.assertEqual(len(cache), 2)
+        cache.close()
+
+    def test_sqlite_running_size_total(self):
+        """Toplam boyut yazma, değiştirme ve silmelerde güncel tutulur"""
+        from nilvera_client.cache import SQLiteCache
+        cache = SQLiteCache(self.path, max_bytes=1000)
+        cache.set('a', 'x' * 100, ttl=60)
+        cache.set('b', 'x' * 50, ttl=60)
+        cache.set('a', 'x' * 10, ttl=60)
+        cache.delete('b')
+        cache.set('c', 'x' * 20, ttl=-1)
+        conn = cache._connection()
+        total = conn.execute('SELECT total FROM cache_size').fetchone()[0]
+        self.assertEqual(total, conn.execute('SELECT SUM(size) FROM cache').fetchone()[0])
+        cache.clear()
+        self.assertEqual(conn.execute('SELECT total FROM cache_size').fetchone()[0], 0)
+        cache.close()
+
+    def test_sqlite_connection_per_process(self):
+        """fork sonrası çocuk process kendi bağlantısını açar"""
+        import os
+        from nilvera_client.cache import SQLiteCache
+        if not hasattr(os, 'fork'):
+            self.skipTest('fork gerekli')
+        cache = SQLiteCache(self.path)
+        cache.set('parent', 1, ttl=60)
+        parent_conn = cache._connection()
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ok = cache.get('parent') == 1 and cache._connection() is not parent_conn
+                cache.get_or_set('child', lambda: 2, 60)
+            except BaseException:
+                ok = False
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(status, 0)
+        self.assertEqual(cache.get('child'), 2)
+        self.assertIs(cache._connection(), parent_conn)
+        cache.close()
+
+    def test_client_series_cached(self):
+        """Seri listesi ve mükellef sorgusu önbellekten okunur; hesaplar ayrılır"""
+        from nilvera_client.cache import SQLiteCache
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class CountingTransport(BaseTransport):
+            def __init__(self):
+                self.calls = []
+
+            def request(self, method, url, **kwargs):
+                self.calls.append(url)
+                return TransportResponse(200, {'Content-Type': 'application/json'}, b'[{"Name": "EXP"}]')
+
+        cache = SQLiteCache(self.path)
+        transport = CountingTransport()
+        worker_a = NilveraClient(api_key="k", transport=transport, cache=cache)
+        worker_b = NilveraClient(api_key="k", transport=transport, cache=cache)
+        other = NilveraClient(api_key="baska", transport=transport, cache=cache)
+
+        self.assertEqual(worker_a.get_einvoice_series()['data'], [{'Name': 'EXP'}])
+        self.assertEqual(worker_b.get_einvoice_series()['data'], [{'Name': 'EXP'}])
+        worker_b.check_taxpayer_status('1234567890')
+        worker_a.check_taxpayer_status('1234567890')
+        other.get_einvoice_series()
+
+        self.assertEqual(len(transport.calls), 3)
+        cache.close()
+
+    @patch('nilvera_client.currency.requests.get')
+    def test_tcmb_daily_table_cached(self, mock_get):
+        """Önbellek açıkken günün tablosu bir kez çekilir, tüm para birimlerine hizmet eder"""
+        from datetime import datetime
+        from nilvera_client.cache import MemoryCache
+        mock_get.return_value = Mock(status_code=200, content=b'''<Tarih_Date>
+            <Currency CurrencyCode="USD"><ForexBuying>34.5</ForexBuying></Currency>
+            <Currency CurrencyCode="EUR"><ForexBuying>37.1</ForexBuying></Currency>
+        </Tarih_Date>''')
+
+        TCMBCurrencyService.cache = MemoryCache()
+        try:
+            usd = TCMBCurrencyService.get_exchange_rate('USD', datetime(2024, 1, 2))
+            eur = TCMBCurrencyService.get_exchange_rate('EUR', datetime(2024, 1, 2))
+            gbp = TCMBCurrencyService._fetch_rate_for_date('GBP', datetime(2024, 1, 2), 'ForexBuying')
+        finally:
+            TCMBCurrencyService.cache = None
+
+        self.assertEqual(usd['rate'], 34.5)
+        self.assertEqual(eur['rate'], 37.1)
+        self.assertEqual(gbp['error'], 'GBP bulunamadı')
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestDocumentCache(unittest.TestCase):
+    """Doküman önbelleği testleri"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _transport(self):
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class DocumentTransport(BaseTransport):
+            def __init__(self):
+                self.calls = []
+
+            def request(self, method, url, **kwargs):
+                self.calls.append(url)
+                return TransportResponse(200, {'Content-Type': 'application/pdf'}, b'%PDF-1.4 ayni icerik')
+
+        return DocumentTransport()
+
+    def test_sale_documents_served_from_disk(self):
+        """Kesilmiş fatura dokümanı bir kez indirilir, sonrası diskten okunur"""
+        from nilvera_client.document_cache import DocumentCache
+        cache = DocumentCache(self.tmp.name)
+        transport = self._transport()
+        client = NilveraClient(api_key="k", transport=transport, document_cache=cache)
+
+        first = client.get_invoice_pdf('ABC-1')
+        second = client.get_invoice_pdf('abc-1')
+
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(second['data'], first['data'])
+        self.assertTrue(second['cached'])
+        with client.open_invoice_document('ABC-1').mmap() as view:
+            self.assertEqual(view[:4], b'%PDF')
+        cache.close()
+
+    def test_drafts_never_cached(self):
+        """Taslak dokümanlar her seferinde indirilir ve saklanmaz"""
+        from nilvera_client.document_cache import DocumentCache
+        cache = DocumentCache(self.tmp.name)
+        transport = self._transport()
+        client = NilveraClient(api_key="k", transport=transport, document_cache=cache)
+
+        client.get_invoice_pdf('abc-1', is_draft=True)
+        client.get_invoice_pdf('abc-1', is_draft=True)
+
+        self.assertEqual(len(transport.calls), 2)
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+    def test_accounts_and_environments_isolated(self):
+        """Başka hesabın veya ortamın aynı UUID'li dokümanı önbellekten okunmaz"""
+        from nilvera_client.document_cache import DocumentCache
+        cache = DocumentCache(self.tmp.name)
+        transport = self._transport()
+
+        NilveraClient(api_key="k1", transport=transport, document_cache=cache).get_invoice_pdf('abc-1')
+        other = NilveraClient(api_key="k2", transport=transport, document_cache=cache).get_invoice_pdf('abc-1')
+        live = NilveraClient(api_key="k1", environment='production', transport=transport,
+                             document_cache=cache).get_invoice_pdf('abc-1')
+
+        self.assertEqual(len(transport.calls), 3)
+        self.assertNotIn('cached', other)
+        self.assertNotIn('cached', live)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.total_bytes, len(b'%PDF-1.4 ayni icerik'))
+        cache.close()
+
+    def test_content_dedup_and_lru_eviction(self):
+        """Aynı içerik bir kez saklanır; sınır aşılınca en eski okunan silinir"""
+        import time
+        from nilvera_client.document_cache import DocumentCache
+        cache = DocumentCache(self.tmp.name, max_bytes=250)
+
+        cache.put('a', 'pdf', b'x' * 100)
+        cache.put('b', 'pdf', b'x' * 100)
+        self.assertEqual(cache.total_bytes, 100)
+
+        cache.put('c', 'pdf', b'y' * 100)
+        time.sleep(0.01)
+        cache.get('a', 'pdf')
+        cache.put('d', 'pdf', b'z' * 100)
+
+        self.assertIsNone(cache.get('c', 'pdf'))
+        self.assertEqual(cache.get('b', 'pdf').read(), b'x' * 100)
+        self.assertEqual(cache.get('d', 'pdf').read(), b'z' * 100)
+        self.assertEqual(cache.total_bytes, 200)
+        cache.close()
+
+
+class TestWebhooks(unittest.TestCase):
+    """Durum bildirimi alıcısı testleri"""
+
+    SECRET = 'gizli'
+
+    def _wsgi(self, receiver, body, signature=None, method='POST', path='/nilvera/webhook'):
+        import io
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }
+        if signature is not None:
+            environ['HTTP_X_NILVERA_SIGNATURE'] = signature
+        statuses = []
+        receiver(environ, lambda status, headers: statuses.append(status))
+        return int(statuses[0].split()[0])
+
+    def test_wsgi_verifies_and_dispatches(self):
+        """İmzalı callback'ler dağıtılır, imzasız olanlar reddedilir"""
+        from nilvera_client.webhooks import StatusTracker, WebhookReceiver, sign_payload
+        tracker = StatusTracker()
+        events = []
+        tracker.on(events.append)
+        receiver = WebhookReceiver(tracker, secret=self.SECRET)
+        body = b'[{"UUID": "ABC-1", "StatusCode": "Accepted"}, {"UUID": "abc-2", "Status": "Sent"}]'
+
+        self.assertEqual(self._wsgi(receiver, body), 401)
+        self.assertEqual(self._wsgi(receiver, body, 'sha256=' + '0' * 64), 401)
+        self.assertEqual(self._wsgi(receiver, body, 'sha256=' + sign_payload(body, self.SECRET)), 204)
+        self.assertEqual(self._wsgi(receiver, body, sign_payload(body, self.SECRET), method='GET'), 405)
+
+        self.assertEqual([(e.uuid, e.status) for e in events], [('abc-1', 'Accepted'), ('abc-2', 'Sent')])
+        self.assertEqual(tracker.get('ABC-1')['status'], 'Accepted')
+
+        # Aynı durum tekrar gelirse handler çağrılmaz
+        self._wsgi(receiver, body, sign_payload(body, self.SECRET))
+        self.assertEqual(len(events), 2)
+
+    def test_only_silent_uuids_polled(self):
+        """Bildirim gelen UUID yoklanmaz, sessiz kalan yoklanır"""
+        from nilvera_client.webhooks import StatusTracker, StatusEvent
+        client = Mock()
+        client.get_invoice_status.return_value = {'success': True, 'data': {'StatusCode': 'Rejected'}}
+        tracker = StatusTracker(client, silence_timeout=0, final_statuses={'Accepted', 'Rejected'})
+        tracker.watch('loud')
+        tracker.watch('silent')
+
+        tracker.dispatch(StatusEvent.from_payload({'UUID': 'loud', 'Status': 'Accepted'}))
+        self.assertEqual(tracker.poll_silent(), 1)
+
+        client.get_invoice_status.assert_called_once_with('silent')
+        self.assertEqual(tracker.get('silent'), {
+            'status': 'Rejected', 'source': 'poll', 'updated_at': tracker.get('silent')['updated_at']
+        })
+        self.assertEqual(tracker.watched, [])
+
+    def test_final_statuses_bound_memory(self):
+        """Varsayılan son durumlar izlemeyi bitirir; etkin tablo büyümez"""
+        from nilvera_client.webhooks import StatusTracker, StatusEvent
+        tracker = StatusTracker(max_final=2)
+        events = []
+        tracker.on(events.append)
+        for i in range(5):
+            tracker.watch(f'u{i}')
+            tracker.dispatch(StatusEvent(f'u{i}', 'waiting', 'webhook', {}))
+            tracker.dispatch(StatusEvent(f'u{i}', 'Succeed', 'webhook', {}))
+
+        self.assertEqual(tracker.watched, [])
+        self.assertEqual(tracker._states, {})
+        self.assertEqual(list(tracker._final), ['u3', 'u4'])
+        self.assertEqual(tracker.get('u4')['status'], 'Succeed')
+        self.assertIsNone(tracker.get('u0'))
+
+        # Tekrar gelen son durum bildirimi handler'ları yeniden çağırmaz
+        self.assertFalse(tracker.dispatch(StatusEvent('u4', 'Succeed', 'webhook', {})))
+        self.assertEqual(len(events), 10)
+
+        with self.assertRaises(ValueError):
+            StatusTracker(final_statuses=())
+
+    def test_unsigned_receiver_requires_opt_out(self):
+        """secret olmadan alıcı yalnızca açık verify=False ile oluşturulur"""
+        from nilvera_client.webhooks import StatusTracker, WebhookReceiver
+        tracker = StatusTracker()
+        with self.assertRaises(ValueError):
+            WebhookReceiver(tracker)
+        with self.assertLogs('nilvera_client.webhooks', 'WARNING'):
+            receiver = WebhookReceiver(tracker, verify=False)
+        self.assertEqual(receiver.handle('POST', '/nilvera/webhook', {}, b'{"UUID": "x", "Status": "Error"}')[0], 204)
+
+    def test_late_event_after_final_ignored(self):
+        """Son durumdan sonra gelen ara durum durumu geri almaz, handler çağrılmaz"""
+        from nilvera_client.webhooks import StatusTracker, StatusEvent
+        tracker = StatusTracker()
+        events = []
+        succeeded = []
+        tracker.on(events.append)
+        tracker.on(succeeded.append, status='SUCCEED')
+
+        tracker.dispatch(StatusEvent('u1', 'Succeed', 'webhook', {}))
+        self.assertFalse(tracker.dispatch(StatusEvent('u1', 'Processing', 'webhook', {})))
+        self.assertEqual(tracker.get('u1')['status'], 'Succeed')
+        self.assertEqual(len(events), 1)
+        self.assertEqual(len(succeeded), 1)
+
+        # Son durumdan başka bir son duruma geçiş kabul edilir
+        self.assertTrue(tracker.dispatch(StatusEvent('u1', 'Accepted', 'webhook', {})))
+        self.assertEqual(tracker.get('u1')['status'], 'Accepted')
+
+    def test_asyncio_server(self):
+        """Bağımsız asyncio sunucusu aynı doğrulama ve dağıtımı yapar"""
+        import asyncio
+        from nilvera_client.webhooks import StatusTracker, WebhookReceiver, sign_payload
+        tracker = StatusTracker()
+        receiver = WebhookReceiver(tracker, secret=self.SECRET)
+        body = b'{"UUID": "abc-3", "StatusCode": "Accepted"}'
+
+        async def scenario():
+            server = await receiver.start_server('127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(
+                b'POST /nilvera/webhook HTTP/1.1\r\nHost: x\r\nConnection: close\r\n'
+                b'X-Nilvera-Signature: ' + sign_payload(body, self.SECRET).encode() +
+                b'\r\nContent-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+            )
+            response = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return response
+
+        response = asyncio.run(scenario())
+        self.assertTrue(response.startswith(b'HTTP/1.1 204'))
+        self.assertEqual(tracker.get('abc-3')['status'], 'Accepted')
+
+
+class TestCommandLine(unittest.TestCase):
+    """python -m nilvera_client komut satırı testleri"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, name):
+        import os
+        return os.path.join(self.tmp.name, name)
+
+    def _results(self, path):
+        import json
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_csv_rows_grouped_into_invoices(self):
+        """Art arda aynı UUID'li satırlar tek faturanın kalemleri olur"""
+        import io
+        from nilvera_client.cli import iter_csv_invoices
+        stream = io.StringIO(
+            'InvoiceInfo.UUID,CompanyInfo.TaxNumber,Line.Name,Line.Quantity,Line.DeliveryInfo.GTIPNo\n'
+            'u1,0123456789,Kalem A,2,8471\n'
+            'u1,,Kalem B,1.5,\n'
+            'u2,0123456789,Kalem C,3,\n'
+        )
+        invoices = list(iter_csv_invoices(stream))
+
+        self.assertEqual(len(invoices), 2)
+        self.assertEqual(invoices[0]['CompanyInfo'], {'TaxNumber': '0123456789'})
+        self.assertEqual(invoices[0]['InvoiceLines'], [
+            {'Name': 'Kalem A', 'Quantity': 2.0, 'DeliveryInfo': {'GTIPNo': '8471'}, 'Index': '1'},
+            {'Name': 'Kalem B', 'Quantity': 1.5, 'Index': '2'},
+        ])
+        self.assertEqual(invoices[1]['InvoiceInfo']['UUID'], 'u2')
+
+    def test_send_export_and_sync_against_stub(self):
+        """send / export / sync-incoming sahte sunucuya karşı JSONL üretir"""
+        import json, os
+        from benchmarks import StubServer, StubConfig
+        from nilvera_client.cli import main
+
+        with open(self._path('faturalar.jsonl'), 'w', encoding='utf-8') as f:
+            for i in range(5):
+                f.write(json.dumps({'InvoiceInfo': {'UUID': f'00000000-0000-0000-0000-00000000000{i}'},
+                                    'InvoiceLines': []}) + '\n')
+
+        with StubServer(StubConfig(page_total=25)) as server:
+            common = ['--api-key', 'k', '--url', server.url, '--quiet', '--concurrency', '3']
+            send_code = main(['send', self._path('faturalar.jsonl'), '--confirm',
+                              '-o', self._path('send.jsonl')] + common)
+
+            with open(self._path('uuids.txt'), 'w') as f:
+                f.write('abc\n\n{"uuid": "def"}\n')
+            export_code = main(['export', self._path('uuids.txt'), '--dir', self._path('pdf'),
+                                '-o', self._path('export.jsonl')] + common)
+
+            sync_code = main(['sync-incoming', '--page-size', '10',
+                              '-o', self._path('incoming.jsonl')] + common)
+
+        self.assertEqual((send_code, export_code, sync_code), (0, 0, 0))
+        sent = self._results(self._path('send.jsonl'))
+        self.assertEqual([r['uuid'][-1] for r in sent], ['0', '1', '2', '3', '4'])
+        self.assertTrue(all(r['success'] and r['confirmed'] for r in sent))
+
+        exported = self._results(self._path('export.jsonl'))
+        self.assertEqual([r['uuid'] for r in exported], ['abc', 'def'])
+        with open(os.path.join(self._path('pdf'), 'def.pdf'), 'rb') as f:
+            self.assertTrue(f.read().startswith(b'%PDF'))
+
+        self.assertEqual(len(self._results(self._path('incoming.jsonl'))), 25)
+
+    def test_failures_reported_with_exit_code(self):
+        """Hatalı kayıtlar JSONL'e yazılır ve çıkış kodu 1 olur"""
+        from nilvera_client.cli import run_stream
+        import io
+
+        def operation(item):
+            if item == 2:
+                raise RuntimeError('bozuk')
+            return {'item': item, 'success': True}
+
+        output = io.StringIO()
+        summary = run_stream(iter(range(5)), operation, output, concurrency=2)
+
+        self.assertEqual(summary['processed'], 5)
+        self.assertEqual(summary['failed'], 1)
+        self.assertIn('"error": "bozuk"', output.getvalue().splitlines()[2])
+
+
+    def test_send_records_invalid_lines(self):
+        """JSON olmayan satır hata kaydı olarak yazılır, gönderim sürer"""
+        import json
+        from benchmarks import StubServer, StubConfig
+        from nilvera_client.cli import main
+
+        with open(self._path('faturalar.jsonl'), 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'InvoiceInfo': {'UUID': 'u1'}, 'InvoiceLines': []}) + '\n')
+            f.write('{"InvoiceInfo": \n')
+            f.write(json.dumps({'InvoiceInfo': {'UUID': 'u3'}, 'InvoiceLines': []}) + '\n')
+
+        with StubServer(StubConfig()) as server:
+            code = main(['send', self._path('faturalar.jsonl'), '--api-key', 'k', '--url', server.url,
+                         '--quiet', '--concurrency', '1', '-o', self._path('send.jsonl')])
+
+        sent = self._results(self._path('send.jsonl'))
+        self.assertEqual(code, 1)
+        self.assertEqual([r['success'] for r in sent], [True, False, True])
+        self.assertIn('2. satır JSON değil', sent[1]['error'])
+        self.assertEqual(sent[2]['uuid'], 'u3')
+
+    def test_input_errors_return_exit_code(self):
+        """Okunamayan girdi traceback yerine 'Hata:' mesajı ve çıkış kodu 1 verir"""
+        import io
+        from contextlib import redirect_stderr
+        from nilvera_client.cli import main
+
+        with open(self._path('defter.jsonl'), 'w', encoding='utf-8') as f:
+            f.write('bozuk\n')
+
+        for argv in (['poll', self._path('yok.txt')], ['reconcile', self._path('defter.jsonl')]):
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                code = main(argv + ['--api-key', 'k', '--url', 'http://127.0.0.1:9', '--quiet'])
+            self.assertEqual(code, 1)
+            self.assertTrue(stderr.getvalue().startswith('Hata: '))
+
+class TestJSONStream(unittest.TestCase):
+    """Artımlı JSON ayrıştırma testleri"""
+
+    def test_items_and_meta_across_chunk_boundaries(self):
+        """Parça sınırına denk gelen kaçışlar, anahtarlar ve öğeler doğru çözülür"""
+        import json
+        from nilvera_client.jsonstream import JSONArrayStream
+        items = [{'UUID': 'a', 'Name': 'x, "y" ]}'}, [1, {'b': None}], 'ş\\', 3.5, {}]
+        body = json.dumps({'Page': 1, 'Meta': {'Content': []}, 'Content': items,
+                           'TotalPages': 4}).encode('utf-8')
+
+        for size in (1, 2, 7, len(body)):
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+            stream = JSONArrayStream(chunks, path=('Content',))
+            self.assertEqual(list(stream), items)
+            self.assertEqual(stream.meta, {'Page': 1, 'TotalPages': 4})
+
+        self.assertEqual(list(JSONArrayStream([b'[1, 2', b', 3]'])), [1, 2, 3])
+        with self.assertRaises(ValueError):
+            list(JSONArrayStream([b'[1, {"a": 2']))
+
+    def test_iter_incoming_invoices_pages(self):
+        """Tüm sayfalar akış olarak okunur (requests ve urllib3 transport)"""
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig(page_total=25)) as server:
+            for transport in ('requests', 'urllib3'):
+                client = NilveraClient(api_key="k", test_url=server.url, transport=transport)
+                uuids = [inv['UUID'] for inv in client.iter_incoming_invoices(page_size=10)]
+                self.assertEqual(len(uuids), 25)
+                self.assertEqual(len(set(uuids)), 25)
+                client.close()
+
+    def test_capped_page_size_follows_total_pages(self):
+        """Sunucu PageSize'ı küçültse de TotalPages'a kadar tüm sayfalar okunur"""
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig(page_total=25, max_page_size=10)) as server:
+            client = NilveraClient(api_key="k", test_url=server.url)
+            incoming = [inv['UUID'] for inv in client.iter_incoming_invoices(page_size=500)]
+            sales = [inv['UUID'] for inv in client.iter_sale_invoices(page_size=500, prefetch=1)]
+            client.close()
+
+        self.assertEqual(len(set(incoming)), 25)
+        self.assertEqual(len(set(sales)), 25)
+
+    def test_stream_peak_memory_independent_of_page(self):
+        """Akış modunda tepe bellek sayfanın tamamını çözmekten belirgin düşük"""
+        import json, tracemalloc
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        content = [{'UUID': f'{i:032x}', 'InvoiceNumber': f'ABC2026{i:09d}',
+                    'SenderTitle': f'Tedarikci {i % 50}', 'PayableAmount': i * 1.5} for i in range(5000)]
+        body = json.dumps({'Page': 1, 'TotalPages': 1, 'Content': content}).encode('utf-8')
+        del content
+
+        class PageTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(200, {'Content-Type': 'application/json'}, body)
+
+        client = NilveraClient(api_key="k", transport=PageTransport())
+
+        tracemalloc.start()
+        page = client.get_incoming_invoices(page=1, page_size=5000)
+        _, buffered_peak = tracemalloc.get_traced_memory()
+        del page
+        tracemalloc.reset_peak()
+        count = sum(1 for _ in client.iter_incoming_invoices(page_size=5000))
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(count, 5000)
+        self.assertLess(streamed_peak * 10, buffered_peak)
+
+    def test_stream_error_status_raises(self):
+        """Hatalı yanıt NilveraAPIError olarak fırlatılır"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class FailingTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(401, {'Content-Type': 'application/json'}, b'{"Message": "yetkisiz"}')
+
+        client = NilveraClient(api_key="k", transport=FailingTransport())
+        with self.assertRaises(NilveraAPIError) as ctx:
+            list(client.iter_incoming_invoices())
+        self.assertEqual(ctx.exception.status_code, 401)
+
+
+    def test_stream_malformed_body_raises_api_error(self):
+        """Bozuk / yarım gövde ve beklenen dizinin olmaması NilveraAPIError olur"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class BodyTransport(BaseTransport):
+            def __init__(self, body):
+                self.body = body
+
+            def request(self, method, url, **kwargs):
+                return TransportResponse(200, {'Content-Type': 'application/json'}, self.body)
+
+        for body in (b'{"Content": [{"UUID": "a"}, {"UUID": ', b'{"Content": [1 2]}', b'{"Message": "bakim"}'):
+            client = NilveraClient(api_key="k", transport=BodyTransport(body))
+            with self.assertRaises(NilveraAPIError) as ctx:
+                list(client.iter_incoming_invoices())
+            self.assertEqual(ctx.exception.status_code, 200)
+
+class TestReconciliation(unittest.TestCase):
+    """Giden fatura listesi ve mutabakat testleri"""
+
+    def test_reconciler_classifies_in_one_pass(self):
+        """Eksik, fazla, farklı ve mükerrer kayıtlar ayrılır"""
+        from nilvera_client.reconcile import Reconciler
+
+        ledger = [
+            {'UUID': 'AAA', 'InvoiceNumber': 'EXP1', 'PayableAmount': '100.00'},
+            {'UUID': 'bbb', 'InvoiceNumber': 'EXP2', 'PayableAmount': 50},
+            {'InvoiceNumber': 'exp3', 'PayableAmount': 10},
+            {'UUID': 'ddd', 'InvoiceNumber': 'EXP4', 'PayableAmount': 5},
+            {'UUID': 'aaa', 'InvoiceNumber': 'EXP1', 'PayableAmount': 100},
+        ]
+        remote = [
+            {'UUID': 'aaa', 'InvoiceNumber': 'EXP1', 'PayableAmount': 100.004},
+            {'UUID': 'bbb', 'InvoiceNumber': 'EXP2', 'PayableAmount': 55},
+            {'UUID': 'ccc', 'InvoiceNumber': 'EXP3', 'PayableAmount': 10},
+            {'UUID': 'eee', 'InvoiceNumber': 'EXP5', 'PayableAmount': 1},
+            {'UUID': 'aaa', 'InvoiceNumber': 'EXP1', 'PayableAmount': 100},
+        ]
+        report = Reconciler(ledger).feed_all(remote).report()
+
+        self.assertEqual(report.matched, 2)
+        self.assertEqual([r['UUID'] for r in report.missing], ['ddd'])
+        self.assertEqual([r['UUID'] for r in report.extra], ['eee'])
+        self.assertEqual(len(report.mismatched), 1)
+        self.assertEqual(report.mismatched[0].key, 'bbb')
+        self.assertEqual(report.mismatched[0].differences, {'PayableAmount': (50, 55)})
+        self.assertEqual(sorted(d['side'] for d in report.duplicates), ['ledger', 'remote'])
+        self.assertFalse(report.success)
+
+        # Alan adları farklı defter field_map ile okunur
+        mapped = Reconciler([{'fatura_no': 'exp3', 'tutar': '10'}],
+                            field_map={'InvoiceNumber': 'fatura_no', 'PayableAmount': 'tutar'})
+        self.assertEqual(mapped.feed({'UUID': 'ccc', 'InvoiceNumber': 'EXP3', 'PayableAmount': 10}), 'matched')
+        self.assertTrue(mapped.report().success)
+
+    def test_sale_listing_prefetch_and_reconcile(self):
+        """Giden faturalar önden okunarak listelenir, mutabakat yalnızca liste sayfalarıyla yapılır"""
+        from benchmarks import StubServer, StubConfig
+
+        with StubServer(StubConfig(page_total=95)) as server:
+            client = NilveraClient(api_key="k", test_url=server.url)
+            invoices = list(client.iter_sale_invoices(page_size=20, prefetch=2))
+            self.assertEqual(len(invoices), 95)
+            self.assertEqual(invoices[0]['InvoiceNumber'], 'EXP2026000000000')
+
+            # Erken bırakılan üreteç arka plandaki okumayı durdurur
+            partial = client.iter_sale_invoices(page_size=10, prefetch=1)
+            self.assertEqual(len([inv for _, inv in zip(range(3), partial)]), 3)
+            partial.close()
+
+            ledger = [{'UUID': inv['UUID'], 'InvoiceNumber': inv['InvoiceNumber'],
+                       'PayableAmount': inv['PayableAmount']} for inv in invoices[:90]]
+            ledger[5]['PayableAmount'] += 1
+            ledger.append({'UUID': 'yok', 'InvoiceNumber': 'X1', 'PayableAmount': 1})
+
+            report = client.reconcile_sales(ledger, page_size=50)
+            client.close()
+
+        self.assertEqual(report.matched, 89)
+        self.assertEqual(len(report.mismatched), 1)
+        self.assertEqual([r['UUID'] for r in report.missing], ['yok'])
+        self.assertEqual(len(report.extra), 5)
+
+    def test_prefetch_propagates_errors(self):
+        """Arka planda alınan hata tüketicide fırlatılır"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        class FailingTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(500, {'Content-Type': 'application/json'}, b'{"Message": "hata"}')
+
+        client = NilveraClient(api_key="k", transport=FailingTransport())
+        with self.assertRaises(NilveraAPIError):
+            list(client.iter_sale_invoices(prefetch=2))
+
+    def test_prefetch_keeps_priority(self):
+        """Önden okuyan thread'in sayfa istekleri çağıranın öncelik sınıfıyla planlanır"""
+        import json
+        from nilvera_client import PriorityScheduler
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        body = json.dumps({'TotalPages': 1, 'Content': [{'UUID': 'a'}]}).encode()
+
+        class PageTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                return TransportResponse(200, {'Content-Type': 'application/json'}, body)
+
+        levels = []
+
+        class RecordingScheduler(PriorityScheduler):
+            def acquire(self, level=None, timeout=None):
+                level = super().acquire(level, timeout)
+                levels.append(level)
+                return level
+
+        client = NilveraClient(api_key="k", transport=PageTransport(), scheduler=RecordingScheduler())
+        with client.priority('bulk'):
+            invoices = client.iter_sale_invoices(prefetch=2)
+        self.assertEqual([inv['UUID'] for inv in invoices], ['a'])
+        self.assertEqual(levels, ['bulk'])
+
+    def test_cli_reconcile_writes_differences(self):
+        """reconcile komutu yalnızca farkları JSONL olarak yazar"""
+        import csv, json, os, tempfile
+        from benchmarks import StubServer, StubConfig
+        from nilvera_client.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ledger_path = os.path.join(tmp, 'defter.csv')
+            with open(ledger_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['fatura_no', 'tutar'])
+                writer.writerow(['EXP2026000000000', '0'])
+                writer.writerow(['EXP2026000000001', '2.50'])
+                writer.writerow(['EXP2026000000002', '9'])
+            out_path = os.path.join(tmp, 'farklar.jsonl')
+
+            with StubServer(StubConfig(page_total=3)) as server:
+                code = main(['reconcile', ledger_path, '--api-key', 'k', '--url', server.url, '--quiet',
+                             '--field-map', 'InvoiceNumber=fatura_no', '--field-map', 'PayableAmount=tutar',
+                             '-o', out_path])
+
+            with open(out_path, encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(code, 1)
+        self.assertEqual([r['type'] for r in records], ['mismatched'])
+        self.assertEqual(records[0]['differences'], {'PayableAmount': ['9', 5.0]})
+
+
+class TestUBLExtraction(unittest.TestCase):
+    """UBL XML alan çıkarma testleri"""
+
+    XSLT = (b'<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform" '
+            b'xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">'
+            b'<xsl:template match="/"><html><body><h1><xsl:value-of select="//cbc:ID[1]"/></h1>'
+            b'</body></html></xsl:template></xsl:stylesheet>')
+
+    @classmethod
+    def _invoice_xml(cls, number: str, lines=((1, 'Kumaş', 10, 25.5),), xslt: bytes = None) -> bytes:
+        """Gömülü XSLT eki olan küçük bir UBL-TR faturası"""
+        import base64
+        xslt = cls.XSLT if xslt is None else xslt
+        line_xml = ''.join(
+            f'<cac:InvoiceLine><cbc:ID>{i}</cbc:ID>'
+            f'<cbc:InvoicedQuantity unitCode="MTR">{qty}</cbc:InvoicedQuantity>'
+            f'<cbc:LineExtensionAmount currencyID="USD">{qty * price:.2f}</cbc:LineExtensionAmount>'
+            f'<cac:Item><cbc:Name>{name}</cbc:Name></cac:Item>'
+            f'<cac:Price><cbc:PriceAmount currencyID="USD">{price}</cbc:PriceAmount></cac:Price>'
+            f'</cac:InvoiceLine>'
+            for i, name, qty, price in lines
+        )
+        total = sum(qty * price for _, _, qty, price in lines)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Invoice xmlns="urn:oasis:names:specification:ubl:schema:xsd:Invoice-2" '
+            'xmlns:cac="urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2" '
+            'xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">'
+            '<cbc:ProfileID>IHRACAT</cbc:ProfileID>'
+            f'<cbc:ID>{number}</cbc:ID>'
+            f'<cbc:UUID>uuid-{number}</cbc:UUID>'
+            '<cbc:IssueDate>2026-03-01</cbc:IssueDate>'
+            '<cbc:InvoiceTypeCode>ISTISNA</cbc:InvoiceTypeCode>'
+            '<cbc:DocumentCurrencyCode>USD</cbc:DocumentCurrencyCode>'
+            '<cac:AdditionalDocumentReference><cbc:ID>XSLT</cbc:ID><cac:Attachment>'
+            '<cbc:EmbeddedDocumentBinaryObject mimeCode="application/xml" filename="sablon.xslt">'
+            f'{base64.b64encode(xslt).decode()}'
+            '</cbc:EmbeddedDocumentBinaryObject></cac:Attachment></cac:AdditionalDocumentReference>'
+            '<cac:AccountingSupplierParty><cac:Party>'
+            '<cac:PartyIdentification><cbc:ID schemeID="MERSISNO">0123</cbc:ID></cac:PartyIdentification>'
+            '<cac:PartyIdentification><cbc:ID schemeID="VKN">1234567890</cbc:ID></cac:PartyIdentification>'
+            '<cac:PartyName><cbc:Name>İhracatçı A.Ş.</cbc:Name></cac:PartyName>'
+            '</cac:Party></cac:AccountingSupplierParty>'
+            '<cac:AccountingCustomerParty><cac:Party>'
+            '<cac:PartyIdentification><cbc:ID schemeID="VKN">1460415308</cbc:ID></cac:PartyIdentification>'
+            '<cac:PartyName><cbc:Name>Gümrük ve Ticaret Bakanlığı</cbc:Name></cac:PartyName>'
+            '</cac:Party></cac:AccountingCustomerParty>'
+            '<cac:TaxTotal><cbc:TaxAmount currencyID="USD">0</cbc:TaxAmount></cac:TaxTotal>'
+            '<cac:LegalMonetaryTotal>'
+            f'<cbc:LineExtensionAmount currencyID="USD">{total:.2f}</cbc:LineExtensionAmount>'
+            f'<cbc:PayableAmount currencyID="USD">{total:.2f}</cbc:PayableAmount>'
+            '</cac:LegalMonetaryTotal>'
+            f'{line_xml}</Invoice>'
+        ).encode('utf-8')
+
+    def test_extract_header_and_lines(self):
+        """Başlık alanları, öznitelik filtreleri ve kalemler çıkarılır"""
+        from nilvera_client.ubl import extract_fields, DEFAULT_LINE_FIELDS
+
+        xml = self._invoice_xml('EXP2026000000001', lines=((1, 'Kumaş', 10, 25.5), (2, 'İplik', 4, 2.0)))
+        [row] = extract_fields(xml)
+        self.assertEqual(row['UUID'], 'uuid-EXP2026000000001')
+        self.assertEqual(row['InvoiceNumber'], 'EXP2026000000001')
+        self.assertEqual(row['SupplierTaxNumber'], '1234567890')
+        self.assertEqual(row['CustomerName'], 'Gümrük ve Ticaret Bakanlığı')
+        self.assertEqual(row['PayableAmount'], 263.0)
+        self.assertNotIn('TaxExclusiveAmount', row)
+
+        rows = extract_fields(xml, fields={'InvoiceNumber': 'cbc:ID'}, line_fields=DEFAULT_LINE_FIELDS)
+        self.assertEqual([(r['LineID'], r['ItemName'], r['Quantity'], r['UnitCode']) for r in rows],
+                         [('1', 'Kumaş', 10.0, 'MTR'), ('2', 'İplik', 4.0, 'MTR')])
+        self.assertTrue(all(r['InvoiceNumber'] == 'EXP2026000000001' for r in rows))
+
+    def test_parallel_csv_keeps_order_and_reports_errors(self):
+        """Process havuzu sonuçları girdi sırasıyla yazar, bozuk belge işi durdurmaz"""
+        import csv, io, os, tempfile
+        from nilvera_client.ubl import UBLExtractor, iter_xml_files
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(12):
+                with open(os.path.join(tmp, f'{i:03d}.xml'), 'wb') as f:
+                    f.write(self._invoice_xml(f'EXP{i:013d}') if i != 5 else b'<Invoice><bozuk')
+
+            output = io.StringIO()
+            summary = UBLExtractor(fields={'InvoiceNumber': 'ID', 'PayableAmount': 'LegalMonetaryTotal/PayableAmount'},
+                                   workers=2, batch_size=3).to_csv(iter_xml_files(tmp), output)
+
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(summary['rows'], 12)
+        self.assertEqual(summary['failed'], 1)
+        self.assertEqual([os.path.basename(r['Source']) for r in rows], [f'{i:03d}.xml' for i in range(12)])
+        self.assertEqual(rows[0]['InvoiceNumber'], 'EXP0000000000000')
+        self.assertEqual(rows[0]['PayableAmount'], '255.0')
+        self.assertTrue(rows[5]['Error'].startswith('ParseError'))
+
+    def test_cli_extract(self):
+        """extract komutu dizindeki XML'lerden kalem başına CSV üretir"""
+        import csv, os, tempfile
+        from nilvera_client.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, 'xml'))
+            for i in range(3):
+                with open(os.path.join(tmp, 'xml', f'{i}.xml'), 'wb') as f:
+                    f.write(self._invoice_xml(f'EXP{i}', lines=((1, 'A', 1, 1.0), (2, 'B', 2, 3.0))))
+            out_path = os.path.join(tmp, 'muhasebe.csv')
+            code = main(['extract', os.path.join(tmp, 'xml'), '--lines', '--workers', '1', '--quiet',
+                         '--fields', 'InvoiceNumber,PayableAmount', '--field', 'Profile=ProfileID',
+                         '-o', out_path])
+            with open(out_path, encoding='utf-8', newline='') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[3]['InvoiceNumber'], 'EXP1')
+        self.assertEqual(rows[3]['ItemName'], 'B')
+        self.assertEqual(rows[3]['Profile'], 'IHRACAT')
+        self.assertNotIn('SupplierName', rows[0])
+
+    @unittest.skipUnless(__import__('importlib').util.find_spec('numpy'), 'numpy kurulu değil')
+    def test_numpy_structured_array(self):
+        """to_numpy sayısal sütunları float64 olarak döndürür"""
+        from nilvera_client.ubl import UBLExtractor
+
+        docs = [self._invoice_xml(f'EXP{i}') for i in range(5)]
+        array = UBLExtractor(workers=1, batch_size=2).to_numpy(docs, block_size=2)
+        self.assertEqual(len(array), 5)
+        self.assertEqual(array['PayableAmount'].sum(), 255.0 * 5)
+        self.assertEqual(array['InvoiceNumber'][4], 'EXP4')
+
+
+class TestInvoiceRendering(unittest.TestCase):
+    """Gömülü XSLT ile yerel HTML üretimi testleri"""
+
+    HAS_LXML = __import__('importlib').util.find_spec('lxml') is not None
+
+    @unittest.skipUnless(HAS_LXML, 'lxml kurulu değil')
+    def test_render_compiles_each_stylesheet_once(self):
+        """Aynı şablon bir kez derlenir, farklı şablon ayrı önbelleğe girer"""
+        from nilvera_client.rendering import InvoiceRenderer
+
+        renderer = InvoiceRenderer(max_stylesheets=1)
+        first = renderer.render(TestUBLExtraction._invoice_xml('EXP1'))
+        second = renderer.render(TestUBLExtraction._invoice_xml('EXP2'))
+        self.assertIn('<h1>EXP1</h1>', first)
+        self.assertIn('<h1>EXP2</h1>', second)
+        self.assertEqual(renderer.compiled, 1)
+
+        other = TestUBLExtraction.XSLT.replace(b'<h1>', b'<h2>').replace(b'</h1>', b'</h2>')
+        self.assertIn('<h2>EXP3</h2>', renderer.render(TestUBLExtraction._invoice_xml('EXP3', xslt=other)))
+        self.assertEqual((renderer.compiled, len(renderer)), (2, 1))
+
+    @unittest.skipUnless(HAS_LXML, 'lxml kurulu değil')
+    def test_stylesheet_cannot_read_files(self):
+        """Karşı tarafın şablonu yerel dosya okuyamaz"""
+        import os, tempfile
+        from nilvera_client.exceptions import NilveraValidationError
+        from nilvera_client.rendering import InvoiceRenderer
+
+        with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as f:
+            f.write('<gizli>parola</gizli>')
+        try:
+            xslt = ('<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">'
+                    f'<xsl:template match="/"><xsl:copy-of select="document(\'{f.name}\')"/></xsl:template>'
+                    '</xsl:stylesheet>').encode()
+            with self.assertRaises(NilveraValidationError):
+                InvoiceRenderer().render(TestUBLExtraction._invoice_xml('EXP1', xslt=xslt))
+        finally:
+            os.unlink(f.name)
+
+    @unittest.skipUnless(HAS_LXML, 'lxml kurulu değil')
+    def test_broken_base64_falls_back_to_server(self):
+        """Bozuk base64 şablon NilveraValidationError olur, client sunucu HTML'ine düşer"""
+        import base64
+        from nilvera_client.exceptions import NilveraValidationError
+        from nilvera_client.rendering import InvoiceRenderer
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        xml = TestUBLExtraction._invoice_xml('EXP8').replace(base64.b64encode(TestUBLExtraction.XSLT), b'abc')
+        with self.assertRaises(NilveraValidationError):
+            InvoiceRenderer().render(xml)
+
+        class DocumentTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                if url.endswith('/xml'):
+                    return TransportResponse(200, {'Content-Type': 'application/xml'}, xml)
+                return TransportResponse(200, {'Content-Type': 'text/html'}, b'<html>sunucu</html>')
+
+        client = NilveraClient(api_key="k", transport=DocumentTransport())
+        self.assertEqual(client.render_invoice_html('abc')['data'], b'<html>sunucu</html>')
+
+    def test_client_renders_locally_or_falls_back(self):
+        """render_invoice_html XML'den üretir; lxml / şablon yoksa sunucu HTML'ine düşer"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        xml = TestUBLExtraction._invoice_xml('EXP9')
+        calls = []
+
+        class DocumentTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                calls.append(url.rsplit('/', 1)[-1])
+                if url.endswith('/xml'):
+                    return TransportResponse(200, {'Content-Type': 'application/xml'}, xml)
+                return TransportResponse(200, {'Content-Type': 'text/html'}, b'<html>sunucu</html>')
+
+        client = NilveraClient(api_key="k", transport=DocumentTransport())
+        result = client.render_invoice_html('abc')
+        self.assertTrue(result['success'])
+        if self.HAS_LXML:
+            self.assertTrue(result['rendered'])
+            self.assertIn(b'<h1>EXP9</h1>', result['data'])
+            self.assertEqual(calls, ['xml'])
+        else:
+            self.assertEqual(result['data'], b'<html>sunucu</html>')
+            self.assertEqual(calls, ['html'])
+            with self.assertRaises(ImportError):
+                client.render_invoice_html('abc', fallback=False)
+
+    def test_missing_lxml_skips_xml_download(self):
+        """lxml yoksa XML indirilmez; hata hatırlanır ve import yeniden denenmez"""
+        from nilvera_client.transport import BaseTransport, TransportResponse
+
+        calls = []
+
+        class DocumentTransport(BaseTransport):
+            def request(self, method, url, **kwargs):
+                calls.append(url.rsplit('/', 1)[-1])
+                return TransportResponse(200, {'Content-Type': 'text/html'}, b'<html>sunucu</html>')
+
+        client = NilveraClient(api_key="k", transport=DocumentTransport())
+        with patch('nilvera_client.rendering._load_lxml', side_effect=ImportError('lxml yok')) as load:
+            for _ in range(3):
+                self.assertEqual(client.render_invoice_html('abc')['data'], b'<html>sunucu</html>')
+            with self.assertRaises(ImportError):
+                client.render_invoice_html('abc', fallback=False)
+
+        self.assertEqual(calls, ['html'] * 3)
+        self.assertEqual(load.call_count, 1)
+
+
 def run_tests():
     """Testleri çalıştır"""
     # Test suite oluştur
@@ -169,6 +2686,29 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestTCMBCurrencyService))
     suite.addTests(loader.loadTestsFromTestCase(TestExceptions))
     suite.addTests(loader.loadTestsFromTestCase(TestClientMethods))
+    suite.addTests(loader.loadTestsFromTestCase(TestBenchmarkStubServer))
+    suite.addTests(loader.loadTestsFromTestCase(TestCassetteTransport))
+    suite.addTests(loader.loadTestsFromTestCase(TestConnectionPool))
+    suite.addTests(loader.loadTestsFromTestCase(TestClientRegistry))
+    suite.addTests(loader.loadTestsFromTestCase(TestTransports))
+    suite.addTests(loader.loadTestsFromTestCase(TestSingleFlight))
+    suite.addTests(loader.loadTestsFromTestCase(TestHedging))
+    suite.addTests(loader.loadTestsFromTestCase(TestConfirmBatching))
+    suite.addTests(loader.loadTestsFromTestCase(TestPriorityScheduler))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvoiceOutbox))
+    suite.addTests(loader.loadTestsFromTestCase(TestDedupIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvoiceValidator))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvoiceBuilder))
+    suite.addTests(loader.loadTestsFromTestCase(TestRateStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestLazyImports))
+    suite.addTests(loader.loadTestsFromTestCase(TestResponseCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestDocumentCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestWebhooks))
+    suite.addTests(loader.loadTestsFromTestCase(TestCommandLine))
+    suite.addTests(loader.loadTestsFromTestCase(TestJSONStream))
+    suite.addTests(loader.loadTestsFromTestCase(TestReconciliation))
+    suite.addTests(loader.loadTestsFromTestCase(TestUBLExtraction))
+    suite.addTests(loader.loadTestsFromTestCase(TestInvoiceRendering))
     
     # Testleri çalıştır
     runner = unittest.TextTestRunner(verbosity=2)